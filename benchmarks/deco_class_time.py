@@ -0,0 +1,66 @@
+#! /usr/bin/env python3
+__author__ = "Brian O'Neill"
+__doc__ = """
+Time decorate_hierarchy on a synthetic class hierarchy with 1000 methods
+(and some properties), with and without `omit`/`only` patterns.
+Usage:
+    python benchmarks/deco_class_time.py [NUM_CLASSES [METHODS_PER_CLASS]]
+Defaults: 10 classes, 100 methods each (90 methods + 10 properties).
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from log_calls import log_calls
+
+
+def make_hierarchy(num_classes, methods_per_class):
+    """Return the base class of a chain of num_classes classes,
+    each with methods_per_class members, one in ten of them a property."""
+    ns = {"__name__": __name__}     # classes need a module with a file
+    base = 'object'
+    for c in range(num_classes):
+        lines = ["class K%d(%s):" % (c, base)]
+        for m in range(methods_per_class):
+            if m % 10 == 9:
+                lines.append("    @property\n"
+                             "    def p_%d_%d(self): return %d\n"
+                             "    @p_%d_%d.setter\n"
+                             "    def p_%d_%d(self, val): pass" % ((c, m, m) + (c, m) * 2))
+            elif m % 10 == 8:
+                lines.append("    @staticmethod\n"
+                             "    def s_%d_%d(a): return a" % (c, m))
+            else:
+                lines.append("    def m_%d_%d(self, a, b=2): return a" % (c, m))
+        exec('\n'.join(lines), ns)
+        base = 'K%d' % c
+    return ns['K0']
+
+
+CASES = (
+    ('no omit/only', {}),
+    ('omit: 4 globs, 2 literals',
+     dict(omit='m_*_1 m_*_2? *.s_* p_*.setter m_0_0 K3.m_3_3')),
+    ('only: 2 globs, 1 literal',
+     dict(only='m_[0-4]_* p_* K9.m_9_99')),
+    # Nothing gets decorated: measures just the scan & matching
+    ('only: matches nothing', dict(only='no_such_* nothing K?.nope')),
+)
+
+
+def main(num_classes=10, methods_per_class=100, repeat=5):
+    print("decorate_hierarchy, %d classes x %d members:" % (num_classes, methods_per_class))
+    for label, settings in CASES:
+        best = float('inf')
+        for _ in range(repeat):
+            base = make_hierarchy(num_classes, methods_per_class)
+            t0 = time.perf_counter()
+            log_calls.decorate_hierarchy(base, **settings)
+            best = min(best, time.perf_counter() - t0)
+        print("    %-28s %8.2f ms" % (label, best * 1000))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:3]))
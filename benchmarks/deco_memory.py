@@ -0,0 +1,66 @@
+#! /usr/bin/env python3
+__author__ = "Brian O'Neill"
+__doc__ = """
+Measure the memory cost, in bytes per decorated function, of decorating
+many functions -- individually, and as methods of a decorated class.
+Usage:
+    python benchmarks/deco_memory.py [N]
+N: number of functions/methods to decorate (default: 1000)
+"""
+import os
+import sys
+import gc
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from log_calls import log_calls, record_history
+
+
+def make_functions(n):
+    ns = {}
+    for i in range(n):
+        exec("def f_%d(a, b=2, *args, **kwargs): return a" % i, ns)
+    return [ns['f_%d' % i] for i in range(n)]
+
+
+def make_class(n):
+    ns = {}
+    body = '\n'.join("    def m_%d(self, a, b=2): return a" % i for i in range(n))
+    exec("class K():\n" + body, ns)
+    return ns['K']
+
+
+def bytes_per_item(n, setup, decorate):
+    """Return the average number of bytes allocated (and still held)
+    per function by decorate(things), things = setup(n)."""
+    things = setup(n)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = decorate(things)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diff = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del result
+    return diff / n
+
+
+def main(n=1000):
+    cases = (
+        ('log_calls(), functions',
+         make_functions, lambda fs: [log_calls()(f) for f in fs]),
+        ('log_calls(record_history=True), functions',
+         make_functions, lambda fs: [log_calls(record_history=True)(f) for f in fs]),
+        ('record_history(), functions',
+         make_functions, lambda fs: [record_history()(f) for f in fs]),
+        ('log_calls(), methods of one class',
+         make_class, lambda k: log_calls()(k)),
+    )
+    for label, setup, decorate in cases:
+        print("%-45s %8.0f bytes/function" % (label, bytes_per_item(n, setup, decorate)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -1,14 +1,15 @@
 from .version import __version__
-from .log_calls import log_calls, CallRecord, __version__, __author__
+from .log_calls import log_calls, CallRecord, ModuleDecoration, __version__, __author__
 from .record_history import record_history
+from .cache_calls import cache_calls
 from .used_unused_kwds import used_unused_keywords
 from .helpers import difference_update
 from .deco_settings import DecoSetting, DecoSettingsMapping
 from .proxy_descriptors import install_proxy_descriptor, ClassInstanceAttrProxy
 
 __all__ = [
-    'log_calls', 'CallRecord', '__version__', '__author__',
-    'record_history',
+    'log_calls', 'CallRecord', 'ModuleDecoration', '__version__', '__author__',
+    'record_history', 'cache_calls',
     'used_unused_keywords',
     'difference_update',
     'DecoSetting', 'DecoSettingsMapping',
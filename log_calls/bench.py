@@ -0,0 +1,343 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+What `log_calls`, `record_history` and `cache_calls` cost per call, on every path
+through the wrapper:
+
+    python -m log_calls.bench [--json FILE] [--compare BASELINE.json]
+                              [--tolerance 0.1] [--quick] [CASE ...]
+
+For each case (see CASES, or --list), reports
+    ns_per_call           best of --repeat timings of a loop of calls
+    peak_bytes_per_call   the most memory a call has allocated at once
+                          (tracemalloc), beyond what was allocated before it
+    net_blocks_per_call   memory blocks still allocated after a call
+                          (sys.getallocatedblocks), averaged; nonzero means
+                          something accumulates
+as a table on stderr, and as JSON on stdout or in --json FILE.
+
+With --compare, the results are compared with those in BASELINE.json
+(saved with --json by an earlier run, say, before an upgrade): cases
+more than --tolerance (a fraction) slower than before, or allocating
+more, are listed as regressions, and the exit status is 1 if any are.
+Timings vary from run to run by a few percent: use a generous tolerance,
+a quiet machine, and the same Python for both runs.
+"""
+import argparse
+import functools
+import gc
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from .log_calls import log_calls
+from .record_history import record_history
+from .cache_calls import cache_calls
+from .version import __version__
+
+__all__ = ['CASES', 'run', 'compare', 'main']
+
+
+#-----------------------------------------------------------------------------
+# The cases. Each setup function takes a stream to write to (os.devnull)
+# and returns a callable of no arguments that makes one call.
+#-----------------------------------------------------------------------------
+
+def _f(a, b=2, **kwargs):
+    return a
+
+
+def _baseline(out):
+    return functools.partial(_f, 1)
+
+
+def _deco(**settings):
+    """Setup for a function decorated with log_calls(**settings)."""
+    def setup(out):
+        kwargs = dict(settings)
+        if 'file' in kwargs:
+            kwargs['file'] = out
+        return functools.partial(log_calls(**kwargs)(_copy(_f)), 1)
+    return setup
+
+
+def _copy(f):
+    """A fresh function with f's code, to decorate."""
+    return type(f)(f.__code__, f.__globals__, f.__name__, f.__defaults__)
+
+
+def _record_history(out):
+    return functools.partial(record_history(max_history=100)(_copy(_f)), 1)
+
+
+def _cache_hit(out):
+    return functools.partial(cache_calls()(_copy(_f)), 1)
+
+
+def _logger_no_handlers(out):
+    # log_calls falls back to print(..., file=out)
+    logger = logging.Logger('log_calls.bench.no_handlers')
+    return functools.partial(log_calls(logger=logger, file=out)(_copy(_f)), 1)
+
+
+def _logger(out):
+    logger = logging.Logger('log_calls.bench')
+    logger.addHandler(logging.StreamHandler(out))
+    return functools.partial(log_calls(logger=logger)(_copy(_f)), 1)
+
+
+def _indirect(out):
+    f = log_calls(file=out, enabled='enable_', log_args='args_',
+                  log_retval='retval_')(_copy(_f))
+    return functools.partial(f, 1, enable_=True, retval_=True)
+
+
+def _class(out):
+    @log_calls(file=out)
+    class C():
+        def method(self, a, b=2):
+            return a
+
+        @property
+        def prop(self):
+            return 17
+    return C()
+
+
+def _method(out):
+    return functools.partial(_class(out).method, 1)
+
+
+def _property(out):
+    obj = _class(out)
+    return lambda: obj.prop
+
+
+def _print(out):
+    @log_calls(file=out)
+    def f(a):
+        log_calls.print('a =', a)
+        return a
+    return functools.partial(f, 1)
+
+
+def _print_undecorated(out):
+    def f(a):
+        log_calls.print('a =', a)     # does nothing: f isn't decorated
+        return a
+    return functools.partial(f, 1)
+
+
+# (name, setup, depth): make the calls depth frames below the bench's own
+CASES = (
+    ('baseline',            _baseline, 0),          # undecorated
+    ('bypass',              _deco(enabled=-1), 0),
+    ('disabled',            _deco(enabled=False), 0),
+    ('muted',               _deco(mute=True, file=None), 0),
+    ('muted_thread_clock',  _deco(mute=True, file=None, clocks='thread'), 0),
+    ('muted_no_clocks',     _deco(mute=True, file=None, clocks='none'), 0),
+    ('muted_log_memory',    _deco(mute=True, file=None, log_memory=True), 0),
+    ('muted_log_resources', _deco(mute=True, file=None, log_resources=True), 0),
+    ('record_history',      _record_history, 0),
+    ('cache_hit',           _cache_hit, 0),         # all calls but the first
+    ('devnull',             _deco(file=None), 0),   # all output to os.devnull
+    ('devnull_compact',     _deco(file=None, format='compact'), 0),
+    ('devnull_jsonl',       _deco(file=None, format='jsonl'), 0),
+    ('logger_no_handlers',  _logger_no_handlers, 0),
+    ('logger',              _logger, 0),
+    ('indirect',            _indirect, 0),
+    ('depth_10',            _deco(file=None), 10),
+    ('depth_100',           _deco(file=None), 100),
+    ('method',              _method, 0),
+    ('property',            _property, 0),
+    ('print',               _print, 0),
+    ('print_undecorated',   _print_undecorated, 0),
+)
+
+
+#-----------------------------------------------------------------------------
+# Measuring
+#-----------------------------------------------------------------------------
+
+def _at_depth(depth, fn, *args):
+    """fn(*args), called depth frames further down the stack."""
+    if depth > 0:
+        return _at_depth(depth - 1, fn, *args)
+    return fn(*args)
+
+
+def _time_loop(call, loops):
+    """ns taken by loops calls of call."""
+    it = range(loops)
+    t0 = time.perf_counter_ns()
+    for _ in it:
+        call()
+    return time.perf_counter_ns() - t0
+
+
+def _ns_per_call(call, depth, min_secs, repeat):
+    loops = 10
+    while True:         # enough loops to take min_secs
+        ns = _at_depth(depth, _time_loop, call, loops)
+        if ns >= min_secs * 1e9:
+            break
+        loops *= 2 if ns * 10 >= min_secs * 1e9 else 10
+    best = ns
+    for _ in range(repeat - 1):
+        best = min(best, _at_depth(depth, _time_loop, call, loops))
+    return best / loops
+
+
+def _calls(call, n):
+    for _ in range(n):
+        call()
+
+
+def _peak_bytes(call):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        call()
+        return tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+
+
+def _memory_per_call(call, depth, n=1000):
+    """(peak_bytes_per_call, net_blocks_per_call)"""
+    _at_depth(depth, _calls, call, n)       # warm up: caches, histories fill up
+    peak = min(_at_depth(depth, _peak_bytes, call) for _ in range(5))
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    _at_depth(depth, _calls, call, n)
+    gc.collect()
+    return peak, (sys.getallocatedblocks() - blocks) / n
+
+
+def run(names=None, *, min_secs=0.05, repeat=5, report=None) -> dict:
+    """Run the cases named in names (default: all); return the results,
+    {'log_calls': version, 'python': ..., 'cases': {name: {...}}}.
+    report: called with (name, results of case) after each case."""
+    cases = [case for case in CASES if not names or case[0] in names]
+    unknown = set(names or ()) - {case[0] for case in cases}
+    if unknown:
+        raise ValueError("no such case(s): %s" % ', '.join(sorted(unknown)))
+
+    results = {}
+    with open(os.devnull, 'w') as out:
+        for name, setup, depth in cases:
+            call = setup(out)
+            ns = _ns_per_call(call, depth, min_secs, repeat)
+            peak, net = _memory_per_call(call, depth)
+            results[name] = {'ns_per_call': round(ns, 1),
+                             'peak_bytes_per_call': peak,
+                             'net_blocks_per_call': round(net, 2)}
+            if report:
+                report(name, results[name])
+    return {'log_calls': __version__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'cases': results}
+
+
+def compare(baseline: dict, current: dict, tolerance=0.1) -> list:
+    """Regressions of current from baseline (results of run):
+    a list of (case, measure, baseline value, current value), for the
+    cases in both that are more than tolerance (a fraction) slower,
+    or allocate more.
+
+    >>> base = {'cases': {'x': {'ns_per_call': 100.0, 'peak_bytes_per_call': 500,
+    ...                         'net_blocks_per_call': 0.0}}}
+    >>> cur = {'cases': {'x': {'ns_per_call': 109.0, 'peak_bytes_per_call': 800,
+    ...                        'net_blocks_per_call': 1.0}}}
+    >>> compare(base, cur)
+    [('x', 'peak_bytes_per_call', 500, 800), ('x', 'net_blocks_per_call', 0.0, 1.0)]
+    """
+    regressions = []
+    for name, base in baseline['cases'].items():
+        cur = current['cases'].get(name)
+        if cur is None:
+            continue
+        if cur['ns_per_call'] > base['ns_per_call'] * (1 + tolerance):
+            regressions.append((name, 'ns_per_call', base['ns_per_call'], cur['ns_per_call']))
+        if cur['peak_bytes_per_call'] > base['peak_bytes_per_call'] * (1 + tolerance):
+            regressions.append((name, 'peak_bytes_per_call',
+                                base['peak_bytes_per_call'], cur['peak_bytes_per_call']))
+        # A leak is a leak: no tolerance (but averages wobble a bit)
+        if cur['net_blocks_per_call'] >= base['net_blocks_per_call'] + 0.5:
+            regressions.append((name, 'net_blocks_per_call',
+                                base['net_blocks_per_call'], cur['net_blocks_per_call']))
+    return regressions
+
+
+#-----------------------------------------------------------------------------
+# main
+#-----------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m log_calls.bench',
+        description="Time the calls of functions decorated with log_calls, "
+                    "record_history and cache_calls, on every path through the wrapper.")
+    parser.add_argument('cases', nargs='*', metavar='CASE',
+                        help="cases to run (default: all; see --list)")
+    parser.add_argument('--list', action='store_true', help="list the cases and exit")
+    parser.add_argument('--json', metavar='FILE',
+                        help="write the results to FILE (default: stdout)")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="compare with the results in BASELINE, written by --json")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="with --compare, the fraction by which a case can be "
+                             "slower before it's a regression (default: 0.1)")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="time each case this many times; report the best (default: 5)")
+    parser.add_argument('--quick', action='store_true',
+                        help="shorter timings: for a smoke test, not for comparing")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, setup, depth in CASES:
+            print(name)
+        return 0
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)
+
+    def report(name, res):
+        print("%-20s %10.1f ns/call %8d peak bytes/call %7.2f net blocks/call"
+              % (name, res['ns_per_call'], res['peak_bytes_per_call'],
+                 res['net_blocks_per_call']), file=sys.stderr)
+
+    try:
+        results = run(args.cases,
+                      min_secs=0.005 if args.quick else 0.05,
+                      repeat=2 if args.quick else args.repeat,
+                      report=report)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.json:
+        with open(args.json, 'w') as fp:
+            json.dump(results, fp, indent=1)
+    else:
+        json.dump(results, sys.stdout, indent=1)
+        print()
+
+    if baseline is None:
+        return 0
+    regressions = compare(baseline, results, args.tolerance)
+    print("\nCompared with %s (log_calls %s, Python %s): %s"
+          % (args.compare, baseline.get('log_calls'), baseline.get('python'),
+             "%d regression(s)" % len(regressions) if regressions else "no regressions"),
+          file=sys.stderr)
+    for name, measure, before, now in regressions:
+        print("    %-20s %-20s %10s -> %s" % (name, measure, before, now), file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
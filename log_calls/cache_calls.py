@@ -0,0 +1,162 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+    Module version = '0.3.2'
+"""
+
+from .deco_settings import (DecoSetting, DecoSettingsMapping, DecoSetting_bool,
+                            DecoSetting_int, DecoSetting_str, DecoSetting_float)
+from .log_calls import _deco_base, DecoSettingHistory
+from .call_cache import CallCache
+from .used_unused_kwds import used_unused_keywords
+
+
+class cache_calls(_deco_base):
+    """Memoize calls to the decorated callable: a call with the same
+    arguments as a cached one returns the cached return value, without
+    calling the callable. See call_cache.py for how calls are keyed.
+
+    enabled: int, or indirect value. When false, calls aren't cached
+        (or looked up); < 0, bypass the wrapper entirely, as for log_calls.
+    policy: str, which entry to evict first when the cache is full:
+        'lru' (default), least recently used;
+        'lfu', least frequently used (of those, the oldest);
+        'fifo', the oldest.
+    max_entries: int, most entries to keep; 0: unbounded. Default 128.
+    max_bytes: int, most bytes of return values (sys.getsizeof) to keep;
+        0 (default): unbounded.
+    ttl: int or float, seconds that an entry is good for; 0 (default): forever.
+    key_fns: dict, parameter name |-> function of the argument for it that
+        returns what to key the argument by (e.g. for unhashable arguments).
+    record_history: bool, as for log_calls: record every call, hit or miss
+        (a record doesn't say which; compare stats.cache_hits).
+    max_history: int, as for log_calls.
+    omit, only, name, settings, NO_DECO: as for log_calls.
+
+    stats.cache_hits, cache_misses, cache_evictions: counters;
+    stats.cache_saved_secs: the elapsed time of the calls that hits saved;
+    stats.cache_entries, cache_bytes: how much is cached (cache_bytes is
+        0 unless max_bytes is set);
+    stats.clear_cache(): empty the cache and zero the counters.
+    """
+    __slots__ = ('_cache',)
+
+    # Settings of the cache are fixed once a callable is decorated:
+    # not mutable, no indirect values
+    _setting_info_list = (
+        DecoSetting('log_call_numbers', bool, True,   allow_falsy=True, visible=False),
+        DecoSetting('indent',           bool, False,  allow_falsy=True, visible=False),
+        DecoSetting('prefix',           str,  '',     allow_falsy=True, visible=False),
+        DecoSetting('mute',             int,  False,  allow_falsy=True, visible=False),
+        # visible:
+        DecoSetting_int('enabled',      int,  True,   allow_falsy=True),
+        DecoSetting_str('policy',       str,  'lru',  allow_falsy=False, allow_indirect=False, mutable=False),
+        DecoSetting_int('max_entries',  int,  128,    allow_falsy=True, allow_indirect=False, mutable=False),
+        DecoSetting_int('max_bytes',    int,  0,      allow_falsy=True, allow_indirect=False, mutable=False),
+        DecoSetting_float('ttl',        (int, float), 0, allow_falsy=True, allow_indirect=False, mutable=False),
+        DecoSetting('key_fns',          dict, None,   allow_falsy=True, allow_indirect=False, mutable=False),
+        DecoSettingHistory('record_history'),
+        DecoSetting('max_history',      int,  0,      allow_falsy=True, mutable=False),
+        DecoSetting_bool('NO_DECO',     bool, False,  allow_falsy=True, mutable=False),
+    )
+    DecoSettingsMapping.register_class_settings('cache_calls',
+                                                _setting_info_list)
+
+    _data_descriptor_names = _deco_base._data_descriptor_names + (
+        'cache_hits',
+        'cache_misses',
+        'cache_evictions',
+        'cache_saved_secs',
+        'cache_entries',
+        'cache_bytes',
+    )
+    _method_descriptor_names = _deco_base._method_descriptor_names + (
+        'clear_cache',
+    )
+
+    @used_unused_keywords()
+    def __init__(self,
+                 settings=None,
+                 omit=tuple(),
+                 only=tuple(),
+                 name=None,
+                 enabled=True,
+                 policy='lru',
+                 max_entries=128,
+                 max_bytes=0,
+                 ttl=0,
+                 key_fns=None,
+                 record_history=False,
+                 max_history=0,
+                 NO_DECO=False,
+                ):
+        used_keywords_dict = cache_calls.__dict__['__init__'].get_used_keywords()
+        for kwd in ('omit', 'only', 'name'):
+            if kwd in used_keywords_dict:
+                del used_keywords_dict[kwd]
+
+        super().__init__(
+            settings=settings,
+            _omit=omit,
+            _only=only,
+            _name_param=name,
+            _used_keywords_dict=used_keywords_dict,
+            enabled=enabled,
+            prefix='',
+            mute=False,
+            max_history=max_history,
+            indent=False,
+            log_call_numbers=True,
+            NO_DECO=NO_DECO,
+        )
+
+    def _make_cache(self):
+        settings = self._settings_mapping
+        self._cache = CallCache(
+            self.f_signature,
+            policy=settings['policy'],
+            max_entries=settings['max_entries'],
+            max_bytes=settings['max_bytes'],
+            ttl=settings['ttl'],
+            key_fns=settings['key_fns'])
+        return self._cache
+
+    #----------------------------------------------------------------
+    # stats
+    #----------------------------------------------------------------
+    @property
+    def cache_hits(self):
+        return self._cache.hits
+
+    @property
+    def cache_misses(self):
+        return self._cache.misses
+
+    @property
+    def cache_evictions(self):
+        return self._cache.evictions
+
+    @property
+    def cache_saved_secs(self):
+        return self._cache.saved_secs
+
+    @property
+    def cache_entries(self):
+        return len(self._cache)
+
+    @property
+    def cache_bytes(self):
+        return self._cache.nbytes
+
+    def clear_cache(self):
+        with self._cache._lock:
+            self._cache.clear()
+
+    @classmethod
+    def allow_repr(cls) -> bool:
+        return True
+
+    @classmethod
+    def log_message_auto_prefix_threshold(cls) -> int:
+        """:return: one of the "constants" of _deco_base.MUTE
+        (see record_history)"""
+        return cls.MUTE.NOTHING
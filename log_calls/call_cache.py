@@ -0,0 +1,219 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+CallCache -- the memo of the `cache_calls` decorator: return values keyed by
+the canonicalized arguments of calls, with LRU, LFU or FIFO eviction, limits
+on the number of entries and/or their bytes, an optional time to live,
+and hit/miss/eviction counters.
+
+A call's key is the tuple of its bound arguments, defaults applied, in the
+order of the function's parameters, so f(1), f(1, 2) and f(b=2, a=1) share a
+key if f is `def f(a, b=2)`. **kwargs contributes its items, sorted. A key
+function for a parameter replaces its argument in the key, e.g. to key an
+unhashable argument by a hashable digest of it. A call whose key is
+unhashable anyway isn't cached.
+
+Expired entries are removed when looked up, and, oldest first, whenever
+a value is stored -- before the policy evicts any live entry for room.
+
+A size in bytes is sys.getsizeof of a return value, which doesn't include
+the objects it refers to (numpy arrays, bytes and str do include their data).
+"""
+import sys
+import threading
+import time
+from inspect import Parameter
+
+__all__ = ['CallCache', 'CACHE_MISS']
+
+
+# What CallCache.lookup returns in place of a value that isn't cached
+CACHE_MISS = object()
+
+# fields of an entry (a list)
+_VALUE, _NBYTES, _ELAPSED_NS, _EXPIRES, _FREQ = range(5)
+
+
+class CallCache():
+    """
+    >>> import inspect
+    >>> def f(a, b=2, **kw): pass
+    >>> cache = CallCache(inspect.signature(f), max_entries=2)
+    >>> key, value = cache.lookup((1,), {})
+    >>> key, value is CACHE_MISS
+    ((1, 2, ()), True)
+    >>> cache.store(key, 'one', 1000)
+    >>> cache.lookup((), {'b': 2, 'a': 1})
+    ((1, 2, ()), 'one')
+    >>> for a in (2, 3):
+    ...     cache.store(cache.lookup((a,), {})[0], a, 1000)
+    >>> len(cache), cache.hits, cache.misses, cache.evictions, cache.saved_secs
+    (2, 1, 3, 1, 1e-06)
+    """
+    POLICIES = ('lru', 'lfu', 'fifo')
+
+    __slots__ = ('policy', 'max_entries', 'max_bytes', 'ttl',
+                 '_signature', '_key_fns', '_var_keyword', '_num_positional',
+                 '_entries', '_freqs', '_min_freq', '_expiring', '_lock',
+                 'hits', 'misses', 'evictions', 'saved_ns', 'nbytes')
+
+    def __init__(self, signature, *, policy='lru', max_entries=0, max_bytes=0,
+                 ttl=0, key_fns=None):
+        """signature: of the function whose calls are cached.
+        policy: what to evict first: 'lru' the least recently used entry,
+            'lfu' the least frequently used (of those, the oldest),
+            'fifo' the oldest.
+        max_entries, max_bytes: limits; 0 means no limit.
+        ttl: seconds an entry is good for; 0 means forever.
+        key_fns: parameter name |-> function of its argument, used in keys
+        """
+        self.policy = policy if policy in self.POLICIES else 'lru'
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._signature = signature
+        self._key_fns = dict(key_fns or {})
+        params = signature.parameters.values()
+        self._var_keyword = next((p.name for p in params
+                                  if p.kind is Parameter.VAR_KEYWORD), None)
+        # If every parameter is positional and not *args, a call passing them
+        # all positionally is its own key, and needn't be bound
+        self._num_positional = (len(params)
+                                if all(p.kind in (Parameter.POSITIONAL_ONLY,
+                                                  Parameter.POSITIONAL_OR_KEYWORD)
+                                       for p in params) and not self._key_fns
+                                else -1)
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Empty the cache and zero its counters"""
+        self._entries = {}      # key |-> entry; ordered oldest (or LRU) first
+        self._freqs = {}        # lfu: use count |-> {key: None}, oldest first
+        self._min_freq = 0
+        self._expiring = {}     # ttl: key |-> None, in the order stored
+        self.hits = self.misses = self.evictions = 0
+        self.saved_ns = 0       # elapsed time of the calls hits avoided
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def saved_secs(self) -> float:
+        return self.saved_ns / 1e9
+
+    def key(self, args, kwargs) -> tuple:
+        if not kwargs and len(args) == self._num_positional:
+            return args
+        bound = self._signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = []
+        for name, value in bound.arguments.items():
+            key_fn = self._key_fns.get(name)
+            if key_fn:
+                value = key_fn(value)
+            elif name == self._var_keyword:
+                value = tuple(sorted(value.items()))
+            key.append(value)
+        return tuple(key)
+
+    def lookup(self, args, kwargs):
+        """-> (key, cached value), or (key, CACHE_MISS) if there's none:
+        pass that key to store. key is None if the call can't be cached."""
+        try:
+            key = self.key(args, kwargs)
+            hash(key)
+        except TypeError:       # unhashable argument, or bad call
+            with self._lock:
+                self.misses += 1
+            return None, CACHE_MISS
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return key, CACHE_MISS
+            if entry[_EXPIRES] and entry[_EXPIRES] <= time.monotonic():
+                self._remove(key)
+                self.evictions += 1
+                self.misses += 1
+                return key, CACHE_MISS
+            self.hits += 1
+            self.saved_ns += entry[_ELAPSED_NS]
+            if self.policy == 'lru':
+                self._entries[key] = self._entries.pop(key)     # move to end
+            elif self.policy == 'lfu':
+                self._bump(key, entry)
+            return key, entry[_VALUE]
+
+    def store(self, key, value, elapsed_ns):
+        """Cache value, the return value of the call that key identifies,
+        which took elapsed_ns. Evict entries to make room for it."""
+        if key is None:
+            return
+        nbytes = sys.getsizeof(value) if self.max_bytes else 0
+        if self.max_bytes and nbytes > self.max_bytes:
+            return      # would evict everything, and still not fit
+        now = time.monotonic()
+        expires = now + self.ttl if self.ttl else 0
+        with self._lock:
+            if key in self._entries:    # another thread got here first
+                self._remove(key)
+            if self._expiring:
+                self._remove_expired(now)
+            while self._entries and (
+                    (self.max_entries and len(self._entries) >= self.max_entries)
+                    or (self.max_bytes and self.nbytes + nbytes > self.max_bytes)):
+                self._evict()
+            self._entries[key] = [value, nbytes, elapsed_ns, expires, 1]
+            self.nbytes += nbytes
+            if expires:
+                self._expiring[key] = None
+            if self.policy == 'lfu':
+                self._freqs.setdefault(1, {})[key] = None
+                self._min_freq = 1
+
+    #----------------------------------------------------------------
+    # (call with self._lock held)
+    #----------------------------------------------------------------
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.nbytes -= entry[_NBYTES]
+        if entry[_EXPIRES]:
+            del self._expiring[key]
+        if self.policy == 'lfu':
+            keys = self._freqs[entry[_FREQ]]
+            del keys[key]
+            if not keys:
+                del self._freqs[entry[_FREQ]]
+
+    def _remove_expired(self, now):
+        """Remove the entries that have expired, oldest first (with one ttl,
+        the order stored is the order they expire in)"""
+        expiring = self._expiring
+        while expiring:
+            key = next(iter(expiring))
+            if self._entries[key][_EXPIRES] > now:
+                break
+            self._remove(key)
+            self.evictions += 1
+
+    def _evict(self):
+        if self.policy == 'lfu':
+            if self._min_freq not in self._freqs:
+                self._min_freq = min(self._freqs)
+            key = next(iter(self._freqs[self._min_freq]))
+        else:
+            key = next(iter(self._entries))
+        self._remove(key)
+        self.evictions += 1
+
+    def _bump(self, key, entry):
+        freq = entry[_FREQ]
+        keys = self._freqs[freq]
+        del keys[key]
+        if not keys:
+            del self._freqs[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        entry[_FREQ] = freq + 1
+        self._freqs.setdefault(freq + 1, {})[key] = None
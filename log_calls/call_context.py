@@ -0,0 +1,190 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+CallContext -- the `context` passed to the pre_call_handler and
+post_call_handler methods of DecoSetting objects, one per logged call
+of a decorated function.
+
+A CallContext is a (mutable) mapping, with the keys documented in
+DecoSetting, so handlers written for the dict that the wrapper used to
+build on every call -- context['argnames'], context['retval'], ... --
+keep working. But:
+    * the values known when the call starts are stored in slots
+      (settings, stats, fparams and indent are read off the decorator);
+    * bound_args, argcount, argnames, argvals, varargs, varargs_name,
+      kwargs_name, explicit_kwargs, implicit_kwargs and defaulted_kwargs
+      are computed when first accessed -- if no handler wants them,
+      they're never computed;
+    * other keys, set by handlers, are kept in a dict of extras.
+
+A fresh CallContext is made for each logged call: creating a slotted
+object is cheaper than resetting a reused one, slot by slot.
+"""
+from collections.abc import MutableMapping
+
+from .helpers import (get_args_pos, get_args_kwargs_param_names,
+                      get_defaulted_kwargs_OD, get_explicit_kwargs_OD,
+                      difference_update)
+
+__all__ = ['CallContext']
+
+
+#-----------------------------------------------------------------------------
+# _ArgumentField
+#-----------------------------------------------------------------------------
+class _ArgumentField():
+    """Non-data descriptor for the argument-related fields of a CallContext.
+    The first access to any of them computes them all (they share
+    bound_args) and stores them in the context's __dict__, which then
+    shadows these descriptors: later accesses are plain attribute reads.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, context, owner):
+        if context is None:
+            return self
+        context._compute_argument_fields()
+        return context.__dict__[self.name]
+
+
+#-----------------------------------------------------------------------------
+# CallContext
+#-----------------------------------------------------------------------------
+class CallContext(MutableMapping):
+    """Per-call context passed to handlers; see module docstring.
+    Every key is also an attribute: context['retval'] == context.retval.
+    """
+    # Set by the wrapper (or read off the decorator) before the call, ...
+    _PRE_CALL_FIELDS = ('decorator', 'settings', 'stats', 'fparams', 'indent',
+                        'prefixed_fname', 'output_fname',
+                        'call_list', 'args', 'kwargs',
+                        'call_num')
+    # ... and after it
+    _POST_CALL_FIELDS = ('elapsed_secs', 'process_secs',
+                         'elapsed_secs_corrected', 'process_secs_corrected',  # 0.3.2
+                         'memory', 'resources', 'size',                       # 0.3.2
+                         'timestamp', 'retval')
+    # Computed on first access to any of them (see _ArgumentField)
+    _COMPUTED_FIELDS = ('bound_args', 'argcount', 'argnames', 'argvals',
+                        'varargs', 'varargs_name', 'kwargs_name',
+                        'defaulted_kwargs', 'explicit_kwargs', 'implicit_kwargs')
+
+    # The computed fields live in __dict__
+    __slots__ = _PRE_CALL_FIELDS + _POST_CALL_FIELDS + ('_extra', '__dict__')
+
+    def __init__(self, decorator, args, kwargs):
+        """The wrapper sets prefixed_fname, output_fname and call_list
+        once it knows them, and the post-call fields after the call."""
+        self.decorator = decorator
+        self.settings = decorator._settings_mapping
+        self.stats = decorator._stats
+        self.fparams = decorator.f_params
+        self.indent = " " * decorator.INDENT    # our unit of indentation
+        # The number of this call, as counted when it began: by the time
+        # it ends, calls it made to f (recursive, reentrant) have bumped it
+        self.call_num = decorator._num_calls_logged
+        self.args = args
+        self.kwargs = kwargs
+        self._extra = None      # dict of other keys, if any are set
+
+    def final_value(self, setting_name):
+        """Final value of setting_name for this call"""
+        return self.settings.get_final_value(
+            setting_name, self.kwargs, fparams=self.fparams)
+
+    #----------------------------------------------------------------
+    # Fields computed on demand
+    #----------------------------------------------------------------
+    def _compute_argument_fields(self):
+        fparams = self.fparams
+        args = self.args
+        kwargs = self.kwargs
+        # Use inspect module's Signature.bind method.
+        # bound_args.arguments -- contains only explicitly bound arguments
+        bound_args = self.decorator.f_signature.bind(*args, **kwargs)
+
+        varargs_pos = get_args_pos(fparams)     # -1 if no *args in signature
+        argcount = varargs_pos if varargs_pos >= 0 else len(args)
+        varargs_name, kwargs_name = get_args_kwargs_param_names(fparams)
+        explicit_kwargs = get_explicit_kwargs_OD(fparams, bound_args, kwargs)
+
+        self.__dict__.update(
+            bound_args=bound_args,
+            argcount=argcount,
+            # The first argcount-many things in bound_args
+            argnames=list(bound_args.arguments)[:argcount],
+            argvals=args[:argcount],
+            varargs=args[argcount:],
+            varargs_name=varargs_name,
+            kwargs_name=kwargs_name,
+            defaulted_kwargs=get_defaulted_kwargs_OD(fparams, bound_args),
+            explicit_kwargs=explicit_kwargs,
+            # At least 2x as fast as a dict comprehension
+            implicit_kwargs=difference_update(kwargs.copy(), explicit_kwargs)
+        )
+
+    #----------------------------------------------------------------
+    # Mapping interface
+    #----------------------------------------------------------------
+    # in the order the wrapper used to add them to its dict
+    _KEYS = ('decorator', 'settings', 'stats', 'prefixed_fname', 'fparams',
+             'call_list', 'args', 'kwargs', 'indent', 'output_fname', 'call_num',
+             'argcount', 'argnames', 'argvals', 'varargs', 'varargs_name', 'kwargs_name',
+             'defaulted_kwargs', 'explicit_kwargs', 'implicit_kwargs',
+             'elapsed_secs', 'process_secs',
+             'elapsed_secs_corrected', 'process_secs_corrected',
+             'memory', 'resources', 'size',
+             'timestamp', 'retval')
+    _KEY_SET = frozenset(_KEYS + ('bound_args',))
+
+    def __getitem__(self, key):
+        if key in self._KEY_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:      # e.g. 'retval' before the call
+                raise KeyError(key) from None
+        if self._extra is not None:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._KEY_SET:
+            if key in self._COMPUTED_FIELDS and key not in self.__dict__:
+                self._compute_argument_fields()     # so they're consistent
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._KEY_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for key in self._KEYS:
+            if key in self._POST_CALL_FIELDS and not hasattr(self, key):
+                continue
+            yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return '<%s for %r>' % (self.__class__.__name__, self.prefixed_fname)
+
+
+for _name in CallContext._COMPUTED_FIELDS:
+    setattr(CallContext, _name, _ArgumentField(_name))
+del _name
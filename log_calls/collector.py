@@ -0,0 +1,199 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+Reference collector for the `sink` setting (see sink.py):
+
+    python -m log_calls.collector /run/log_calls.sock --dir /var/log/log_calls
+
+Listens on a Unix domain socket, merges the event streams of all the
+processes that connect, and writes, in --dir:
+
+    history.log     one line per call, rotated at --max-bytes, keeping
+                    --backup-count old files (history.log.1, ...):
+                        timestamp|pid|function|call_num|elapsed_secs|
+                        process_secs|args_digest|caller_chain
+    stats.json      per-function aggregates -- calls, processes,
+                    total/min/max elapsed_secs, total process_secs, and
+                    the numbers of calls with each time measured --
+                    rewritten every --stats-interval seconds and on exit.
+
+Times not measured (NaN, e.g. with clocks='wall' or 'none') are left out
+of the aggregates: elapsed_secs is over elapsed_timed_calls calls,
+process_secs over process_timed_calls.
+"""
+import argparse
+import json
+import logging
+import logging.handlers
+import math
+import os
+import signal
+import socketserver
+import sys
+import threading
+
+from .sink import FrameReader
+
+__all__ = ['Collector', 'main']
+
+
+#-----------------------------------------------------------------------------
+# Collector
+#-----------------------------------------------------------------------------
+class Collector():
+    """Receives event frames on a Unix socket; keeps per-function
+    aggregates and writes history & stats files in out_dir (if given)."""
+
+    def __init__(self, path, out_dir=None, *,
+                 max_bytes=10 * 2**20, backup_count=5, stats_interval=10.0):
+        self.path = path
+        self.out_dir = out_dir
+        self.stats_interval = stats_interval
+        self._lock = threading.Lock()
+        self._aggregates = {}       # fname -> dict
+        self._stop = threading.Event()
+
+        self._history = None
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                os.path.join(out_dir, 'history.log'),
+                maxBytes=max_bytes, backupCount=backup_count)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            # A private logger, not registered with the logging module
+            self._history = logging.Logger('log_calls.collector.history')
+            self._history.addHandler(handler)
+            self._history.propagate = False
+
+        if os.path.exists(path):    # stale socket of a previous run
+            os.unlink(path)
+        collector = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                reader = FrameReader()
+                while True:
+                    data = self.request.recv(65536)
+                    if not data:
+                        return
+                    try:
+                        frames = reader.feed(data)
+                    except (ValueError, IndexError) as e:
+                        print("log_calls.collector: dropping connection: %s" % e,
+                              file=sys.stderr)
+                        return
+                    for pid, events in frames:
+                        collector.add_events(pid, events)
+
+        self.server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        self.server.daemon_threads = True
+
+    def add_events(self, pid, events):
+        with self._lock:
+            aggregates = self._aggregates
+            for ev in events:
+                agg = aggregates.get(ev.fname)
+                if agg is None:
+                    agg = aggregates[ev.fname] = {
+                        'calls': 0, 'pids': set(),
+                        'elapsed_timed_calls': 0, 'process_timed_calls': 0,
+                        'elapsed_secs': 0.0, 'process_secs': 0.0,
+                        'min_elapsed_secs': None, 'max_elapsed_secs': None,
+                    }
+                agg['calls'] += 1
+                agg['pids'].add(pid)
+                elapsed = ev.elapsed_secs
+                if not math.isnan(elapsed):
+                    agg['elapsed_timed_calls'] += 1
+                    agg['elapsed_secs'] += elapsed
+                    if agg['min_elapsed_secs'] is None or elapsed < agg['min_elapsed_secs']:
+                        agg['min_elapsed_secs'] = elapsed
+                    if agg['max_elapsed_secs'] is None or elapsed > agg['max_elapsed_secs']:
+                        agg['max_elapsed_secs'] = elapsed
+                if not math.isnan(ev.process_secs):
+                    agg['process_timed_calls'] += 1
+                    agg['process_secs'] += ev.process_secs
+                if self._history:
+                    self._history.info('%r|%d|%s|%d|%r|%r|%016x|%s' % (
+                        ev.timestamp, pid, ev.fname, ev.call_num,
+                        ev.elapsed_secs, ev.process_secs, ev.args_digest,
+                        ' <== '.join(ev.caller_chain)))
+
+    def aggregates(self) -> dict:
+        """{fname: {'calls', 'processes',
+                    'elapsed_timed_calls', 'process_timed_calls',
+                    'elapsed_secs', 'process_secs',
+                    'min_elapsed_secs', 'max_elapsed_secs'}}
+        (min & max are None if no call was timed)"""
+        with self._lock:
+            ret = {}
+            for fname, agg in self._aggregates.items():
+                d = dict(agg)
+                d['processes'] = len(d.pop('pids'))
+                ret[fname] = d
+            return ret
+
+    def write_stats(self):
+        if not self.out_dir:
+            return
+        path = os.path.join(self.out_dir, 'stats.json')
+        with open(path + '.tmp', 'w') as fp:
+            json.dump(self.aggregates(), fp, indent=1, sort_keys=True)
+        os.replace(path + '.tmp', path)
+
+    def _write_stats_periodically(self):
+        while not self._stop.wait(self.stats_interval):
+            self.write_stats()
+
+    def serve_forever(self):
+        """Serve until shutdown() (from another thread) or KeyboardInterrupt."""
+        writer = threading.Thread(target=self._write_stats_periodically, daemon=True)
+        writer.start()
+        try:
+            self.server.serve_forever(poll_interval=0.25)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop.set()
+            self.server.server_close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            self.write_stats()
+
+    def shutdown(self):
+        self.server.shutdown()
+
+
+#-----------------------------------------------------------------------------
+# main
+#-----------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m log_calls.collector',
+        description="Collect call events sent by functions decorated "
+                    "with log_calls(sink='unix://PATH').")
+    parser.add_argument('path', help="path of the Unix domain socket to listen on")
+    parser.add_argument('--dir', default='.',
+                        help="directory for history.log* and stats.json (default: .)")
+    parser.add_argument('--max-bytes', type=int, default=10 * 2**20,
+                        help="rotate history.log at this size (default: 10 MiB)")
+    parser.add_argument('--backup-count', type=int, default=5,
+                        help="number of rotated history files to keep (default: 5)")
+    parser.add_argument('--stats-interval', type=float, default=10.0,
+                        help="seconds between rewrites of stats.json (default: 10)")
+    args = parser.parse_args(argv)
+
+    collector = Collector(args.path, args.dir,
+                          max_bytes=args.max_bytes,
+                          backup_count=args.backup_count,
+                          stats_interval=args.stats_interval)
+    # On SIGTERM, stop serving, and write stats.json one last time.
+    # (shutdown waits for serve_forever to stop, so not in this thread.)
+    signal.signal(signal.SIGTERM,
+                  lambda signum, frame: threading.Thread(target=collector.shutdown).start())
+    print("log_calls.collector: listening on %s, writing to %s"
+          % (args.path, os.path.abspath(args.dir)), file=sys.stderr)
+    collector.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
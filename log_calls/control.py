@@ -0,0 +1,167 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+Control -- the process-wide control plane of the decorators, shared by
+log_calls, record_history and cache_calls as `log_calls.control`:
+switches that override the `enabled` and `mute` settings, and sample
+calls, of the decorated functions whose names match a glob pattern.
+
+    log_calls.control.enable('mypkg.db.*')        # log these, whatever their settings
+    log_calls.control.mute('*', log_calls.MUTE.ALL)
+    log_calls.control.sample('*.handle_*', 0.01)  # log 1 call in 100
+    log_calls.control.reset()                     # back to the settings
+
+A pattern matches a function if it matches its qualified name
+('module.qualname') or its qualname ('Class.method'). Each switch is a
+rule; of the rules that match a function, the last one of each kind wins.
+
+Every change bumps `epoch`. A wrapper compares it with the epoch it last
+saw, and only when they differ looks the function up in the rules again:
+so the switches cost one integer comparison per call.
+
+Sampling is deterministic: at rate r, a function's calls accrue r "credit"
+each, and the calls that bring it to 1 are logged (the rest run disabled:
+counted, not logged). Rate 0.25 logs calls 4, 8, 12, ...
+
+install_signal_handlers() lets an operator flip the switches of a running
+process: by default SIGUSR1 toggles verbose mode (everything enabled and
+unmuted), SIGUSR2 writes the stats of all decorated functions to stderr.
+"""
+import fnmatch
+import signal
+import sys
+import threading
+from collections import namedtuple
+
+__all__ = ['Control', 'ControlRule', 'ControlOverrides']
+
+
+ControlRule = namedtuple("ControlRule", ('kind', 'pattern', 'value'))   # kind: 'enabled', 'mute', 'sample'
+
+# What the rules say about one function: a value for each kind, or None
+ControlOverrides = namedtuple("ControlOverrides", ('enabled', 'mute', 'sample'))
+
+
+class Control():
+    """
+    >>> control = Control()
+    >>> control.overrides_for('pkg.mod.f', 'f') is None
+    True
+    >>> e = control.epoch
+    >>> control.enable('pkg.*')
+    >>> control.sample('f', 0.5)
+    >>> control.disable('pkg.mod.g')
+    >>> control.overrides_for('pkg.mod.f', 'f')
+    ControlOverrides(enabled=True, mute=None, sample=0.5)
+    >>> control.overrides_for('pkg.mod.g', 'g')
+    ControlOverrides(enabled=False, mute=None, sample=None)
+    >>> control.epoch - e
+    3
+    >>> control.verbose = True
+    >>> control.overrides_for('pkg.mod.g', 'g')
+    ControlOverrides(enabled=True, mute=False, sample=None)
+    """
+    def __init__(self, stats_text=None):
+        """stats_text: function returning the text that dump_stats writes"""
+        self.epoch = 0
+        self._rules = ()            # replaced, never mutated
+        self._verbose = False
+        self._lock = threading.RLock()     # a signal handler may need it
+        self._stats_text = stats_text
+        self._saved_handlers = {}   # signum |--> handler replaced
+
+    #----------------------------------------------------------------
+    # the switches
+    #----------------------------------------------------------------
+    def enable(self, pattern='*', enabled=True):
+        """Override the `enabled` setting of the functions matching pattern:
+        True, False, or an int (< 0, bypass)"""
+        self._add_rule('enabled', pattern, enabled)
+
+    def disable(self, pattern='*'):
+        self._add_rule('enabled', pattern, False)
+
+    def mute(self, pattern='*', mute=True):
+        """Override the `mute` setting of the functions matching pattern:
+        one of the MUTE constants (False unmutes)"""
+        self._add_rule('mute', pattern, mute)
+
+    def sample(self, pattern='*', rate=1.0):
+        """Log only the fraction `rate` of the enabled calls of the functions
+        matching pattern; rate=None stops sampling them"""
+        if rate is not None and not 0 <= rate <= 1:
+            raise ValueError("sample: rate must be between 0 and 1, not %r" % (rate,))
+        self._add_rule('sample', pattern, rate)
+
+    def reset(self):
+        """Remove all rules, and leave verbose mode"""
+        with self._lock:
+            self._rules = ()
+            self._verbose = False
+            self.epoch += 1
+
+    @property
+    def rules(self) -> tuple:
+        return self._rules
+
+    @property
+    def verbose(self) -> bool:
+        """True: every call of every function is logged (enabled, unmuted,
+        not sampled), whatever the rules say"""
+        return self._verbose
+
+    @verbose.setter
+    def verbose(self, value):
+        with self._lock:
+            self._verbose = bool(value)
+            self.epoch += 1
+
+    def _add_rule(self, kind, pattern, value):
+        with self._lock:
+            self._rules += (ControlRule(kind, pattern, value),)
+            self.epoch += 1
+
+    def overrides_for(self, *names):
+        """ControlOverrides for a function with these names, or None
+        if no rule matches any of them (and not verbose)."""
+        values = {}
+        for rule in self._rules:
+            if any(fnmatch.fnmatchcase(name, rule.pattern) for name in names):
+                values[rule.kind] = rule.value
+        if self._verbose:
+            values['enabled'] = True
+            values['mute'] = False
+            values['sample'] = None
+        if not values:
+            return None
+        return ControlOverrides(values.get('enabled'), values.get('mute'), values.get('sample'))
+
+    #----------------------------------------------------------------
+    # signals
+    #----------------------------------------------------------------
+    def dump_stats(self, file=None):
+        """Write the stats of all decorated functions to file (default: stderr)"""
+        if self._stats_text is not None:
+            print(self._stats_text(), file=file or sys.stderr, flush=True)
+
+    def install_signal_handlers(self, verbose_signal='SIGUSR1', dump_signal='SIGUSR2'):
+        """Handle verbose_signal by toggling verbose mode, dump_signal by
+        dump_stats(). Either can be None, for no handler. Call from the main
+        thread. Does nothing on platforms without these signals (Windows)."""
+        for signame, handler in ((verbose_signal, self._toggle_verbose),
+                                 (dump_signal, self._dump_stats)):
+            signum = getattr(signal, signame, None) if signame else None
+            if signum is not None:
+                self._saved_handlers.setdefault(signum, signal.getsignal(signum))
+                signal.signal(signum, handler)
+
+    def uninstall_signal_handlers(self):
+        """Restore the handlers that install_signal_handlers replaced"""
+        for signum, handler in self._saved_handlers.items():
+            signal.signal(signum, handler)
+        self._saved_handlers.clear()
+
+    def _toggle_verbose(self, signum, frame):
+        self.verbose = not self._verbose
+
+    def _dump_stats(self, signum, frame):
+        self.dump_stats()
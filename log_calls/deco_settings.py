@@ -49,6 +49,7 @@ by the keyword 'enable_' of the decorated function.
 """
 from collections import OrderedDict, defaultdict
 import pprint
+import weakref
 
 import warnings     # v0.3.0b23
 
@@ -58,6 +59,55 @@ from .helpers import is_keyword_param, is_quoted_str
 __all__ = ['DecoSetting', 'DecoSettingsMapping']
 
 
+#----------------------------------------------------------------------------
+# Sharing identical settings dicts
+#----------------------------------------------------------------------------
+
+class SharedDict(dict):
+    """A dict that can be weakly referenced, so that it can be shared
+    (see share_dict). Treat it as read-only: copy it before making changes."""
+    __slots__ = ('__weakref__',)
+
+
+# (type of dict, tuple of (key, type(value), value) items) |-> shared dict
+_shared_dicts = weakref.WeakValueDictionary()
+
+# 0.3.2 (deco class, tuple of (key, type(value), value) items of the values
+# a DecoSettingsMapping was made from) |-> its shared tagged values.
+# Cleared when defaults change: a value of the wrong type becomes the default.
+_tagged_values_by_values = weakref.WeakValueDictionary()
+
+def share_dict(d, dict_type=SharedDict):
+    """Return a dict_type object equal to d, item for item and in the same order
+    -- the same object for all equal d's that are alive at the same time.
+    dict_type must be weakly referenceable (SharedDict, OrderedDict).
+    If any value of d is unhashable, just return dict_type(d).
+
+    Decorating a class or module creates a decorator per function, each
+    with a few settings dicts -- almost always identical ones.
+    The returned dict is shared: treat it as read-only (copy on write).
+
+    >>> a = share_dict({'x': 1, 'y': 'why'})
+    >>> b = share_dict({'x': 1, 'y': 'why'})
+    >>> a is b, a == {'x': 1, 'y': 'why'}
+    (True, True)
+    >>> share_dict({'x': True, 'y': 'why'}) is a     # values differ in type
+    False
+    >>> share_dict({'x': []}) is share_dict({'x': []})
+    False
+    """
+    try:
+        key = (dict_type, tuple((k, type(v), v) for k, v in d.items()))
+        hash(key)
+    except TypeError:
+        return dict_type(d)
+    shared = _shared_dicts.get(key)
+    if shared is None:
+        shared = dict_type(d)
+        _shared_dicts[key] = shared
+    return shared
+
+
 #----------------------------------------------------------------------------
 # DecoSetting & basic subclasses
 #----------------------------------------------------------------------------
@@ -74,6 +124,8 @@ class DecoSetting():
     Callers can add additional fields by passing additional keyword args.
     The additional fields/keys & values are made attributes of this object,
     and a (sorted) list of the keys is saved (_user_attrs).
+    (There are few DecoSetting objects, one per setting per decorator class;
+    __slots__ are for uniformity with the per-function objects.)
 
     Subclasses can supply a pre_call_handler method
     returning str or empty:
@@ -81,12 +133,14 @@ class DecoSetting():
             return ("%s <== called by %s"
                     % (context['output_fname'],
                        ' <== '.join(context['call_list'])))
-    context contains these keys:
+    context, a CallContext (a mapping -- see call_context.py),
+    contains these keys:
         decorator
         settings      # of decorator
         indent
         prefixed_fname
         output_fname
+        call_num      # num_calls_logged of decorator when the call began
         fparams
         argcount
         argnames      # len = argcount
@@ -111,6 +165,12 @@ class DecoSetting():
         timestamp
         retval
     """
+    __slots__ = ('name', 'final_type', 'default',
+                 'allow_falsy', 'allow_indirect', 'mutable', 'visible',
+                 'pseudo_setting', 'indirect_default',
+                 '_user_attrs',
+                 '__dict__')    # for the additional fields
+
     def __init__(self, name, final_type, default, *,
                  allow_falsy, allow_indirect=True, mutable=True, visible=True,
                  pseudo_setting=False,  # v0.3.0b24
@@ -134,7 +194,8 @@ class DecoSetting():
         # so even though more_attributes isn't ordered,
         # we need to pick an order & stick to it
         self._user_attrs = sorted(list(more_attributes))
-        self.__dict__.update(more_attributes)
+        if more_attributes:
+            self.__dict__.update(more_attributes)
 
     def __repr__(self):
         if isinstance(self.final_type, tuple):      # it's a tuple of types
@@ -150,7 +211,7 @@ class DecoSetting():
         )
         # append user attrs
         for attr in self._user_attrs:
-            output += ", %s=%r" % (attr, self.__dict__[attr])
+            output += ", %s=%r" % (attr, getattr(self, attr))
 
         output += ")"
         return output
@@ -163,11 +224,18 @@ class DecoSetting():
     def has_acceptable_type(self, value):
         return isinstance(value, self.final_type)
 
+    def check_value(self, value):
+        """0.3.2 Virtual method: raise ValueError if value, a direct value
+        being assigned to the setting, is malformed. Default: accept it."""
+        pass
+
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 # DecoSetting subclasses
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 class DecoSetting_bool(DecoSetting):
+    __slots__ = ()
+
     def value_from_str(self, s):
         """Virtual method for use by _deco_base._read_settings_file.
         0.2.4.post1"""
@@ -178,6 +246,8 @@ class DecoSetting_bool(DecoSetting):
 
 
 class DecoSetting_int(DecoSetting):
+    __slots__ = ()
+
     def value_from_str(self, s):
         """Virtual method for use by _deco_base._read_settings_file.
         0.2.4.post1"""
@@ -187,7 +257,21 @@ class DecoSetting_int(DecoSetting):
             return super().value_from_str(s)
 
 
+class DecoSetting_float(DecoSetting):
+    """0.3.2 A number: final_type should be (int, float)"""
+    __slots__ = ()
+
+    def value_from_str(self, s):
+        """Virtual method for use by _deco_base._read_settings_file."""
+        try:
+            return float(s)
+        except ValueError:
+            return super().value_from_str(s)
+
+
 class DecoSetting_str(DecoSetting):
+    __slots__ = ()
+
     def value_from_str(self, s):
         """Virtual method for use by _deco_base._read_settings_file.
         s must be enclosed in quotes (the same one on each end!)
@@ -203,7 +287,14 @@ class DecoSetting_str(DecoSetting):
 class DecoSettingsMapping():
     """Usable with any class-based decorator that wants to implement
     a mapping interface and attribute interface for its keyword params,
-    as well as 'direct' and 'indirect' values for its keyword params"""
+    as well as 'direct' and 'indirect' values for its keyword params
+
+    The OrderedDict of (tagged) values is shared among all mappings of the
+    same deco class with identical values (see share_dict), and is copied
+    the first time a value is changed."""
+    __slots__ = ('deco_class', '_tagged_values_dict', '_tagged_values_shared',
+                 '__dict__')    # users can add attributes; made only if they do
+
     # Class-level mapping: classname |-> OrderedDict of class's settings (info 'structs')
     _classname2SettingsData_dict = {}
     _classname2SettingsDataOrigDefaults_dict = {}
@@ -324,6 +415,7 @@ class DecoSettingsMapping():
                ):
                 # set working default value = new_default_val
                 deco_setting.default = new_default_val
+        _tagged_values_by_values.clear()
 
     @classmethod
     def reset_defaults(cls, deco_classname):
@@ -334,6 +426,7 @@ class DecoSettingsMapping():
         settings_map = cls._classname2SettingsData_dict[deco_classname]
         for name in settings_map:
             settings_map[name].default = orig_defaults[name]
+        _tagged_values_by_values.clear()
 
     # <<<attributes>>>
     @classmethod
@@ -416,15 +509,36 @@ class DecoSettingsMapping():
         self.deco_class = deco_class
         class_settings_dict = self._deco_class_settings_dict
 
+        # 0.3.2 Mappings made from the same values (e.g. by the decorators
+        # of the methods of a class) share the same tagged values:
+        # if some alive mapping was made from these values, just share its
+        try:
+            values_key = (deco_class,
+                          tuple((k, type(values_dict[k]), values_dict[k])
+                                for k in class_settings_dict if k in values_dict))
+            tagged_values = _tagged_values_by_values.get(values_key)
+        except TypeError:       # unhashable value
+            values_key = tagged_values = None
+        if tagged_values is not None:
+            self._tagged_values_dict = tagged_values
+            self._tagged_values_shared = True
+            return
+
         # Insert values in the proper order - as given by caller,
         # both visible and not visible ones.
         self._tagged_values_dict = OrderedDict()    # stores pairs inserted by __setitem__
+        self._tagged_values_shared = False
         for k in class_settings_dict:
             if k in values_dict:                    # allow k to be set later
                 self.__setitem__(k, values_dict[k],
                                  info=class_settings_dict[k],
                                  _force_mutable=True,
                                  _force_visible=True)
+        # Share with other mappings having the same values; copy on write
+        self._tagged_values_dict = share_dict(self._tagged_values_dict, OrderedDict)
+        self._tagged_values_shared = True
+        if values_key is not None:
+            _tagged_values_by_values[values_key] = self._tagged_values_dict
 
     def registered_class_settings_repr(self) -> str:
         list_of_settingsinfo_reprs = []
@@ -481,6 +595,11 @@ class DecoSettingsMapping():
         if not info.mutable and not _force_mutable: # and key in self._tagged_values_dict:
             raise ValueError("%s' is write-once (current value: %r)"
                              % (key, self._tagged_values_dict[key][1]))
+        # copy on write
+        if self._tagged_values_shared:
+            self._tagged_values_dict = OrderedDict(self._tagged_values_dict)
+            self._tagged_values_shared = False
+
         if not allow_indirect:
             self._tagged_values_dict[key] = False, value
             return
@@ -508,6 +627,8 @@ class DecoSettingsMapping():
                 if indirect:
                     value = value[:-1]
 
+        if not indirect and value:
+            info.check_value(value)     # 0.3.2
         self._tagged_values_dict[key] = indirect, value
 
     def __getitem__(self, key):
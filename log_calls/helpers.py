@@ -12,10 +12,13 @@ __all__ = [
 
     'is_quoted_str',
     'dict_to_sorted_str',
+    'make_token_sequence',
 ]
 
 from collections import OrderedDict
+import fnmatch
 import inspect
+import re
 
 
 
@@ -321,6 +324,22 @@ def is_quoted_str(s):
     return isinstance(s, str) and len(s) >= 2 and s[0] == s[-1] and s[0] in QUOTES
 
 
+def make_token_sequence(names) -> tuple:
+    """names is either a string of space- and/or comma-separated umm tokens,
+    or is already a sequence of tokens.
+    Return tuple of tokens.
+    >>> make_token_sequence('x y, z')
+    ('x', 'y', 'z')
+    >>> make_token_sequence(['a.*', 'b'])
+    ('a.*', 'b')
+    >>> make_token_sequence(())
+    ()
+    """
+    if isinstance(names, str):
+        names = names.replace(',', ' ').split()
+    return tuple(map(str, names))
+
+
 # match using match_fn(x, pattern).
 def any_match(match_fn, seq, patterns):
     """Return True if match_fn(s, pat) is true for some (s, pat) in seq x patterns
@@ -359,6 +378,60 @@ def any_match(match_fn, seq, patterns):
         for pat in patterns
     )
 
+
+class GlobMatcher():
+    """Matches names against a fixed collection of glob patterns,
+    with the semantics of fnmatch.fnmatchcase, but compiled once:
+    patterns without wildcards or character ranges go into a set
+    (O(1) lookup); the others are translated and joined into a single regex.
+    So
+        GlobMatcher(patterns).any_match(names)
+    equals
+        any_match(fnmatch.fnmatchcase, names, patterns)
+    but is much cheaper when used repeatedly.
+
+    >>> m = GlobMatcher(('pair', 'P.*.getter', 'x[0-9]'))
+    >>> m.literals, bool(m)
+    (frozenset({'pair'}), True)
+    >>> m.any_match(('Q.pair', 'pair.getter'))
+    False
+    >>> m.any_match(('P.pair', 'P.pair.getter'))
+    True
+    >>> m.any_match(iter(['x1'])), m.any_match(['x10']), m.any_match(['X1'])
+    (True, False, False)
+    >>> m.match('pair')
+    True
+    >>> bool(GlobMatcher(())), GlobMatcher(()).any_match(('anything',))
+    (False, False)
+    """
+    __slots__ = ('literals', '_regex_match')
+
+    def __init__(self, patterns):
+        literals = set()
+        globs = []
+        for pat in patterns:
+            if any(c in pat for c in '*?['):
+                globs.append(pat)
+            else:
+                literals.add(pat)
+        self.literals = frozenset(literals)
+        self._regex_match = (
+            re.compile('|'.join(fnmatch.translate(pat) for pat in globs)).match
+            if globs else None
+        )
+
+    def __bool__(self):
+        return bool(self.literals) or self._regex_match is not None
+
+    def match(self, name) -> bool:
+        if name in self.literals:
+            return True
+        return self._regex_match is not None and self._regex_match(name) is not None
+
+    def any_match(self, names) -> bool:
+        match = self.match
+        return any(match(name) for name in names)
+
 #############################################################################
 
 if __name__ == "__main__":
@@ -0,0 +1,186 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+Lazy, import-time decoration of modules, for
+    log_calls.instrument_on_import(modules, **setting_kwds)
+    record_history.instrument_on_import(...)
+
+DecoratingFinder is a sys.meta_path finder. For every module whose name matches
+one of its glob patterns, it delegates the actual finding & loading to the
+other finders on sys.meta_path, and when the module has been executed it calls
+    deco_class.decorate_module(mod, lazy=True, **setting_kwds)
+
+Lazy decoration: instead of wrapping every function and walking every class
+of a module when it's imported, decorate_module(..., lazy=True) installs
+cheap placeholders:
+    * each function is replaced by a stub which, when first called,
+      decorates the function, rebinds its name in the module to the wrapper,
+      and from then on just delegates to the wrapper;
+    * each class gets a temporary __new__ which, when the class is first
+      instantiated, removes itself and decorates the class.
+Thus a module pays for decoration only for what actually gets used.
+"""
+import sys
+import importlib.abc
+from functools import wraps
+
+from .helpers import GlobMatcher
+
+
+__all__ = ['DecoratingFinder']
+
+
+#-----------------------------------------------------------------------------
+# lazily decorated functions & classes
+#-----------------------------------------------------------------------------
+def make_lazy_function(deco_class, f, namespace: dict, setting_kwds: dict):
+    """Return a stub for function f. On its first call, the stub decorates f
+    with deco_class(**setting_kwds), replaces the stub in namespace
+    (the __dict__ of f's module) with the decorated function, and thereafter
+    delegates to it. The attributes of the wrapper (``stats``,
+    ``log_calls_settings`` etc.) are copied onto the stub, so references
+    to the stub obtained before its first call (``from mod import f``)
+    remain usable.
+    """
+    wrapper = None
+
+    @wraps(f)
+    def _deco_lazy_function_stub_(*args, **kwargs):
+        nonlocal wrapper
+        if wrapper is None:
+            wrapper = deco_class(**setting_kwds)(f)
+            if namespace.get(f.__name__) is _deco_lazy_function_stub_:
+                namespace[f.__name__] = wrapper
+            _deco_lazy_function_stub_.__dict__.update(wrapper.__dict__)
+        return wrapper(*args, **kwargs)
+
+    return _deco_lazy_function_stub_
+
+
+def _make_lazy_class_new(deco_class, klass, setting_kwds: dict):
+    """Return a function to serve as klass's temporary __new__ (see below)."""
+    own_new = klass.__dict__.get('__new__')
+    done = False
+
+    def _deco_lazy_class_new_(cls, *args, **kwargs):
+        nonlocal done
+        if not done:
+            done = True
+            if own_new is None:
+                delattr(klass, '__new__')
+            else:
+                setattr(klass, '__new__', own_new)
+            deco_class(**setting_kwds)(klass)
+        new = klass.__new__
+        if new is object.__new__:
+            return object.__new__(cls)
+        return new(cls, *args, **kwargs)
+
+    return _deco_lazy_class_new_
+
+
+def install_lazy_class_deco(deco_class, klass, setting_kwds: dict) -> None:
+    """Give klass a temporary __new__ which, when klass is first instantiated,
+    restores klass's own __new__ (if any), decorates klass with
+    deco_class(**setting_kwds), and then creates the instance.
+    """
+    try:
+        setattr(klass, '__new__',
+                staticmethod(_make_lazy_class_new(deco_class, klass, setting_kwds)))
+    except TypeError:
+        # builtin/extension type: can't deco anyway
+        pass
+
+
+# Code objects of the placeholders above. Their frames sit between
+# a caller and a (just-)decorated callable only on the first call,
+# and call_chain_to_next_log_calls_fn skips them.
+LAZY_STUB_CODE = make_lazy_function(None, make_lazy_function, {}, {}).__code__
+LAZY_NEW_CODE = _make_lazy_class_new(None, object, {}).__code__
+
+
+#-----------------------------------------------------------------------------
+# DecoratingFinder, _DecoratingLoader
+#-----------------------------------------------------------------------------
+class _DecoratingLoader(importlib.abc.Loader):
+    """Wraps the loader of a module matched by a DecoratingFinder.
+    Loading is delegated to the original loader; once the module has been
+    executed, the finder decorates it. Any other attribute requests
+    (get_resource_reader, is_package, ...) are passed through."""
+    def __init__(self, loader, finder):
+        self._loader = loader
+        self._finder = finder
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._loader.exec_module(module)
+        self._finder.decorate(module)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class DecoratingFinder(importlib.abc.MetaPathFinder):
+    """sys.meta_path finder installed by ``<deco_class>.instrument_on_import``.
+    Modules whose (full) names match any of `patterns` (globs, matched with
+    fnmatch.fnmatchcase as for `omit` and `only`) are decorated lazily
+    with deco_class and setting_kwds, as they're imported.
+
+    Modules already imported when the finder is installed are not affected.
+    Modules of log_calls itself are never decorated.
+    """
+    def __init__(self, deco_class, patterns: tuple,
+                 functions=True, classes=True, **setting_kwds):
+        self.deco_class = deco_class
+        self.patterns = patterns
+        self._matcher = GlobMatcher(patterns)
+        self.functions = functions
+        self.classes = classes
+        self.setting_kwds = setting_kwds
+        self.decorated = []     # names of modules decorated, in order
+
+    def matches(self, fullname: str) -> bool:
+        if fullname == 'log_calls' or fullname.startswith('log_calls.'):
+            return False
+        return self._matcher.match(fullname)
+
+    def find_spec(self, fullname, path, target=None):
+        if not self.matches(fullname):
+            return None
+        # Let the other finders find it
+        for finder in sys.meta_path:
+            if finder is self or isinstance(finder, DecoratingFinder):
+                continue
+            find_spec = getattr(finder, 'find_spec', None)
+            if not find_spec:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is None or not hasattr(spec.loader, 'exec_module'):
+            return spec     # namespace package, or legacy loader
+        spec.loader = _DecoratingLoader(spec.loader, self)
+        return spec
+
+    def decorate(self, module):
+        self.deco_class.decorate_module(module,
+                                        functions=self.functions,
+                                        classes=self.classes,
+                                        lazy=True,
+                                        **self.setting_kwds)
+        self.decorated.append(module.__name__)
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self):
+        """Remove this finder from sys.meta_path. Modules it already
+        decorated stay decorated."""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
@@ -0,0 +1,123 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+The `format='jsonl'` output mode: instead of the indented lines of text,
+`log_calls` writes one JSON object per completed call, on one line,
+to the usual destination (`file` or `logger`):
+
+    {"function":"f","call_num":3,"caller_chain":["g","<module>"],"depth":1,
+     "timestamp":1500000000.0,"elapsed_secs":0.25,"process_secs":0.125,
+     "args":{"a":"1","*args":"(2, 3)"},"defaults":{"b":"2"},"retval":"6",
+     "exception":null}
+
+(shown here on three lines). As in the 'arguments:' and 'defaults:' lines
+of text output, "args" holds the arguments passed, and "defaults" the
+keyword parameters that took their default values. Argument values, the
+return value and the exception are bounded reprs (see bounded_repr);
+"args" and "defaults" are null unless log_args is true, "retval" is null
+unless log_retval is true, and
+"exception" is null unless the call raised -- in which case "retval"
+is null too. Messages written by `log_calls.print` and `print_exprs`
+become objects with a "message" field in place of the call fields.
+
+A JsonlEncoder, one per decorated function, keeps what doesn't change
+from call to call -- the head of the object, with the function's name,
+and the encoded names of its parameters -- so those are encoded once.
+"""
+import json.encoder
+import reprlib
+import textwrap
+
+__all__ = ['MAXLEN_REPR', 'bounded_repr', 'JsonlEncoder']
+
+
+MAXLEN_REPR = 200       # of strings, numbers and other objects
+
+_repr = reprlib.Repr()
+_repr.maxstring = _repr.maxlong = _repr.maxother = MAXLEN_REPR
+_repr.maxlist = _repr.maxtuple = _repr.maxset = _repr.maxfrozenset = 20
+_repr.maxdeque = _repr.maxarray = 20
+_repr.maxdict = 10
+
+
+def bounded_repr(obj) -> str:
+    """repr of obj, abbreviated with '...' if long or deeply nested.
+    (An object whose __repr__ raises gets '<classname instance at 0x...>'.)
+
+    >>> bounded_repr(list(range(100)))
+    '[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, ...]'
+    >>> len(bounded_repr('x' * 1000)) <= MAXLEN_REPR
+    True
+    """
+    return _repr.repr(obj)
+
+
+_str = json.encoder.encode_basestring      # str -> JSON string literal
+
+
+class JsonlEncoder():
+    """Encodes the calls of one function, and the messages written
+    during them, as JSON objects (str, one line each).
+
+    >>> enc = JsonlEncoder(('a', 'b'))
+    >>> enc.encode_call('f', 3, ('g', '<module>'), 1, 1.5e9, 0.25, 0.125,
+    ...                 args=[('a', 1), ('*args', (2, 3))], defaults=[('b', 2)],
+    ...                 retval_repr='6')
+    '{"function":"f","call_num":3,"caller_chain":["g","<module>"],"depth":1,"timestamp":1500000000.0,"elapsed_secs":0.25,"process_secs":0.125,"args":{"a":"1","*args":"(2, 3)"},"defaults":{"b":"2"},"retval":"6","exception":null}'
+    >>> enc.encode_message('f', 3, 1, '    x = 1\\n    y = 2')
+    '{"function":"f","call_num":3,"depth":1,"message":"x = 1\\\\ny = 2"}'
+    """
+    __slots__ = ('_fname', '_head', '_keys')
+
+    def __init__(self, param_names=()):
+        # '"name":' for each parameter name (others are encoded as needed)
+        self._keys = {name: _str(name) + ':' for name in param_names}
+        self._fname = None
+        self._head = ''
+
+    def _head_for(self, fname) -> str:
+        # The prefixed name can change (prefix is mutable); re-encode if so
+        if fname != self._fname:
+            self._head = '{"function":%s,"call_num":' % _str(fname)
+            self._fname = fname
+        return self._head
+
+    def encode_call(self, fname, call_num, caller_chain, depth,
+                    timestamp, elapsed_secs, process_secs,
+                    args=None, retval_repr=None, exception_repr=None,
+                    defaults=None) -> str:
+        """args, defaults: None, or a sequence of (name, value) pairs
+        (defaults: None is {} if args isn't None).
+        retval_repr, exception_repr: None, or a str (see bounded_repr).
+        elapsed_secs, process_secs: None if not measured."""
+        if args is None:
+            args_json = defaults_json = 'null'
+        else:
+            args_json = self._encode_pairs(args)
+            defaults_json = self._encode_pairs(defaults) if defaults else '{}'
+        return ''.join((
+            self._head_for(fname), str(call_num),
+            ',"caller_chain":[', ','.join(map(_str, caller_chain)),
+            '],"depth":', str(depth),
+            ',"timestamp":', repr(timestamp),
+            ',"elapsed_secs":', 'null' if elapsed_secs is None else repr(elapsed_secs),
+            ',"process_secs":', 'null' if process_secs is None else repr(process_secs),
+            ',"args":', args_json,
+            ',"defaults":', defaults_json,
+            ',"retval":', 'null' if retval_repr is None else _str(retval_repr),
+            ',"exception":', 'null' if exception_repr is None else _str(exception_repr),
+            '}'))
+
+    def _encode_pairs(self, pairs) -> str:
+        keys = self._keys
+        return '{%s}' % ','.join(
+            [(keys.get(name) or _str(name) + ':') + _str(bounded_repr(val))
+             for name, val in pairs])
+
+    def encode_message(self, fname, call_num, depth, msg) -> str:
+        """msg: text written by log_calls.print & co. during a call,
+        as indented for text output (the indentation is removed)."""
+        return ''.join((
+            self._head_for(fname), str(call_num),
+            ',"depth":', str(depth),
+            ',"message":', _str(textwrap.dedent(msg)),
+            '}'))
@@ -14,6 +14,7 @@ with changes for Py3 and several enhancements, as described in docs/log_calls.md
 """
 from log_calls.version import __version__
 import inspect
+import contextvars
 import functools
 from functools import wraps, partial
 import logging
@@ -22,30 +23,51 @@ import os
 import io   # so we can refer to io.TextIOBase
 import time
 import datetime
+import importlib
+import atexit
+import pkgutil
+import threading
+import weakref
+from bisect import bisect_left
 from collections import namedtuple, deque, OrderedDict
 
 # 0.3.0b23
 from reprlib import recursive_repr
 
-import fnmatch  # 0.3.0 for omit, only
 
 from .deco_settings import (DecoSetting,
                             DecoSetting_bool, DecoSetting_int, DecoSetting_str,
-                            DecoSettingsMapping)
-from .helpers import (no_duplicates, get_args_pos, get_args_kwargs_param_names,
-                      difference_update, restrict_keys,
-                      get_defaulted_kwargs_OD, get_explicit_kwargs_OD,
+                            DecoSetting_float,
+                            DecoSettingsMapping, share_dict)
+from .helpers import (no_duplicates, get_args_kwargs_param_names, restrict_keys,
                       get_file_of_object,
                       dict_to_sorted_str, prefix_multiline_str,
-                      is_quoted_str, any_match)
+                      is_quoted_str, make_token_sequence,
+                      GlobMatcher)
 from .proxy_descriptors import ClassInstanceAttrProxy
+from .call_context import CallContext
+from .shared_stats import SharedStats, FuncStats
+from .sink import get_sink, parse_sink_url, args_digest
+from .metrics import ELAPSED_BUCKET_BOUNDS, FuncMetrics, render_metrics, MetricsServer
+from .jsonl import JsonlEncoder, bounded_repr
+from .resources import memory_start, memory_end, resources_start, resources_end
+from .size_profile import SizeProfile
+from .call_cache import CACHE_MISS
+from .settings_files import file_signature, env_settings_items, SettingsWatcher
+from .control import Control
+from .output_limits import OutputLimiter
+from .tracing import Tracer
 from .used_unused_kwds import used_unused_keywords
+from .import_hook import (DecoratingFinder,
+                          make_lazy_function, install_lazy_class_deco,
+                          LAZY_STUB_CODE, LAZY_NEW_CODE)
 
-__all__ = ['log_calls', 'CallRecord', '__version__', '__author__']
+__all__ = ['log_calls', 'CallRecord', 'ModuleDecoration', '__version__', '__author__']
 
 #-----------------------------------------------------------------------------
 # DecoSetting subclasses with pre-call handlers.
-# The `context` arg for pre_call_handler methods has these keys:
+# The `context` arg for pre_call_handler methods is a CallContext,
+# a mapping (see call_context.py) which has these keys:
 #     decorator
 #     settings              # self._deco_settings     (of decorator)
 #     stats                 # self._stats             ("      "    )
@@ -56,6 +78,7 @@ __all__ = ['log_calls', 'CallRecord', '__version__', '__author__']
 #     kwargs
 #     indent
 #     output_fname          # prefixed_fname + possibly num_calls_logged (if log_call_numbers true)
+#     call_num              # num_calls_logged when the call began
 #
 #     argcount
 #     argnames              # argcount-long
@@ -77,16 +100,18 @@ __all__ = ['log_calls', 'CallRecord', '__version__', '__author__']
 #  .        as they're "live" and altering them could cause confusion/chaos/weirdness/crashes.
 
 class DecoSettingEnabled(DecoSetting_int):
+    __slots__ = ()
+
     def __init__(self, name, **kwargs):
         # v0.3.0b25 Let's try default=True, see what tests break.
         #           It sucks having the real default be False.
         # super().__init__(name, int, False, allow_falsy=True, **kwargs)
         super().__init__(name, int, True, allow_falsy=True, **kwargs)
 
-    def pre_call_handler(self, context):
+    def pre_call_handler(self, context: CallContext):
         return ("%s <== called by %s"
-                % (context['output_fname'],
-                   ' <== '.join(context['call_list'])))
+                % (context.output_fname,
+                   ' <== '.join(context.call_list)))
 
     def value_from_str(self, s):
         """Virtual method for use by _deco_base._read_settings_file.
@@ -94,6 +119,9 @@ class DecoSettingEnabled(DecoSetting_int):
         try:
             return int(s)
         except ValueError:
+            # 0.3.2 bool('False') is True
+            if s.upper() in ('TRUE', 'FALSE'):
+                return s.upper() == 'TRUE'
             try:
                 return bool(s)
             except ValueError:
@@ -101,6 +129,8 @@ class DecoSettingEnabled(DecoSetting_int):
 
 
 class DecoSettingArgs(DecoSetting_bool):
+    __slots__ = ()
+
     def __init__(self, name, **kwargs):
         super().__init__(name, bool, True, allow_falsy=True, **kwargs)
 
@@ -108,9 +138,9 @@ class DecoSettingArgs(DecoSetting_bool):
     def _get_all_ids_of_instances_in_progress(context, *, skipframes):
         in_progress = set()
         # First, deal with wrapper/the function it wraps
-        deco = context['decorator']
+        deco = context.decorator
         if deco.f.__name__ == '__init__' and deco._classname_of_f:
-            argvals = context['argvals']
+            argvals = context.argvals
             if argvals and not inspect.isclass(argvals[0]):  # not interested in metaclass __init__
                 in_progress.add(id(argvals[0]))
 
@@ -139,17 +169,17 @@ class DecoSettingArgs(DecoSetting_bool):
             frame = frame.f_back
         return in_progress
 
-    def pre_call_handler(self, context: dict):
+    def pre_call_handler(self, context: CallContext):
         """Alert:
         this class's handler knows the keyword of another handler (args_sep),
         # whereas it shouldn't even know its own (it should use self.name)"""
-        if not context['fparams']:
+        if not context.fparams:
             return None
 
         # Make msg
-        args_sep = context['settings'].get_final_value(
-                    'args_sep', context['kwargs'], fparams=context['fparams'])
-        indent = context['indent']
+        args_sep = context.settings.get_final_value(
+                    'args_sep', context.kwargs, fparams=context.fparams)
+        indent = context.indent
 
         # ~Kludge / incomplete treatment of seps that contain \n
         end_args_line = ''
@@ -190,15 +220,15 @@ class DecoSettingArgs(DecoSetting_bool):
 
             return arg_eq_val_strs
 
-        args_vals = list(zip(context['argnames'], context['argvals']))
+        args_vals = list(zip(context.argnames, context.argvals))
 
-        if context['varargs']:
-            args_vals.append( ("*%s" % context['varargs_name'], context['varargs']) )
+        if context.varargs:
+            args_vals.append( ("*%s" % context.varargs_name, context.varargs) )
 
-        args_vals.extend( context['explicit_kwargs'].items() )
+        args_vals.extend( context.explicit_kwargs.items() )
 
-        if context['implicit_kwargs']:
-            args_vals.append( ("**%s" % context['kwargs_name'], context['implicit_kwargs']) )
+        if context.implicit_kwargs:
+            args_vals.append( ("**%s" % context.kwargs_name, context.implicit_kwargs) )
 
         if args_vals:
             msg += args_sep.join(
@@ -210,10 +240,10 @@ class DecoSettingArgs(DecoSetting_bool):
         # are NOT in implicit_kwargs, and their vals are defaults
         # of those parameters. Write these on a separate line.
         # Don't just print the OrderedDict -- cluttered appearance.
-        if context['defaulted_kwargs']:
+        if context.defaulted_kwargs:
             msg += ('\n' + indent + "defaults:  " + end_args_line
                     + args_sep.join(
-                        map_to_arg_eq_val_strs(context['defaulted_kwargs'].items()))
+                        map_to_arg_eq_val_strs(context.defaulted_kwargs.items()))
             )
 
         return msg
@@ -229,57 +259,157 @@ class DecoSettingArgs(DecoSetting_bool):
 #-----------------------------------------------------------------------------
 
 class DecoSettingRetval(DecoSetting_bool):
+    __slots__ = ()
+
     MAXLEN_RETVALS = 77
 
     def __init__(self, name, **kwargs):
         super().__init__(name, bool, False, allow_falsy=True, **kwargs)
 
-    def post_call_handler(self, context: dict):
-        retval_str = str(context['retval'])
+    def post_call_handler(self, context: CallContext):
+        retval_str = str(context.retval)
         if len(retval_str) > self.MAXLEN_RETVALS:
             retval_str = retval_str[:self.MAXLEN_RETVALS] + "..."
-        return (context['indent'] +
-                "%s return value: %s" % (context['output_fname'], retval_str))
+        return (context.indent +
+                "%s return value: %s" % (context.output_fname, retval_str))
 
 
 class DecoSettingElapsed(DecoSetting_bool):
+    __slots__ = ()
+
     def __init__(self, name, **kwargs):
         super().__init__(name, bool, False, allow_falsy=True, **kwargs)
 
-    def post_call_handler(self, context: dict):
-        return (context['indent'] +
-                "elapsed time: %f [secs], process time: %f [secs]"
-                % (context['elapsed_secs'], context['process_secs']))
+    def post_call_handler(self, context: CallContext):
+        # 0.3.2 Only the times that the `clocks` setting measured:
+        # process_secs is process or thread time
+        times = []
+        if context.elapsed_secs is not None:
+            times.append("elapsed time: %f [secs]" % context.elapsed_secs)
+        if context.process_secs is not None:
+            times.append("%s time: %f [secs]"
+                         % ('thread' if context.final_value('clocks') == 'thread' else 'process',
+                            context.process_secs))
+        return (context.indent + ', '.join(times)) if times else None
+
+
+# 0.3.2
+class DecoSettingMemory(DecoSetting_bool):
+    """The wrapper probes the call (see resources.py); this reports it."""
+    __slots__ = ()
+
+    def __init__(self, name, **kwargs):
+        super().__init__(name, bool, False, allow_falsy=True, **kwargs)
+
+    def post_call_handler(self, context: CallContext):
+        usage = context.memory
+        if usage is None:
+            return None
+        parts = []
+        if usage.alloc_bytes is not None:
+            parts.append("allocated: %+d bytes, peak: +%d bytes"
+                         % (usage.alloc_bytes, usage.peak_bytes))
+        parts.append("gc collections: %d (%f [secs])"
+                     % (usage.gc_collections, usage.gc_secs))
+        return context.indent + "memory: " + ', '.join(parts)
+
+
+# 0.3.2
+class DecoSettingResources(DecoSetting_bool):
+    """The wrapper probes the call (see resources.py); this reports it."""
+    __slots__ = ()
+
+    def __init__(self, name, **kwargs):
+        super().__init__(name, bool, False, allow_falsy=True, **kwargs)
+
+    def post_call_handler(self, context: CallContext):
+        usage = context.resources
+        if usage is None:       # no getrusage here
+            return None
+        return (context.indent +
+                "resources: context switches: %d voluntary, %d involuntary; "
+                "block I/O: %d in, %d out" % usage)
 
 
 class DecoSettingExit(DecoSetting_bool):
+    __slots__ = ()
+
     def __init__(self, name, **kwargs):
         super().__init__(name, bool, True, allow_falsy=True, **kwargs)
 
-    def post_call_handler(self, context: dict):
+    def post_call_handler(self, context: CallContext):
         return ("%s ==> returning to %s"
-                   % (context['output_fname'],
-                      ' ==> '.join(context['call_list'])))
+                   % (context.output_fname,
+                      ' ==> '.join(context.call_list)))
+
+
+# 0.3.2
+class DecoSettingSizeOf(DecoSetting):
+    """Value: the name of a parameter, whose argument is the size of
+    the input of a call (if it's a number) or has it (its len()); or a
+    callable, which is passed the call's arguments and returns the size.
+    Adds the call to the function's stats.size_profile (see size_profile.py),
+    even when it's muted, and gives it the `size` for its history record."""
+    __slots__ = ()
+
+    def __init__(self, name, **kwargs):
+        super().__init__(name, (str, object), None, allow_falsy=True, **kwargs)
+
+    def has_acceptable_type(self, value):
+        return value is None or isinstance(value, str) or callable(value)
+
+    def post_call_handler(self, context: CallContext):
+        size = context.size = self._size(context)
+        if size is not None and context.elapsed_secs is not None:
+            context.decorator._add_to_size_profile(size, context.elapsed_secs)
+        return None
+
+    def _size(self, context):
+        """The size of the call's input, or None if it can't be had:
+        the call isn't profiled then."""
+        size_of = context.final_value(self.name)
+        try:
+            if callable(size_of):
+                size = size_of(*context.args, **context.kwargs)
+            else:
+                arguments = context.bound_args.arguments
+                if size_of in arguments:
+                    size = arguments[size_of]
+                else:
+                    size = context.fparams[size_of].default     # KeyError if none such
+                if not isinstance(size, (int, float)):
+                    size = len(size)
+            size = int(size)
+        except Exception:
+            return None
+        return size if size >= 0 else None
 
 
 class DecoSettingHistory(DecoSetting_bool):
+    __slots__ = ()
+
     def __init__(self, name, **kwargs):
         super().__init__(name, bool, False, allow_falsy=True, **kwargs)
 
-    def post_call_handler(self, context: dict):
-        context['decorator']._add_to_history(
-            context['argnames'],
-            context['argvals'],
-            context['varargs'],
-            context['explicit_kwargs'],
-            context['defaulted_kwargs'],
-            context['implicit_kwargs'],
-            context['retval'],
-            elapsed_secs=context['elapsed_secs'],
-            process_secs=context['process_secs'],
-            timestamp_secs=context['timestamp'],
-            prefixed_func_name=context['prefixed_fname'],
-            caller_chain=context['call_list']
+    def post_call_handler(self, context: CallContext):
+        context.decorator._add_to_history(
+            context.argnames,
+            context.argvals,
+            context.varargs,
+            context.explicit_kwargs,
+            context.defaulted_kwargs,
+            context.implicit_kwargs,
+            context.retval,
+            elapsed_secs=context.elapsed_secs,
+            process_secs=context.process_secs,
+            timestamp_secs=context.timestamp,
+            prefixed_func_name=context.prefixed_fname,
+            caller_chain=context.call_list,
+            elapsed_secs_corrected=context.elapsed_secs_corrected,
+            process_secs_corrected=context.process_secs_corrected,
+            memory=context.memory,
+            resources=context.resources,
+            size=getattr(context, 'size', None)     # set by size_of, if at all
         )
         return None
 
@@ -289,6 +419,8 @@ class DecoSettingHistory(DecoSetting_bool):
 #-----------------------------------------------------------------------------
 
 class DecoSettingFile(DecoSetting):
+    __slots__ = ()
+
     def value_from_str(self, s):
         """Virtual method for use by _deco_base._read_settings_file.
         0.2.4.post1"""
@@ -314,6 +446,8 @@ class DecoSettingFile(DecoSetting):
 
 
 class DecoSettingLogger(DecoSetting):
+    __slots__ = ()
+
     def value_from_str(self, s):
         """Virtual method for use by _deco_base._read_settings_file.
         s is the name of a logger, enclosed in quotes, or something bad.
@@ -323,6 +457,74 @@ class DecoSettingLogger(DecoSetting):
         return super().value_from_str(s)
 
 
+# 0.3.2
+class DecoSettingSink(DecoSetting_str):
+    """Value: URL of a sink, e.g. 'unix:///run/log_calls.sock' (see sink.py).
+    Sends an event for each call, even a muted one, like record_history."""
+    __slots__ = ()
+
+    def check_value(self, value):
+        """Raise ValueError for a malformed URL when it's assigned,
+        not after the first call"""
+        parse_sink_url(value)
+
+    def value_from_str(self, s):
+        url = super().value_from_str(s)
+        self.check_value(url)
+        return url
+
+    def post_call_handler(self, context: CallContext):
+        sink = get_sink(context.final_value(self.name))
+        sink.add((
+            context.prefixed_fname,
+            context.call_list,
+            context.call_num,
+            context.timestamp,
+            context.elapsed_secs,
+            context.process_secs,
+            args_digest(context.args, context.kwargs) if sink.digest_args else 0
+        ))
+        return None
+
+
+# 0.3.2
+class DecoSettingClocks(DecoSetting_str):
+    """Value: which clocks time a call (the wrapper reads them itself):
+        'process'   elapsed (wall-clock) time, and CPU time of the process
+        'thread'    elapsed time, and CPU time of the calling thread
+        'wall'      elapsed time only
+        'none'      neither
+    Times not measured are None."""
+    __slots__ = ()
+
+    # clocks setting |--> CPU-time clock
+    CPU_CLOCKS = {'process': time.process_time_ns,
+                  'thread': time.thread_time_ns,
+                  'wall': None,
+                  'none': None}
+
+    def __init__(self, name, **kwargs):
+        super().__init__(name, str, 'process', allow_falsy=False, **kwargs)
+
+    def has_acceptable_type(self, value):
+        return value in self.CPU_CLOCKS
+
+
+# 0.3.2
+class DecoSettingFormat(DecoSetting_str):
+    """Value: 'text' (the default), 'compact' or 'jsonl' (see jsonl.py).
+    The wrapper handles these itself."""
+    __slots__ = ()
+
+    FORMATS = ('text', 'compact', 'jsonl')
+
+    def __init__(self, name, **kwargs):
+        super().__init__(name, str, 'text', allow_falsy=False, **kwargs)
+
+    def has_acceptable_type(self, value):
+        return value in self.FORMATS
+
+
 #-----------------------------------------------------------------------------
 # CallRecord namedtuple, for history
 #-----------------------------------------------------------------------------
@@ -341,6 +543,30 @@ CallRecord = namedtuple(
         # caller_chain: list of fn names, possibly "prefixed".
         # From most-recent (immediate caller) to least-recent if len > 1.
         'caller_chain',
+        # 0.3.2 elapsed_secs, process_secs less the overhead of the wrappers
+        # of decorated callees (see _deco_base.calibrate_overhead)
+        'elapsed_secs_corrected', 'process_secs_corrected',
+        # 0.3.2 log_memory, log_resources: MemoryUsage, ResourceUsage
+        # (see resources.py), or None
+        'memory', 'resources',
+        # 0.3.2 size_of: the size of the call's input, or None
+        'size',
+    ),
+    defaults=(None, None, None, None, None)
+)
+
+
+#-----------------------------------------------------------------------------
+# ModuleDecoration namedtuple, for decorate_package reports
+#-----------------------------------------------------------------------------
+
+ModuleDecoration = namedtuple(
+    "ModuleDecoration",
+    (
+        'module_name',
+        'functions',        # names of functions decorated
+        'classes',          # names of classes decorated
+        'elapsed_secs',     # time taken to decorate them
     )
 )
 
@@ -367,6 +593,21 @@ PROPERTY_ATTRS_to_USER_SUFFIXES = OrderedDict(
 # accessed by callstack-chaseback routine and (0.3.0) _get_own_deco_wrapper
 STACKFRAME_HACK_DICT_NAME = '_deco_base__active_call_items__'
 
+#-----------------------------------------------------------------------------
+# _compile_expr
+# Compiled code of expressions passed to log_exprs/print_exprs.
+# Those calls often sit in hot functions and loops, with the same few
+# expressions every time, so don't reparse & recompile them on every call.
+#-----------------------------------------------------------------------------
+EXPR_CACHE_SIZE = 256
+
+@functools.lru_cache(maxsize=EXPR_CACHE_SIZE)
+def _compile_expr(expr: str):
+    """Return code object for expr, compiled as eval would compile it.
+    Raises SyntaxError etc. just as eval(expr) would (those aren't cached).
+    """
+    return compile(expr, '<string>', 'eval')
+
 #-----------------------------------------------------------------------------
 # _get_underlying_function
 #-----------------------------------------------------------------------------
@@ -387,6 +628,45 @@ def _get_underlying_function(item, actual_item):
     return func
 
 
+#-----------------------------------------------------------------------------
+# _current_call
+# The decorator object of the innermost active call of a decorated function
+# (one that's not true-bypassed), per thread and per asyncio task.
+# The wrapper sets it around its call to f and restores it afterwards,
+# so that log_calls.print, print_exprs & get_own_log_calls_wrapper
+# needn't search the stack for the wrapper's frame & read its locals.
+#-----------------------------------------------------------------------------
+_current_call = contextvars.ContextVar('log_calls_current_call', default=None)
+
+# 0.3.2 While tracing (start_tracing): the id of the span of that call,
+# the parent of the spans of the calls it makes
+_current_span = contextvars.ContextVar('log_calls_current_span', default=None)
+
+
+#-----------------------------------------------------------------------------
+# _overhead_tally
+# 0.3.2 The overhead of the wrappers, in ns, per thread. Each wrapper adds
+# the time it spent outside of its call to f, plus its calibrated residue
+# (see _deco_base.calibrate_overhead); what was added during the call to f
+# is the overhead of the wrappers of f's callees, and the wrapper subtracts
+# it from f's elapsed time: elapsed_secs_corrected.
+#-----------------------------------------------------------------------------
+class _OverheadTally(threading.local):
+    ns = 0
+
+_overhead_tally = _OverheadTally()
+
+
+#-----------------------------------------------------------------------------
+# _TIMESTAMP_EPOCH
+# 0.3.2 time.time() when perf_counter_ns() was 0. The timestamp of a call
+# is derived from the perf_counter_ns() reading that starts timing it,
+# rather than read from another clock. (So it doesn't follow changes to
+# the system clock made after this module is imported.)
+#-----------------------------------------------------------------------------
+_TIMESTAMP_EPOCH = time.time() - time.perf_counter_ns() / 1e9
+
+
 #-----------------------------------------------------------------------------
 # _get_deco_wrapper                 kls |-->
 # _get_own_deco_wrapper
@@ -416,6 +696,8 @@ def _get_own_deco_wrapper_and_obj(deco_class, extra_frames=0) -> ('function', 'd
     v 0.3.1, omitted last arg `cls` (unused); made exposed method *staticmethod* not classmethod
     Raises AttributeError on error -- if any of many redundant consistency checks fail.
 
+    The deco object of the active call is read from the _current_call slot,
+    which the wrapper sets; no stackframe locals are consulted.
     """
     # Error messages. We append a code to better determine cause of error.
     ERR_NOT_DECORATED = "'%s' is not decorated [%d]"
@@ -427,38 +709,31 @@ def _get_own_deco_wrapper_and_obj(deco_class, extra_frames=0) -> ('function', 'd
     code = func_frame.f_code
     funcname = code.co_name
 
-    wrapper_frame = func_frame.f_back
-    wrapper_funcname = wrapper_frame.f_code.co_name
-
     # wrapper_funcname should be '_deco_base_f_wrapper_'
-    if wrapper_funcname != '_deco_base_f_wrapper_':
+    if func_frame.f_back.f_code.co_name != '_deco_base_f_wrapper_':
         raise AttributeError(ERR_NOT_DECORATED % (funcname, 1))
 
-    # look in its f_locals :) [stackframe hack] for STACKFRAME_HACK_DICT_NAME
-    hack_dict = wrapper_frame.f_locals.get(STACKFRAME_HACK_DICT_NAME, None)
-    if not hack_dict:
+    # deco object of the innermost active, not true-bypassed,
+    # call of a decorated function (in this thread/task)
+    deco_obj = _current_call.get()
+    if deco_obj is None:
         raise AttributeError(ERR_BYPASSED_OR_NOT_DECORATED % (funcname, 2))
-    # value for key '_wrapper_deco' is the deco object
-    try:
-        deco_obj = hack_dict['_wrapper_deco']
-    except (TypeError, KeyError):
-        deco_obj = None
-    if not (deco_obj and type(deco_obj) == deco_class):
+    if type(deco_obj) != deco_class:
         raise AttributeError(ERR_NOT_DECORATED % (funcname, 3))
 
     # we've almost surely found a true wrapper
     try:
         wrapped_f = deco_obj.f
     except AttributeError:
-        # Come here e.g. if deco_obj is None
+        # Come here e.g. if deco_obj has never decorated anything
         raise AttributeError(ERR_INCONSISTENT_DECO % (deco_class.__name__, funcname, 4))
-    # more consistency checks:
-    # wrapped_f nonempty and has same name and identical code to our function
     if not wrapped_f:
         raise AttributeError(ERR_INCONSISTENT_DECO % (deco_class.__name__, funcname, 5))
-    if not (funcname == wrapped_f.__name__ and
-            wrapped_f.__code__ is code):
-        raise AttributeError(ERR_INCONSISTENT_DECO % (deco_class.__name__, funcname, 6))
+    # If the active call isn't of our function, then our function
+    # is true-bypassed (so its wrapper didn't set _current_call),
+    # or its caller merely has the wrapper's name
+    if wrapped_f.__code__ is not code:
+        raise AttributeError(ERR_BYPASSED_OR_NOT_DECORATED % (funcname, 2))
 
     # access its attr deco_obj._sentinels['WRAPPER_FN_OBJ'] --
     # THAT, at long last, is (alllmost surely) the wrapper
@@ -467,6 +742,11 @@ def _get_own_deco_wrapper_and_obj(deco_class, extra_frames=0) -> ('function', 'd
     if deco_obj != getattr(wrapper, deco_obj._sentinels['DECO_OF'], None):
         raise AttributeError(ERR_INCONSISTENT_DECO % (deco_class.__name__, funcname, 7))
 
+    # Our function is active, but it may be recursive,
+    # and true-bypassed in this call
+    if deco_obj._enabled_stack[-1] < 0:
+        raise AttributeError(ERR_BYPASSED_OR_NOT_DECORATED % (funcname, 2))
+
     return wrapper, deco_obj
 
 
@@ -588,7 +868,42 @@ class _deco_base():
 
     Settings/keyword params to __init__ that this base class knows about,
     and uses in __call__ (in wrapper for wrapped function): ... see docs.
+
+    There's one decorator object per decorated function, so there can be
+    many thousands of them (decorate_module, decorate_hierarchy). Hence
+    __slots__; the settings dicts of decorators with identical settings
+    are shared (deco_settings.share_dict); and the call history deque is
+    only created when the first call is recorded.
+    Subclasses must declare __slots__ too (for any attributes they add).
     """
+    __slots__ = (
+        # settings (__init__)
+        '_changed_settings', '_effective_settings',
+        '_omit', '_omit_ex', '_only', '_only_ex',
+        'prefix', '_name_param', '_max_history_param', '_override',
+        '_settings_file',       # path of the settings file, if any
+        '_inner_template',      # class decos: cloned for the members' decos
+        # what's decorated (__call__)
+        'f', 'cls',
+        '_classname_of_f', 'f_display_name', 'f_signature', 'f_params',
+        '_settings_mapping', '_stats',
+        # stats & history
+        '_num_calls_total', '_num_calls_logged', '_num_calls_raised',
+        '_elapsed_secs_logged', '_process_secs_logged',
+        '_elapsed_secs_corrected', '_process_secs_corrected',
+        '_memory_logged', '_resources_logged',
+        '_size_profile',        # made by the first call profiled by size_of
+        '_elapsed_buckets',     # histogram of elapsed_secs, for metrics
+        'max_history', '_call_history',
+        '_shared_row',          # [SharedStats, row, what this process added to it]
+        '_jsonl_encoder',       # made by the first call in format 'jsonl'
+        # what control says about f, as of control.epoch == _control_epoch
+        '_control_epoch', '_control_overrides', '_sample_credit',
+        '_output_limiter',      # made by the first call with max_rate or collapse_repeats
+        # stacks, pushed & popped by wrapper
+        'logging_state_stack', '_enabled_stack',
+        '__weakref__',          # for _all_decos
+    )
     # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     # constants for the `mute` setting
     # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -658,6 +973,11 @@ class _deco_base():
         'num_calls_total',
         'elapsed_secs_logged',
         'process_secs_logged',
+        'elapsed_secs_corrected',
+        'process_secs_corrected',
+        'memory_logged',
+        'resources_logged',
+        'size_profile',
         'history',
         'history_as_csv',
         'history_as_DataFrame',
@@ -666,6 +986,41 @@ class _deco_base():
         'clear_history',
     )
 
+    # 0.3.2 Settings whose post_call_handlers record rather than write
+    # output, so they're called even when the call is muted
+    _settings_handled_when_muted = ('record_history',)
+
+    # 0.3.2 Settings whose post_call_handlers format='compact' skips
+    # (their messages repeat the pre-call ones)
+    _settings_omitted_when_compact = ()
+
+    # 0.3.2 Overhead per call that the wrapper can't time itself (calling
+    # it, returning from it), in ns, by path through it: the residue each
+    # call adds to _overhead_tally. Set by calibrate_overhead.
+    _overhead_ns_bypassed = 0
+    _overhead_ns_disabled = 0
+    _overhead_ns_enabled = 0
+
+    # 0.3.2 Decorators of functions, for all_stats
+    _all_decos = weakref.WeakSet()
+
+    # 0.3.2 Parsed settings files: (clsname, path) |--> (file_signature, dict),
+    # reused while the file is unchanged; and the settings that environment
+    # variables override, by clsname (see settings_files.py)
+    _settings_files = {}
+    _env_settings = {}
+
+    # 0.3.2 The process-wide switches (see control.py): log_calls.control
+    control = Control(stats_text=lambda: _deco_base._all_stats_text())
+
+    # 0.3.2 Set by start_tracing: the Tracer that every enabled call
+    # (of all deco classes) adds its span to
+    _tracer = None
+
+    # 0.3.2 Set by share_stats: the SharedStats table that every
+    # decorated function (of all deco classes) adds its stats to.
+    _shared_stats = None
+
     # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     # virtual classmethods
     # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -691,6 +1046,13 @@ class _deco_base():
         """Default: False (never globally muted)"""
         return False
 
+    # 0.3.2
+    def _make_cache(self):
+        """Called by __call__ once self.f is set up: return a CallCache
+        (see call_cache.py) of the return values of f, which enabled calls
+        consult before calling f, or None (default) to always call f."""
+        return None
+
     #----------------------------------------------------------------
     # history stuff
     #----------------------------------------------------------------
@@ -717,9 +1079,45 @@ class _deco_base():
         # whether or not history is being recorded.
         return self._process_secs_logged
 
+    # 0.3.2
+    @property
+    def elapsed_secs_corrected(self):
+        """elapsed_secs_logged, less the overhead of the log_calls
+        wrappers of the decorated callables that the logged calls called."""
+        return self._elapsed_secs_corrected
+
+    # 0.3.2
+    @property
+    def process_secs_corrected(self):
+        """process_secs_logged, less the same overhead (wall-clock time,
+        which is almost all process time)."""
+        return self._process_secs_corrected
+
+    # 0.3.2
+    @property
+    def memory_logged(self):
+        """MemoryUsage totals of the logged calls probed by log_memory
+        (peak_bytes: the greatest), or None if none were."""
+        return self._memory_logged
+
+    # 0.3.2
+    @property
+    def resources_logged(self):
+        """ResourceUsage totals of the logged calls probed by log_resources,
+        or None if none were."""
+        return self._resources_logged
+
+    # 0.3.2
+    @property
+    def size_profile(self):
+        """SizeProfile of the calls profiled by size_of, or None if none were:
+        elapsed times by log2 bucket of input size, and the exponent of the
+        power law that fits them (see size_profile.py)."""
+        return self._size_profile
+
     @property
     def history(self):
-        return tuple(self._call_history)
+        return tuple(self._call_history or ())
 
     @property
     def history_as_csv(self):
@@ -742,15 +1140,21 @@ class _deco_base():
         csv = ''
 
         # Write column headings line (append to csv str)
+        # 0.3.2 and a size column, if size_of has sized any of the calls
+        with_size = any(rec.size is not None for rec in self._call_history or ())
+
         fields = ['call_num']
         fields.extend(all_args)
-        fields.extend(['retval', 'elapsed_secs', 'process_secs', 'timestamp', 'prefixed_fname', 'caller_chain'])
+        fields.extend(['retval', 'elapsed_secs', 'process_secs'])
+        if with_size:
+            fields.append('size')
+        fields.extend(['timestamp', 'prefixed_fname', 'caller_chain'])
         # 0.2.1 - use str not repr, get rid of quotes around column names
         csv = csv_sep.join(map(str, fields))
         csv += '\n'
 
         # Write data lines
-        for rec in self._call_history:
+        for rec in self._call_history or ():
             fields = [str(rec.call_num)]
             # Do arg vals.
             # make dict of ALL args/vals
@@ -772,6 +1176,8 @@ class _deco_base():
             fields.append(repr(rec.retval))
             fields.append(str(rec.elapsed_secs))
             fields.append(str(rec.process_secs))
+            if with_size:
+                fields.append(str(rec.size))
             fields.append(rec.timestamp)        # it already IS a formatted str
             fields.append(repr(rec.prefixed_func_name))
             fields.append(repr(rec.caller_chain))
@@ -799,24 +1205,260 @@ class _deco_base():
 
     def clear_history(self, max_history=0):
         """Using clear_history it's possible to change max_history"""
+        cached = self._shared_row
+        if cached is not None and cached[0] is _deco_base._shared_stats:
+            # take back what this decorator contributed -- from this process:
+            # counts a forked child inherited were added by its parent
+            self._add_to_shared(*(-x for x in cached[2]))
         self._num_calls_logged = 0
         self._num_calls_total = 0
 
         self._elapsed_secs_logged = 0.0
         self._process_secs_logged = 0.0
-
-        self.max_history = int(max_history)  # set before calling _make_call_history
-        self._call_history = self._make_call_history()
+        self._elapsed_secs_corrected = 0.0
+        self._process_secs_corrected = 0.0
+        self._memory_logged = None
+        self._resources_logged = None
+        self._size_profile = None
+        self._num_calls_raised = 0
+        self._elapsed_buckets = None
+
+        self.max_history = int(max_history)  # _make_call_history uses it
+        self._call_history = None            # made when first call is recorded
         self._settings_mapping.__setitem__('max_history', max_history, _force_mutable=True)
 
     def _add_call(self, *, logged):
         self._num_calls_total += 1
         if logged:
             self._num_calls_logged += 1
+        if _deco_base._shared_stats is not None:
+            self._add_to_shared(1, int(logged), 0.0, 0.0)
 
-    def _add_to_elapsed(self, elapsed_secs, process_secs):
+    def _add_to_elapsed(self, elapsed_secs, process_secs,
+                        elapsed_secs_corrected, process_secs_corrected):
         self._elapsed_secs_logged += elapsed_secs
         self._process_secs_logged += process_secs
+        self._elapsed_secs_corrected += elapsed_secs_corrected     # 0.3.2
+        self._process_secs_corrected += process_secs_corrected
+        # 0.3.2 Histogram for metrics_text: counts per bucket, made when needed
+        buckets = self._elapsed_buckets
+        if buckets is None:
+            buckets = self._elapsed_buckets = [0] * (len(ELAPSED_BUCKET_BOUNDS) + 1)
+        buckets[bisect_left(ELAPSED_BUCKET_BOUNDS, elapsed_secs)] += 1
+        if _deco_base._shared_stats is not None:
+            self._add_to_shared(0, 0, elapsed_secs, process_secs)
+
+    def _add_to_usage(self, memory, resources):
+        """memory, resources: MemoryUsage, ResourceUsage of a call, or None"""
+        if memory is not None:
+            total = self._memory_logged
+            self._memory_logged = memory if total is None else total.combined(memory)
+        if resources is not None:
+            total = self._resources_logged
+            self._resources_logged = resources if total is None else total.combined(resources)
+
+    def _add_to_size_profile(self, size, elapsed_secs):
+        if self._size_profile is None:
+            self._size_profile = SizeProfile()
+        self._size_profile._add(size, elapsed_secs)
+
+    def _stats_key(self) -> str:
+        """Identifies f across processes, e.g. 'log_calls:pkg.mod.C.f'"""
+        return "%s:%s.%s" % (self.__class__.__name__,
+                             self.f.__module__, self.f.__qualname__)
+
+    def _add_to_shared(self, num_calls_total, num_calls_logged,
+                       elapsed_secs, process_secs):
+        shared = _deco_base._shared_stats
+        cached = self._shared_row
+        if cached is None or cached[0] is not shared:
+            cached = self._shared_row = (shared, shared.row(self._stats_key()),
+                                         [0, 0, 0.0, 0.0])
+        shared.add_to_row(cached[1], num_calls_total, num_calls_logged,
+                          elapsed_secs, process_secs, tally=cached[2])
+
+    @staticmethod
+    def _after_fork_in_child():
+        # Nothing in the shared table is this process's yet
+        for deco in list(_deco_base._all_decos):
+            deco._shared_row = None
+
+    #----------------------------------------------------------------
+    # Stats of all decorated functions, possibly across processes
+    #----------------------------------------------------------------
+    # 0.3.2
+    @classmethod
+    def share_stats(cls, shared=None, **kwargs) -> SharedStats:
+        """Start adding the stats of all decorated functions to `shared`,
+        a SharedStats table (made, with kwargs, if not given), so that
+        all_stats(aggregate=True) sees the calls of every process that
+        does so. Returns the table.
+
+        In the parent process:
+            shared = log_calls.share_stats()        # or share_stats(max_workers=...)
+        Forked workers inherit it; other workers must be told:
+            ProcessPoolExecutor(initializer=log_calls.share_stats,
+                                initargs=(shared,))
+        When done, in the parent, `shared.close()` frees the shared memory.
+        (SharedStats is a context manager too.)
+        """
+        if shared is None:
+            shared = SharedStats(**kwargs)
+        elif kwargs:
+            raise TypeError("share_stats: pass either a SharedStats or its kwargs")
+        shared.histories_fn = _deco_base._all_histories
+        _deco_base._shared_stats = shared
+        return shared
+
+    @staticmethod
+    def _all_histories():
+        """(key, history) for each decorated function (of any deco class)
+        of this process that has recorded calls."""
+        return [(deco._stats_key(), deco.history)
+                for deco in list(_deco_base._all_decos)
+                if deco._call_history]
+
+    @classmethod
+    def all_stats(cls, aggregate=False) -> dict:
+        """Stats of the functions decorated by this deco class, as a dict
+        {'module.qualname': FuncStats(num_calls_logged, num_calls_total,
+                                      elapsed_secs_logged, process_secs_logged)}.
+
+        :param aggregate: if true and share_stats is on, the totals over all
+            processes that have shared their stats (this one included);
+            functions this process never decorated can appear.
+            Otherwise (or if sharing is off), the stats of this process.
+        """
+        prefix = cls.__name__ + ':'
+        shared = _deco_base._shared_stats
+        if aggregate and shared is not None and not shared.closed:
+            return {key[len(prefix):]: stats
+                    for key, stats in shared.totals().items()
+                    if key.startswith(prefix)}
+
+        ret = {}
+        for deco in list(_deco_base._all_decos):
+            key = deco._stats_key()
+            if not key.startswith(prefix):
+                continue
+            key = key[len(prefix):]
+            stats = FuncStats(deco._num_calls_logged, deco._num_calls_total,
+                              deco._elapsed_secs_logged, deco._process_secs_logged)
+            if key in ret:      # e.g. a nested function, decorated anew each time
+                stats = FuncStats(*map(sum, zip(ret[key], stats)))
+            ret[key] = stats
+        return ret
+
+    @staticmethod
+    def _all_stats_text() -> str:
+        """The stats of all decorated functions, one line each,
+        for control.dump_stats"""
+        return '\n'.join(sorted(
+            "%s: %d calls (%d logged), %.6f elapsed secs, %.6f process secs"
+            % (deco._stats_key(), deco._num_calls_total, deco._num_calls_logged,
+               deco._elapsed_secs_logged, deco._process_secs_logged)
+            for deco in list(_deco_base._all_decos)))
+
+    #----------------------------------------------------------------
+    # Span tracing
+    #----------------------------------------------------------------
+    # 0.3.2
+    @staticmethod
+    def start_tracing(path=None, **kwargs) -> Tracer:
+        """Trace the enabled calls of all decorated functions (of all deco
+        classes) as spans, kept in memory and, if path is given, written
+        to it as Chrome trace events, for Perfetto or chrome://tracing.
+        kwargs: as for Tracer (see tracing.py) -- e.g. keep_slower_than,
+        for tail-based retention of the trees of slow calls. Stops any
+        tracing already going on. Return the Tracer."""
+        _deco_base.stop_tracing()
+        _deco_base._tracer = Tracer(path, **kwargs)
+        return _deco_base._tracer
+
+    @staticmethod
+    def stop_tracing():
+        """Stop tracing, and close the trace file. Return the Tracer
+        (its spans), or None if there was no tracing going on."""
+        tracer = _deco_base._tracer
+        _deco_base._tracer = None
+        if tracer is not None:
+            tracer.close()
+        return tracer
+
+    #----------------------------------------------------------------
+    # Metrics of all decorated functions, for monitoring
+    #----------------------------------------------------------------
+    # 0.3.2
+    @classmethod
+    def metrics_text(cls) -> str:
+        """Metrics of the functions decorated by this deco class, in the
+        Prometheus text format: calls, logged calls, errors, process
+        seconds, and a histogram of elapsed seconds, labeled by
+        function="<prefixed_fname>". Metric names begin with cls.__name__.
+        Costs O(#functions): all of these are kept up to date per call.
+        """
+        return render_metrics(
+            cls.__name__,
+            (FuncMetrics(deco._settings_mapping['prefix'] + deco.f_display_name,
+                         deco._num_calls_total, deco._num_calls_logged,
+                         deco._num_calls_raised,
+                         deco._elapsed_secs_logged, deco._process_secs_logged,
+                         deco._elapsed_buckets)
+             for deco in list(_deco_base._all_decos)
+             if isinstance(deco, cls)))
+
+    @classmethod
+    def serve_metrics(cls, port=0, host='127.0.0.1') -> MetricsServer:
+        """Serve metrics_text() at http://host:port/metrics, from a daemon
+        thread. port=0 picks a free port (see the returned server's .port);
+        its stop() method stops it. Listens on localhost only, by default.
+        """
+        return MetricsServer(cls.metrics_text, port, host)
+
+    #----------------------------------------------------------------
+    # Calibrating elapsed_secs_corrected, process_secs_corrected
+    #----------------------------------------------------------------
+    # 0.3.2
+    @classmethod
+    def calibrate_overhead(cls, loops=2000, repeat=5) -> dict:
+        """Measure the overhead per call of a wrapper that the wrapper
+        can't time itself -- the call to it and the return from it --
+        on each path through it ('bypassed', 'disabled', 'enabled'),
+        and subtract it too from the corrected times of ancestor calls
+        from now on. Return it, {path: ns}. Call this once, at startup:
+        it takes a few milliseconds. Until it's called, that part of the
+        overhead isn't subtracted. Applies to all deco classes.
+        """
+        def noop():
+            pass
+
+        def time_calls(fn):
+            """(ns per call, tally ns per call) of the fastest of repeat loops"""
+            tally = _overhead_tally
+            best = None
+            for _ in range(repeat):
+                tally0 = tally.ns
+                t0 = time.perf_counter_ns()
+                for _ in range(loops):
+                    fn()
+                ns = time.perf_counter_ns() - t0
+                if best is None or ns < best[0]:
+                    best = (ns, tally.ns - tally0)
+            return best[0] / loops, best[1] / loops
+
+        paths = (('bypassed', dict(enabled=-1)),
+                 ('disabled', dict(enabled=False)),
+                 ('enabled', dict(mute=log_calls.MUTE.ALL)))
+        for path, _ in paths:
+            setattr(_deco_base, '_overhead_ns_' + path, 0)
+        baseline, _ = time_calls(noop)
+        residues = {}
+        for path, settings in paths:
+            ns, tallied = time_calls(log_calls(**settings)(noop))
+            residues[path] = max(int(ns - baseline - tallied), 0)
+        for path, ns in residues.items():
+            setattr(_deco_base, '_overhead_ns_' + path, ns)
+        return residues
 
     def _add_to_history(self,
                         argnames, argvals,
@@ -826,7 +1468,10 @@ class _deco_base():
                         elapsed_secs, process_secs,
                         timestamp_secs,
                         prefixed_func_name,
-                        caller_chain
+                        caller_chain,
+                        elapsed_secs_corrected=None, process_secs_corrected=None,
+                        memory=None, resources=None,
+                        size=None
     ):
         """Only called for *logged* calls, with record_history true.
         Call counters are already bumped."""
@@ -840,6 +1485,8 @@ class _deco_base():
         # argnames = argnames[:n]
         # argvals = argvals[:n]
 
+        if self._call_history is None:
+            self._call_history = self._make_call_history()
         self._call_history.append(
                 CallRecord(
                     self._num_calls_logged,
@@ -850,7 +1497,12 @@ class _deco_base():
                     elapsed_secs, process_secs,
                     timestamp,
                     prefixed_func_name=prefixed_func_name,
-                    caller_chain=caller_chain)
+                    caller_chain=caller_chain,
+                    elapsed_secs_corrected=elapsed_secs_corrected,
+                    process_secs_corrected=process_secs_corrected,
+                    memory=memory,
+                    resources=resources,
+                    size=size)
         )
 
     #----------------------------------------------------------------
@@ -863,6 +1515,62 @@ class _deco_base():
                                'output_fname',
                                'mute'))
 
+    #----------------------------------------------------------------
+    # 0.3.2 format='jsonl' (see jsonl.py)
+    #----------------------------------------------------------------
+    def _get_jsonl_encoder(self) -> JsonlEncoder:
+        encoder = self._jsonl_encoder
+        if encoder is None:
+            star = {inspect.Parameter.VAR_POSITIONAL: '*',
+                    inspect.Parameter.VAR_KEYWORD: '**'}
+            encoder = self._jsonl_encoder = JsonlEncoder(
+                [star.get(param.kind, '') + name
+                 for name, param in self.f_params.items()])
+        return encoder
+
+    # 0.3.2 format='compact'
+    @staticmethod
+    def _compact_record(pre_msgs, post_msgs, depth) -> str:
+        """The messages of a call on one line, separated by '; ',
+        with 'depth: <depth>' after the first (the entry message)."""
+        pieces = [line.strip()
+                  for msg in pre_msgs + post_msgs
+                  for line in str(msg).splitlines() if line.strip()]
+        pieces.insert(1 if pieces else 0, 'depth: %d' % depth)
+        return '; '.join(pieces)
+
+    def _encode_jsonl_call(self, context, call_num, depth, exception=None) -> str:
+        """The JSON object for a call -- context has the post-call fields.
+        Arguments as for the 'arguments:' and 'defaults:' lines of text
+        output, if log_args; return value if log_retval (and no exception)."""
+        final_value = context.final_value
+        args = defaults = None
+        if final_value('log_args'):
+            try:
+                args = list(zip(context.argnames, context.argvals))
+            except TypeError:
+                # The arguments don't bind to f's parameters (so f raised
+                # TypeError, which is being re-raised): write them as passed
+                args = [('*args', context.args)] if context.args else []
+                args.extend(context.kwargs.items())
+            else:
+                if context.varargs:
+                    args.append(('*' + context.varargs_name, context.varargs))
+                args.extend(context.explicit_kwargs.items())
+                if context.implicit_kwargs:
+                    args.append(('**' + context.kwargs_name, context.implicit_kwargs))
+                defaults = context.defaulted_kwargs.items()
+        retval_repr = exception_repr = None
+        if exception is not None:
+            exception_repr = bounded_repr(exception)
+        elif final_value('log_retval'):
+            retval_repr = bounded_repr(context.retval)
+        return self._get_jsonl_encoder().encode_call(
+            context.prefixed_fname, call_num, context.call_list, depth,
+            context.timestamp, context.elapsed_secs, context.process_secs,
+            args=args, retval_repr=retval_repr, exception_repr=exception_repr,
+            defaults=defaults)
+
     # 0.3.0
     def _enabled_state_push(self, enabled):
         self._enabled_stack.append(enabled)
@@ -885,6 +1593,18 @@ class _deco_base():
     # `log_calls`-aware debug-message writers
     #----------------------------------------------------------------
 
+    def _output_suppressed(self) -> bool:
+        """True iff _log_message would write nothing: the current call
+        of the decorated function is disabled, or output is muted
+        (its own mute, or global mute) at level MUTE.ALL."""
+        # do nothing unless enabled! if disabled, the other 'stack' accesses will blow up
+        if self._enabled_stack[-1] <= 0:    # disabled
+            return True
+        # Write nothing if output is stifled (caller is NOT _deco_base_f_wrapper_)
+        # NOTE: only check global_mute() IN REALTIME, like so:
+        mute = max(self.logging_state_stack[-1].mute, self.global_mute())
+        return mute == self.MUTE.ALL
+
     def _log_exprs(self, *exprs,
                    sep=', ',
                    extra_indent_level=1,
@@ -904,11 +1624,15 @@ class _deco_base():
         """
         if not exprs:
             return
+        # Don't even get the frame, much less evaluate anything,
+        # if nothing would be written
+        if self._output_suppressed():
+            return
         msgs = []
         caller_frame = sys._getframe(1 + _extra_frames)
         for expr in exprs:
             try:
-                val = eval(expr, caller_frame.f_globals, caller_frame.f_locals)
+                val = eval(_compile_expr(expr), caller_frame.f_globals, caller_frame.f_locals)
             except Exception as e:  # (SyntaxError, NameError, IndexError, ...)
                 val = '<** ' + str(e) + ' **>'
             msgs.append('%s = %r' % (expr, val))
@@ -957,17 +1681,13 @@ class _deco_base():
         if not msgs:
             return
 
-        # do nothing unless enabled! if disabled, the other 'stack' accesses will blow up
-        if self._enabled_stack[-1] <= 0:    # disabled
+        if self._output_suppressed():
             return
 
         # 0.3.0
         logging_state = self.logging_state_stack[-1]
-        # Write nothing if output is stifled (caller is NOT _deco_base_f_wrapper_)
         # NOTE: only check global_mute() IN REALTIME, like so:
         mute = max(logging_state.mute, self.global_mute())
-        if mute == self.MUTE.ALL:
-            return
         # adjust for calls not being logged -- don't indent an extra level
         #  (no 'log_calls frame', no 'arguments:' to align with),
         #  and prefix with display name cuz there's no log_calls "frame"
@@ -1020,6 +1740,12 @@ class _deco_base():
         # Get the associated deco_obj, as we need to call
         # ITS instance method _log_message.
         # cls is "deco_class" (`log_calls`, `record_history`)
+        # Nothing to do if no decorated function is active,
+        # or if the active one is disabled or muted
+        active_deco_obj = _current_call.get()
+        if not cls.print_methods_raise_if_no_deco and (
+                active_deco_obj is None or active_deco_obj._output_suppressed()):
+            return
         try:
             deco_obj = _get_own_deco_obj(cls, _extra_frames=1)
         except:
@@ -1042,6 +1768,12 @@ class _deco_base():
         # Get the associated deco_obj, as we need to call
         # ITS instance method _log_exprs.
         # cls is "deco_class" (`log_calls`, `record_history`)
+        # Nothing to do if no decorated function is active,
+        # or if the active one is disabled or muted
+        active_deco_obj = _current_call.get()
+        if not cls.print_methods_raise_if_no_deco and (
+                active_deco_obj is None or active_deco_obj._output_suppressed()):
+            return
         try:
             deco_obj = _get_own_deco_obj(cls, _extra_frames=1)
         except:
@@ -1116,6 +1848,18 @@ class _deco_base():
                                    extra_settings_dict=more_defaults)
         DecoSettingsMapping.set_defaults(cls.__name__, d)
 
+    @classmethod
+    def _settings_file_path(cls, settings_path='') -> str:
+        """The file that _read_settings_file reads for settings_path,
+        or '' if there isn't one."""
+        if not settings_path:
+            return ''
+        if os.path.isdir(settings_path):
+            settings_path = os.path.join(settings_path, '.' + cls.__name__)
+        if not os.path.isfile(settings_path):
+            return ''
+        return os.path.abspath(settings_path)
+
     @classmethod
     def _read_settings_file(cls, settings_path=''):
         """If settings_path names a file that exists,
@@ -1131,23 +1875,25 @@ class _deco_base():
         are treated as comments & ignored.
 
         v0.3.0 -- special-case handling for pseudo-setting `NO_DECO`
+        0.3.2 -- a file is parsed once, and its settings reused (copied)
+            until its mtime or size changes
         """
+        settings_path = cls._settings_file_path(settings_path)
         if not settings_path:
             return {}
 
-        if os.path.isdir(settings_path):
-            settings_path = os.path.join(settings_path, '.' + cls.__name__)
-        if not os.path.isfile(settings_path):
-            return {}
+        signature = file_signature(settings_path)
+        cached = _deco_base._settings_files.get((cls.__name__, settings_path))
+        if cached and cached[0] == signature:
+            return cached[1].copy()
 
-        d = {}      # returned
         try:
             with open(settings_path) as f:
                 lines = f.readlines()
         except BaseException:   # FileNotFoundError?!
-            return d
+            return {}
 
-        settings_dict = DecoSettingsMapping.get_deco_class_settings_dict(cls.__name__)
+        d = {}      # returned
         for line in lines:
             line = line.strip()
             # Allow blank lines & comments
@@ -1159,38 +1905,111 @@ class _deco_base():
             except ValueError:
                 # fail silently. (Or, TODO: report error? ill-formed line)
                 continue                                # bad line
-            setting = setting.strip()
-            val_txt = val_txt.strip()
+            cls._parse_setting_into(d, setting.strip(), val_txt.strip())
 
-            if setting not in settings_dict or not val_txt:
-                # fail silently. (Or, TODO: report error? ill-formed line)
-                continue
+        _deco_base._settings_files[(cls.__name__, settings_path)] = (signature, d)
+        return d.copy()
 
-            # special case: None
-            if val_txt == 'None':
-                if settings_dict[setting].allow_falsy:
-                    d[setting] = None
-                continue
+    @classmethod
+    def _parse_setting_into(cls, d, setting, val_txt):
+        """Set d[setting] to the value that val_txt, the text of a value
+        in a settings file (or environment variable), denotes.
+        Fail silently: leave d alone if setting or val_txt is bad."""
+        settings_dict = DecoSettingsMapping.get_deco_class_settings_dict(cls.__name__)
+        if setting not in settings_dict or not val_txt:
+            # fail silently. (Or, TODO: report error? ill-formed line)
+            return
 
-            # If val_txt is enclosed in quotes (single or double)
-            # and ends in '=' (indirect value) then let val = val_txt;
-            # otherwise, defer to settings_dict[setting].value_from_str
-            is_indirect = (is_quoted_str(val_txt) and
-                           len(val_txt) >= 3 and
-                           val_txt[-2] == '=')
-            if is_indirect:
-                val = val_txt[1:-1]     # remove quotes
-            else:
-                try:
-                    val = settings_dict[setting].value_from_str(val_txt)
-                except ValueError as e:
-                    # fail silently. (Or, TODO: report error? bad value)
-                    continue                            # bad line
+        # special case: None
+        if val_txt == 'None':
+            if settings_dict[setting].allow_falsy:
+                d[setting] = None
+            return
+
+        # If val_txt is enclosed in quotes (single or double)
+        # and ends in '=' (indirect value) then let val = val_txt;
+        # otherwise, defer to settings_dict[setting].value_from_str
+        is_indirect = (is_quoted_str(val_txt) and
+                       len(val_txt) >= 3 and
+                       val_txt[-2] == '=')
+        if is_indirect:
+            val = val_txt[1:-1]     # remove quotes
+        else:
+            try:
+                val = settings_dict[setting].value_from_str(val_txt)
+            except ValueError as e:
+                # fail silently. (Or, TODO: report error? bad value)
+                return                                  # bad value
 
-            d[setting] = val
+        d[setting] = val
 
+    # 0.3.2
+    @classmethod
+    def _get_env_settings(cls) -> dict:
+        """Settings of this deco class given by environment variables
+        (e.g. LOG_CALLS_ENABLED=False): read once, then cached
+        (reload_settings_files re-reads them)."""
+        d = _deco_base._env_settings.get(cls.__name__)
+        if d is None:
+            settings_dict = DecoSettingsMapping.get_deco_class_settings_dict(cls.__name__)
+            d = {}
+            for setting, val_txt in env_settings_items(cls.__name__, settings_dict):
+                cls._parse_setting_into(d, setting, val_txt.strip())
+            _deco_base._env_settings[cls.__name__] = d
         return d
 
+    # 0.3.2
+    @classmethod
+    def reload_settings_files(cls) -> list:
+        """Re-read the settings files (of all deco classes) that have changed
+        since they were last read, and push the changes into the settings
+        of the callables decorated with them: a setting whose value is
+        still the one the file gave it (or its default, if the file didn't
+        give it one) gets the file's new value (or its default, if the file
+        no longer gives it one). So settings passed as keyword parameters,
+        or changed since decoration, keep their values; so do settings
+        given by environment variables, and immutable settings.
+
+        Environment variables are re-read too, for decorators made
+        from now on.
+
+        :return: the paths of the files that changed.
+        """
+        _deco_base._env_settings.clear()
+        changed = []
+        for (clsname, path), (signature, old) in list(_deco_base._settings_files.items()):
+            new_signature = file_signature(path)
+            if new_signature is None or new_signature == signature:
+                continue        # gone, or unchanged
+            decos = [deco for deco in list(_deco_base._all_decos)
+                     if deco.__class__.__name__ == clsname
+                     and deco._settings_file == path]
+            if not decos:
+                del _deco_base._settings_files[(clsname, path)]     # read anew when next used
+                continue
+            new = decos[0]._read_settings_file(path)
+            changed.append(path)
+            settings_dict = DecoSettingsMapping.get_deco_class_settings_dict(clsname)
+            env = decos[0]._get_env_settings()
+            for deco in decos:
+                for key in set(old) | set(new):
+                    info = settings_dict[key]
+                    if (key == 'NO_DECO' or key in env
+                            or not info.mutable or not info.visible):
+                        continue
+                    default = True if key == 'enabled' else info.default
+                    if deco._settings_mapping[key] == old.get(key, default):
+                        deco._settings_mapping[key] = new.get(key, default)
+        return changed
+
+    # 0.3.2
+    @classmethod
+    def watch_settings_files(cls, interval=1.0) -> SettingsWatcher:
+        """Call reload_settings_files every interval seconds, from a daemon
+        thread, until the stop() method of the returned SettingsWatcher
+        is called."""
+        return SettingsWatcher(cls.reload_settings_files, interval)
+
     # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
     # __init__, __call__
     # & helpers
@@ -1248,6 +2067,13 @@ class _deco_base():
             deco_settings_keys=set(deco_settings_map),
             extra_settings_dict=_used_keywords_dict
         )
+        # 0.3.2 Environment variables (e.g. LOG_CALLS_MUTE=1) override both;
+        # remember the settings file, for reload_settings_files
+        env_settings = self._get_env_settings()
+        if env_settings:
+            self._changed_settings.update(env_settings)
+        self._settings_file = (self._settings_file_path(settings)
+                               if isinstance(settings, str) else '')
 
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
         # Initialize effective_settings_dict with log_calls's defaults - the static ones.
@@ -1261,22 +2087,17 @@ class _deco_base():
         effective_settings_dict.update(self._changed_settings)
         self._effective_settings = effective_settings_dict
 
-        def _make_token_sequence(names) -> tuple:
-            """names is either a string of space- and/or comma-separated umm tokens,
-            or is already a sequence of tokens.
-            Return tuple of tokens."""
-            if isinstance(names, str):
-                names = names.replace(',', ' ').split()
-            return tuple(map(str, names))
-
-        self._omit_ex = self._omit = _make_token_sequence(_omit)
-        self._only_ex = self._only = _make_token_sequence(_only)
+        self._omit_ex = self._omit = make_token_sequence(_omit)
+        self._only_ex = self._only = make_token_sequence(_only)
 
         self.prefix = prefix                # special case
         self._name_param = _name_param
-        self._other_values_dict = other_values_dict     # 0.3.0
+        # 0.3.0 only `max_history` is used (by __call__); don't keep the dict
+        self._max_history_param = env_settings.get('max_history',
+                                                   other_values_dict.get('max_history', 0))
 
         self._override = _override                      # 0.3.0b18
+        self._inner_template = None                     # 0.3.2 (_inner_deco)
 
         # initialize sentinel strings
         if not self.__class__._sentinels:
@@ -1284,6 +2105,93 @@ class _deco_base():
 
         # 0.3.0 Factored out rest of __init__ to function case of __call__
 
+    # 0.3.2
+    def _admit_output(self, max_rate, collapse_secs, prefixed_fname,
+                      call_list, args, kwargs, logging_fn, indent_len):
+        """OutputLimiter.admit this call; write the notes it returns"""
+        limiter = self._output_limiter
+        if limiter is None:
+            limiter = self._output_limiter = OutputLimiter(prefixed_fname)
+        indent = ' ' * indent_len
+
+        def write(note):
+            logging_fn(indent + note)
+
+        key = (tuple(call_list), args_digest(args, kwargs)) if collapse_secs else None
+        admission = limiter.admit(max_rate, collapse_secs, key, time.monotonic(), write)
+        for note in admission.notes:
+            write(note)
+        return admission
+
+    @staticmethod
+    def flush_repeats():
+        """Write the notes about the runs of repeated calls that
+        collapse_repeats is folding (of all deco classes). Called at exit."""
+        for deco in list(_deco_base._all_decos):
+            if deco._output_limiter is not None:
+                deco._output_limiter.flush()
+
+    # 0.3.2
+    def _apply_control(self):
+        """Look f up in the rules of control, which changed since last time"""
+        epoch = self.control.epoch
+        self._control_overrides = self.control.overrides_for(
+            '%s.%s' % (self.f.__module__, self.f.__qualname__), self.f.__qualname__)
+        self._control_epoch = epoch
+
+    # 0.3.2
+    def _sampled(self) -> bool:
+        """Whether to log this call, sampling at the rate control says"""
+        self._sample_credit += self._control_overrides.sample
+        if self._sample_credit >= 1.0 - 1e-9:       # 10 * 0.1 < 1.0
+            self._sample_credit -= 1.0
+            return True
+        return False
+
+    # 0.3.2
+    def _clone(self):
+        """A copy of self as __init__ left it: a decorator of the same class,
+        with the same settings, not yet applied to anything. Much cheaper
+        than constructing one (no settings are parsed or read)."""
+        deco = object.__new__(self.__class__)
+        deco._changed_settings = self._changed_settings.copy()
+        deco._effective_settings = self._effective_settings.copy()
+        deco._settings_file = self._settings_file
+        deco._omit_ex = deco._omit = self._omit
+        deco._only_ex = deco._only = self._only
+        deco.prefix = self.prefix
+        deco._name_param = self._name_param
+        deco._max_history_param = self._max_history_param
+        deco._override = self._override
+        deco._inner_template = None
+        return deco
+
+    # 0.3.2
+    def _inner_deco(self, settings: dict, omit=(), only=()):
+        """A decorator of this class for a member of the class that self
+        decorates, with the given settings, sharing self's settings file --
+        as self.__class__(**settings, omit=omit, only=only) would be,
+        but made by cloning a template: a decorator with just the defaults
+        (and environment settings), made once per class decorator."""
+        template = self._inner_template
+        if template is None:
+            template = self._inner_template = self.__class__()
+        deco = template._clone()
+        deco._inner_template = template     # for its members, if it's an inner class
+        deco_settings_map = DecoSettingsMapping.get_deco_class_settings_dict(self.__class__.__name__)
+        changed = {k: v for k, v in settings.items() if k in deco_settings_map}
+        env_settings = self._get_env_settings()
+        changed.update(env_settings)
+        deco._changed_settings = changed
+        deco._effective_settings.update(changed)
+        deco._omit_ex = deco._omit = make_token_sequence(omit)
+        deco._only_ex = deco._only = make_token_sequence(only)
+        deco.prefix = settings.get('prefix', '')
+        deco._max_history_param = env_settings.get('max_history',
+                                                   settings.get('max_history', 0))
+        deco._settings_file = self._settings_file
+        return deco
+
     @property
     def omit(self): return self._omit_ex
 
@@ -1300,7 +2208,8 @@ class _deco_base():
                 return True
         return False
 
-    def _add_property_method_names(self, cls, method_specs: tuple) -> tuple:
+    def _add_property_method_names(self, cls, method_specs: tuple,
+                                   cls_properties=None) -> tuple:
         """For each name in method_specs (a tuple),
         if name is of the form propertyname.suffix
         where suffix is in ('getter', 'setter', 'deleter'),
@@ -1322,6 +2231,10 @@ class _deco_base():
         :param method_specs: self._omit or self._only
                              members are names of methods/fns,
                              or propertyname.suffix as described above
+        :param cls_properties: list of (name, property) pairs of the
+                             properties in cls.__dict__; if None,
+                             it's computed here. (_class__call__ scans
+                             cls.__dict__ once for both omit & only.)
         :return: tuple - method_specs_ex, consisting of the method specs
                  in method_specs, each followed by any & all added
                  property functions, with no duplicates
@@ -1331,11 +2244,12 @@ class _deco_base():
         # Make list/collection of properties in cls,
         #   plus their names
         # Note that item.__qualname__ == cls_prefix + item.__name__
-        cls_properties = []
-        for name, item in cls.__dict__.items():
-            if type(item) == property:
-                # properties don't HAVE __name__s or __qualname__s
-                cls_properties.append((name, item))
+        if cls_properties is None:
+            cls_properties = self._get_class_properties(cls)
+
+        # Nothing to add: skip the pattern compilation etc. below
+        if not cls_properties or not method_specs:
+            return tuple(no_duplicates(method_specs))
 
         # return value; method_specs_ex will contain method_specs
         method_specs_ex = []
@@ -1355,13 +2269,19 @@ class _deco_base():
                 pattern = method_spec
                 suffixes = tuple(PROPERTY_USER_SUFFIXES_to_ATTRS.keys())
 
+            # Compile pattern once, not once per (property, suffix)
+            match = GlobMatcher((pattern,)).match
+
             matching_props_suffixes_and_flags = []
             for name, prop in cls_properties:
+                if match(name):
+                    matches_qualname = False
+                elif match(cls_prefix + name):
+                    matches_qualname = True
+                else:
+                    continue
                 for sfx in suffixes:
-                    if fnmatch.fnmatchcase(name, pattern):
-                        matching_props_suffixes_and_flags.append((prop, sfx, False))
-                    elif fnmatch.fnmatchcase(cls_prefix + name, pattern):
-                        matching_props_suffixes_and_flags.append((prop, sfx, True))
+                    matching_props_suffixes_and_flags.append((prop, sfx, matches_qualname))
 
             if not matching_props_suffixes_and_flags:
                 continue
@@ -1386,6 +2306,14 @@ class _deco_base():
 
         return tuple(no_duplicates(method_specs_ex))
 
+    @staticmethod
+    def _get_class_properties(cls) -> list:
+        """Return list of (name, property) pairs for the properties in cls.__dict__
+        (properties don't HAVE __name__s or __qualname__s)."""
+        return [(name, item)
+                for name, item in cls.__dict__.items()
+                if type(item) == property]
+
     ### 0.3.0b18
     def _update_settings(self, new: dict, old: dict, override_existing: bool):
         new.update({k: v
@@ -1425,9 +2353,6 @@ class _deco_base():
             and each of these yields the function to deal with (or None).
         """
 
-        # Convenience function
-        _any_match = partial(any_match, fnmatch.fnmatchcase)
-
         # Fixup self._only, self._omit,
         # so that if a named method (function) of the class is specified
         # via propertyname.getter or .setter or .deleter
@@ -1435,21 +2360,42 @@ class _deco_base():
         # Otherwise, if the function gets enumerated after the property
         # in loop through klass.__dict__ below, it won't be recognized
         # by name as something to omit or decorate-only.
-        self._omit_ex = self._add_property_method_names(klass, self._omit)
-        self._only_ex = self._add_property_method_names(klass, self._only)
+        # The properties of klass are collected just once, for both.
+        cls_properties = self._get_class_properties(klass)
+        self._omit_ex = self._add_property_method_names(klass, self._omit, cls_properties)
+        self._only_ex = self._add_property_method_names(klass, self._only, cls_properties)
+
+        # Members' decorators are clones of a template made from the
+        # current defaults (made anew if self decorates another class)
+        self._inner_template = None
+
+        # Compile omit & only just once for the whole class:
+        # literal names are looked up in a set,
+        # globs are combined into a single regex.
+        omit_matcher = GlobMatcher(self._omit_ex)
+        only_matcher = GlobMatcher(self._only_ex) if self._only else None
+        cls_prefix = klass.__qualname__ + '.'
 
         ## Equivalently,
         # for name in klass.__dict__:
         #     item = klass.__getattribute__(klass, name)
 
         for name, item in klass.__dict__.items():
-            actual_item = getattr(klass, name)
+            # Classify item from the class dict alone -- getattr(klass, name)
+            # would needlessly invoke the descriptor protocol for every entry.
             # If item is a staticmethod or classmethod,
-            # actual_item is the underlying function;
-            # if item is a function (instance method) or class, actual_item is item.
-            # In all these cases, actual_item is callable.
-            # If item is a property, it's not callable, and actual_item is item.
-            if not (callable(actual_item) or type(item) == property):
+            # func is the underlying function (== getattr(klass, name), resp.
+            # getattr(klass, name).__func__ -- cf. _get_underlying_function);
+            # if item is a function (instance method), func is item.
+            # Classes (inner classes) and properties are handled below.
+            item_type = type(item)
+            if item_type == staticmethod or item_type == classmethod:
+                func = item.__func__
+                if not callable(func):
+                    continue
+            elif inspect.isfunction(item):
+                func = item
+            elif not (inspect.isclass(item) or item_type == property):
                 continue
 
             #-------------------------------------------------------
@@ -1479,8 +2425,8 @@ class _deco_base():
                     new_only = deco_obj._only or self._only
                     new_omit += deco_obj._omit
 
-                new_class = self.__class__(
-                    settings=new_settings,
+                new_class = self._inner_deco(
+                    new_settings,
                     only=new_only,
                     omit=new_omit
                 )(item)
@@ -1523,14 +2469,13 @@ class _deco_base():
                     # (4 cuz func.__name__ == name if @property and @propname.xxxer decos used)
                     dont_decorate = False
                     namelist = [pre + fn
-                                for pre in ('',
-                                            klass.__qualname__ + '.')
+                                for pre in ('', cls_prefix)
                                 for fn in {name,                        # varies faster than pre
                                            name + '.' + PROPERTY_ATTRS_to_USER_SUFFIXES[attr],
                                            func_name}]
-                    if _any_match(namelist, self._omit_ex):
+                    if omit_matcher.any_match(namelist):
                         dont_decorate = True
-                    if self._only and not _any_match(namelist, self._only_ex):
+                    if only_matcher is not None and not only_matcher.any_match(namelist):
                         dont_decorate = True
 
                     # get a fresh copy for each attr
@@ -1559,7 +2504,7 @@ class _deco_base():
                         #   new_funcs[attr] = func
                     else:                              # not deco'd
                         # so decorate it
-                        new_func = self.__class__(** new_settings)(func)
+                        new_func = self._inner_deco(new_settings)(func)
                         # update property
                         new_funcs[attr] = new_func
                         # Possibly update klass definition of func with new_func
@@ -1590,17 +2535,16 @@ class _deco_base():
 
             #-------------------------------------------------------
             # Handle instance, static, class methods.
-            # All we know is, actual_item is callable
+            # func is the underlying function, which is callable
             #-------------------------------------------------------
             # Filter with self._only and self._omit.
             dont_decorate = False
-            namelist = [name, klass.__qualname__ + '.' + name]
-            if _any_match(namelist, self._omit_ex):
+            namelist = (name, cls_prefix + name)
+            if omit_matcher.any_match(namelist):
                 dont_decorate = True
-            if self._only and not _any_match(namelist, self._only_ex):
+            if only_matcher is not None and not only_matcher.any_match(namelist):
                 dont_decorate = True
 
-            func = _get_underlying_function(item, actual_item)
             # not hasattr(func, '__name') and etc: assume it's <deco_name>_wrapper
             # SO if user creates a classmethod that's a partial,
             # it can't & won't be deco'd. No tragedy.
@@ -1638,7 +2582,7 @@ class _deco_base():
                 # decorate it, using self._changed_settings
                 # record_history doesn't know from 'settings' param,
                 # cuz it really doesn't need one, so instead we do:
-                new_func = self.__class__(** new_settings)(func)
+                new_func = self._inner_deco(new_settings)(func)
 
                 # if necessary, rewrap with @classmethod or @staticmethod
                 if type(item) == staticmethod:
@@ -1802,16 +2746,34 @@ class _deco_base():
             self._num_calls_total = 0
             self._num_calls_logged = 0
             # max_history > 0 --> size of self._call_history; <= 0 --> unbounded
-            # Set before calling _make_call_history
-
-            # 0.3.0 self._other_values_dict set by __init__
-            self.max_history = self._other_values_dict.get('max_history', 0)  # <-- Nota bene
-            self._call_history = self._make_call_history()
+            # _make_call_history uses it; the deque is made
+            # when the first call is recorded (_add_to_history)
+
+            # 0.3.0 self._max_history_param set by __init__
+            self.max_history = self._max_history_param  # <-- Nota bene
+            self._call_history = None
+            self._shared_row = None
+            self._jsonl_encoder = None
+            self._control_epoch = -1        # look f up in control at the first call
+            self._output_limiter = None
+            self._control_overrides = None
+            self._sample_credit = 0.0
+            _deco_base._all_decos.add(self)
 
             # Accumulate this (for logged calls only)
             # even when record_history is false:
             self._elapsed_secs_logged = 0.0
             self._process_secs_logged = 0.0
+            # 0.3.2 ... less the overhead of the wrappers of decorated callees
+            self._elapsed_secs_corrected = 0.0
+            self._process_secs_corrected = 0.0
+            # 0.3.2 log_memory, log_resources totals
+            self._memory_logged = None
+            self._resources_logged = None
+            self._size_profile = None
+            # 0.3.2 For metrics_text
+            self._num_calls_raised = 0
+            self._elapsed_buckets = None
 
             # 0.2.2.post1
             # stack(s), pushed & popped wrapper of deco'd function
@@ -1828,9 +2790,26 @@ class _deco_base():
             self.f_signature = inspect.signature(f)     # Py >= 3.3
             self.f_params = self.f_signature.parameters
 
+            # Functions decorated by a class or module decorator
+            # almost always have identical settings dicts: share them.
+            self._changed_settings = share_dict(self._changed_settings)
+            self._effective_settings = share_dict(self._effective_settings)
+
             # 0.3.0 We assume Py3.3 so we use perf_counter, process_time all the time
-            wall_time_fn = time.perf_counter
-            process_time_fn = time.process_time
+            # 0.3.2 ... in ns; the `clocks` setting chooses the CPU-time clock
+            wall_time_ns = time.perf_counter_ns
+            cpu_clocks = DecoSettingClocks.CPU_CLOCKS
+            overhead_tally = _overhead_tally
+
+            # 0.3.2 record_history has no `format`, `clocks`, `log_memory`
+            # or `log_resources` setting
+            has_format_setting = 'format' in self._settings_mapping._deco_class_settings_dict
+            has_clocks_setting = 'clocks' in self._settings_mapping._deco_class_settings_dict
+            has_probe_settings = 'log_memory' in self._settings_mapping._deco_class_settings_dict
+            has_limit_settings = 'max_rate' in self._settings_mapping._deco_class_settings_dict
+            # 0.3.2 cache_calls: the memo of f's return values
+            cache = self._make_cache()
+            control = self.control
 
             #############################
             # The wrapper of a callable
@@ -1846,13 +2825,6 @@ class _deco_base():
                 #     (4) using self._settings_mapping.get_final_value in wrapper
                 # [[[ This/these is/are 4th chronologically ]]]
 
-                # inner/local fn -- save a few cycles and characters -
-                # we call this a lot (<= 9x).
-                def _get_final_value(setting_name):
-                    "Use outer scope's kwargs and self.f_params"
-                    return self._settings_mapping.get_final_value(
-                        setting_name, kwargs, fparams=self.f_params)
-
                 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
                 # if nothing to do, hurry up & don't do it.
                 # NOTE: call_chain_to_next_log_calls_fn looks in stack frames
@@ -1860,7 +2832,23 @@ class _deco_base():
                 # It and its values (the following _XXX variables)
                 # must be set before calling f.
                 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-                _enabled = _get_final_value('enabled')
+                # No closure over kwargs: these are called directly, <= 9x
+                get_final_value = self._settings_mapping.get_final_value
+                f_params = self.f_params
+
+                # 0.3.2 The switches of control override `enabled` & `mute`;
+                # f is looked up in them only after they change
+                if control.epoch != self._control_epoch:
+                    self._apply_control()
+                overrides = self._control_overrides     # None, usually
+                if overrides is None:
+                    _enabled = get_final_value('enabled', kwargs, fparams=f_params)
+                else:
+                    _enabled = (get_final_value('enabled', kwargs, fparams=f_params)
+                                if overrides.enabled is None else
+                                overrides.enabled)
+                    if overrides.sample is not None and _enabled > 0 and not self._sampled():
+                        _enabled = 0
                 # 0.3.0 in case f calls log_message (no output if f disabled)
                 self._enabled_state_push(_enabled)
 
@@ -1868,13 +2856,17 @@ class _deco_base():
                 if _enabled < 0:
                     ret = f(*args, **kwargs)
                     self._enabled_state_pop()
+                    overhead_tally.ns += self._overhead_ns_bypassed
                     return ret
 
+                # 0.3.2 Time spent in the wrapper, outside of f, is overhead
+                t_enter = wall_time_ns()
+
                 # Bump call counters, before calling fn.
                 # Note: elapsed_secs, process_secs not reflected yet of course
                 self._add_call(logged=_enabled)
 
-                _log_call_numbers = _get_final_value('log_call_numbers')
+                _log_call_numbers = get_final_value('log_call_numbers', kwargs, fparams=f_params)
                 # counters just got bumped
                 _active_call_number = (self._stats.num_calls_logged
                                        if _log_call_numbers else
@@ -1886,12 +2878,13 @@ class _deco_base():
                 # Bump _extra_indent_level if last fn on call_list is deco'd AND enabled,
                 # o/w it's the _extra_indent_level which that fn 'inherited'.
                 # _extra_indent_level: prev_indent_level, or prev_indent_level + 1
-                do_indent = _get_final_value('indent')
+                do_indent = get_final_value('indent', kwargs, fparams=f_params)
                 _extra_indent_level = (prev_indent_level +
                                        int(not not do_indent and not not _enabled))
                 # 0.3.0
                 ########## prefixed_fname = _get_final_value('prefix') + f.__name__
-                prefixed_fname = _get_final_value('prefix') + self.f_display_name
+                prefixed_fname = (get_final_value('prefix', kwargs, fparams=f_params)
+                                  + self.f_display_name)
 
                 # Stackframe hack:
                 assert '_deco_base__active_call_items__' == STACKFRAME_HACK_DICT_NAME
@@ -1901,7 +2894,7 @@ class _deco_base():
                     '_prefixed_fname': prefixed_fname,          # Hack alert (Pt 1)
                     '_active_call_number': _active_call_number,
                     '_extra_indent_level': _extra_indent_level,
-                    # 0.3.0 for _get_own_deco_wrapper
+                    # 0.3.0 the deco object
                     '_wrapper_deco': self
                 }
 
@@ -1909,7 +2902,11 @@ class _deco_base():
                 # For the benefit of callees further down the call chain,
                 # if this f is not enabled (_enabled <= 0).
                 # Subclass can return None to suppress printed/logged output.
-                logging_fn = self.get_logging_fn(_get_final_value)
+                # context: per-call state passed to handlers (see call_context.py);
+                # context.final_value(setting_name) is what get_logging_fn needs.
+                # Its remaining pre-call fields are set below, once known.
+                context = CallContext(self, args, kwargs)
+                logging_fn = self.get_logging_fn(context.final_value)
 
                 # Only do global indentation for print, not for loggers
                 global_indent_len = max(_extra_indent_level, 0) * self.INDENT
@@ -1924,7 +2921,51 @@ class _deco_base():
                 # cuz this value will be pushed,
                 # and when popped any realtime changes to global mute
                 # made during call to f would be ignored.
-                mute = _get_final_value('mute')
+                mute = (get_final_value('mute', kwargs, fparams=f_params)
+                        if overrides is None or overrides.mute is None else
+                        overrides.mute)
+
+                # 0.3.2 The `format` setting: 'text', or
+                #   'jsonl'   -- instead of the pre- & post-call lines, write
+                #                one JSON object after the call (see jsonl.py).
+                #                What log_calls.print & co. write during the
+                #                call is wrapped in JSON objects too.
+                #   'compact' -- write the pre- & post-call messages as one
+                #                line after the call, with the depth of the call
+                #                in place of indentation.
+                _format = (get_final_value('format', kwargs, fparams=f_params)
+                           if _enabled and logging_fn and has_format_setting else
+                           'text')
+                jsonl = _format == 'jsonl'
+                compact = _format == 'compact'
+                write_record = logging_fn
+                logging_state_mute = mute
+                if jsonl:
+                    call_num = context.call_num
+                    encoder = self._get_jsonl_encoder()
+
+                    def logging_fn(msg):
+                        write_record(encoder.encode_message(
+                            prefixed_fname, call_num, _extra_indent_level, msg))
+                elif compact:
+                    # No entry & exit lines for log_calls.print & co. to align
+                    # with: as when muted, don't indent, and prefix the name.
+                    global_indent_len = 0
+                    logging_state_mute = max(mute, self.MUTE.CALLS)
+
+                # 0.3.2 max_rate, collapse_repeats: write the output of only
+                # some calls (see output_limits.py). The others are muted,
+                # and counted, recorded etc. as usual.
+                admission = None
+                if has_limit_settings and _enabled and logging_fn and not mute:
+                    max_rate = get_final_value('max_rate', kwargs, fparams=f_params)
+                    collapse = get_final_value('collapse_repeats', kwargs, fparams=f_params)
+                    if max_rate or collapse or self._output_limiter is not None:
+                        admission = self._admit_output(max_rate, collapse, prefixed_fname,
+                                                       call_list, args, kwargs,
+                                                       logging_fn, global_indent_len)
+                        if not admission.logged:
+                            mute = logging_state_mute = self.MUTE.ALL
 
                 # 0.2.2 -- self._log_message() will use
                 # the logging_fn, indent_len and output_fname at top of these stacks;
@@ -1932,89 +2973,53 @@ class _deco_base():
                 # to write their blather.
                 # There's a stack of logging-state ,
                 # used by self._log_message(), maintained in this wrapper.
-                self._logging_state_push(logging_fn, global_indent_len, output_fname, mute)
+                self._logging_state_push(logging_fn, global_indent_len, output_fname,
+                                         logging_state_mute)
 
                 # (_xxx variables set, ok to call f)
                 if not _enabled:
-                    ret = f(*args, **kwargs)
+                    _current_call_token = _current_call.set(self)
+                    t0_wall = wall_time_ns()
+                    try:
+                        ret = f(*args, **kwargs)
+                    except Exception:
+                        self._num_calls_raised += 1     # 0.3.2
+                        raise
+                    finally:
+                        _current_call.reset(_current_call_token)
                     self._logging_state_pop(enabled_too=True)
+                    # (what's left after f returns is in the calibrated part)
+                    overhead_tally.ns += t0_wall - t_enter + self._overhead_ns_disabled
                     return ret
 
                 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-                # Set up context, for pre-call handlers
-                # (after calling f, add to it for post-call handlers)
-                # THIS is the time sink - 23x slower than other 'blocks'
+                # Finish setting up context, for pre-call handlers
+                # (after calling f, add to it for post-call handlers).
+                # This used to be the time sink: a fresh dict of ~20 items.
+                # Now the argument-related items (argnames, argvals, varargs,
+                # *_kwargs, ...) are computed only if a handler asks for them.
                 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-                # Key/values of "context" whose values we know so far:
-                context = {
-                    'decorator': self,
-                    'settings': self._settings_mapping,
-                    'stats': self._stats,
-                    'prefixed_fname': prefixed_fname,
-                    'fparams': self.f_params,
-                    'call_list': call_list,
-                    'args': args,
-                    'kwargs': kwargs,
-                    'indent': " " * self.INDENT,              # our unit of indentation
-                    'output_fname': output_fname,
-                }
-
-                # Gather all the things we need (for log output, & for history)
-                # Use inspect module's Signature.bind method.
-                # bound_args.arguments -- contains only explicitly bound arguments
-                # 0.2.4.post5 - using
-                #     inspect.signature(f).bind(*args, **kwargs)
-                # took 45% of execution time of entire wrapper; this takes 23%:
-                # 0.3.1 TODO BUG No args is a problem?!
-                bound_args = self.f_signature.bind(*args, **kwargs)
-                """
-                 File "/Users/brianoneill/Desktop/Programming/Python-package-staging/log_calls/log_calls/tests/_temp.py", line 12, in <module>
-                    g(f())
-                 File "/Users/brianoneill/Desktop/Programming/Python-package-staging/log_calls/log_calls/log_calls.py", line 1935, in _deco_base_f_wrapper_
-                    bound_args = self.f_signature.bind(*args, **kwargs)
-                 File "/Library/Frameworks/Python.framework/Versions/3.4/lib/python3.4/inspect.py", line 2646, in bind
-                    return args[0]._bind(args[1:], kwargs)
-                  File "/Library/Frameworks/Python.framework/Versions/3.4/lib/python3.4/inspect.py", line 2571, in _bind
-                    raise TypeError('too many positional arguments') from None
-                TypeError: too many positional arguments
-                """
-
-                varargs_pos = get_args_pos(self.f_params)   # -1 if no *args in signature
-                argcount = varargs_pos if varargs_pos >= 0 else len(args)
-                context['argcount'] = argcount
-                # The first argcount-many things in bound_args
-                context['argnames'] = list(bound_args.arguments)[:argcount]
-                context['argvals'] = args[:argcount]
-
-                context['varargs'] = args[argcount:]
-                (context['varargs_name'],
-                 context['kwargs_name']) = get_args_kwargs_param_names(self.f_params)
-
-                # These 3 statements = 31% of execution time of wrapper
-                context['defaulted_kwargs'] = get_defaulted_kwargs_OD(self.f_params, bound_args)
-                context['explicit_kwargs'] = get_explicit_kwargs_OD(self.f_params, bound_args, kwargs)
-                # context['implicit_kwargs'] = {
-                #     k: kwargs[k] for k in kwargs if k not in context['explicit_kwargs']
-                # }
-                # At least 2x as fast:
-                context['implicit_kwargs'] = \
-                    difference_update(kwargs.copy(), context['explicit_kwargs'])
+                context.prefixed_fname = prefixed_fname
+                context.output_fname = output_fname
+                context.call_list = call_list
 
                 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
                 # Call pre-call handlers, collect nonempty return values
                 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
                 # only consult global mute in r/t
-                if not (mute or self.global_mute()):        # 0.3.0
-                    pre_msgs = []
+                pre_msgs = []
+                if not (mute or self.global_mute() or jsonl):        # 0.3.0
                     for setting_name in self._settings_mapping._pre_call_handlers:  # keys
-                        if _get_final_value(setting_name):
+                        # (0.3.2 _enabled is true here, maybe overridden by control)
+                        if (setting_name == 'enabled'
+                                or get_final_value(setting_name, kwargs, fparams=f_params)):
                             info = self._settings_mapping._get_DecoSetting(setting_name)
                             msg = info.pre_call_handler(context)
                             if msg:
                                 pre_msgs.append(msg)
 
-                    # Write pre-call messages
-                    if logging_fn:
+                    # Write pre-call messages (0.3.2 unless compact: after the call)
+                    if logging_fn and not compact:
                         for msg in pre_msgs:
                             self._log_message(msg, extra_indent_level=0)
 
@@ -2023,43 +3028,152 @@ class _deco_base():
                 # Add timestamp, elapsed time(s) and retval to context.
                 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
                 # No dictionary overhead between timer(s) start & stop.
-                t0 = time.time()                # for timestamp
-                t0_wall = wall_time_fn()
-                t0_process = process_time_fn()
-                retval = f(*args, **kwargs)
-                t_end_wall = wall_time_fn()
-                t_end_process = process_time_fn()
-                context['elapsed_secs'] = (t_end_wall - t0_wall)
-                context['process_secs'] = (t_end_process - t0_process)
-                context['timestamp'] = t0
-                context['retval'] = retval
-
-                self._add_to_elapsed(context['elapsed_secs'], context['process_secs'])
+                # 0.3.2 The `clocks` setting: 'process', 'thread', 'wall' or
+                # 'none' (times not measured are None). The timestamp is
+                # derived from the wall-clock start time (or t_enter).
+                clocks = (get_final_value('clocks', kwargs, fparams=f_params)
+                          if has_clocks_setting else
+                          'process')
+                if clocks not in cpu_clocks:    # an indirect value can be any str
+                    clocks = 'process'
+                timed = clocks != 'none'
+                cpu_time_ns = cpu_clocks[clocks]
+                # 0.3.2 log_memory, log_resources: probe the call too
+                # (see resources.py), outside of its timing
+                memory0 = resources0 = None
+                if has_probe_settings:
+                    if get_final_value('log_memory', kwargs, fparams=f_params):
+                        memory0 = memory_start()
+                    if get_final_value('log_resources', kwargs, fparams=f_params):
+                        resources0 = resources_start()
+                _current_call_token = _current_call.set(self)
+                # 0.3.2 start_tracing: this call is a span, the child of the
+                # span of the innermost enabled call in this context
+                tracer = _deco_base._tracer
+                if tracer is not None:
+                    span_parent = _current_span.get()
+                    span_id = tracer.new_span_id()
+                    span_token = _current_span.set(span_id)
+                    span_call_num = self._num_calls_logged
+                overhead_before = overhead_tally.ns
+                t0_wall = wall_time_ns() if timed else t_enter
+                t0_cpu = cpu_time_ns() if cpu_time_ns else 0
+                try:
+                    if cache is None:
+                        retval = f(*args, **kwargs)
+                    else:
+                        # 0.3.2 Call f from this frame, not from a helper:
+                        # call_chain_to_next_log_calls_fn expects the caller
+                        # of a decorated function to be its wrapper
+                        key, retval = cache.lookup(args, kwargs)
+                        if retval is CACHE_MISS:
+                            retval = f(*args, **kwargs)
+                            cache.store(key, retval, wall_time_ns() - t0_wall)
+                except Exception as e:
+                    self._num_calls_raised += 1     # 0.3.2
+                    if memory0:     # pop its entry off the stack of probed calls
+                        memory_end(memory0)
+                    if tracer is not None:
+                        tracer.add_span(span_id, span_parent, prefixed_fname, span_call_num,
+                                        t0_wall, wall_time_ns(), bounded_repr(e), args, kwargs)
+                    if jsonl and not (mute or self.global_mute()):
+                        context.elapsed_secs = ((wall_time_ns() - t0_wall) / 1e9
+                                                if timed else None)
+                        context.process_secs = ((cpu_time_ns() - t0_cpu) / 1e9
+                                                if cpu_time_ns else None)
+                        context.timestamp = _TIMESTAMP_EPOCH + t0_wall / 1e9
+                        context.retval = None
+                        write_record(self._encode_jsonl_call(
+                            context, call_num, _extra_indent_level, exception=e))
+                    elif compact and not (mute or self.global_mute()):
+                        write_record(self._compact_record(
+                            pre_msgs, ['exception: ' + bounded_repr(e)],
+                            _extra_indent_level))
+                    raise
+                except BaseException:       # KeyboardInterrupt, SystemExit, ...
+                    if memory0:
+                        memory_end(memory0)
+                    raise
+                finally:
+                    _current_call.reset(_current_call_token)
+                    if tracer is not None:
+                        _current_span.reset(span_token)
+                if timed:
+                    elapsed_ns = wall_time_ns() - t0_wall
+                    cpu_ns = (cpu_time_ns() - t0_cpu) if cpu_time_ns else None
+                    # 0.3.2 less the overhead of the wrappers of decorated callees.
+                    # CPU time: less the same (wall-clock) overhead, which is
+                    # almost all CPU time
+                    overhead_ns = overhead_tally.ns - overhead_before
+                    context.elapsed_secs = elapsed_ns / 1e9
+                    context.elapsed_secs_corrected = max(elapsed_ns - overhead_ns, 0) / 1e9
+                    if cpu_ns is None:
+                        context.process_secs = context.process_secs_corrected = None
+                    else:
+                        context.process_secs = cpu_ns / 1e9
+                        context.process_secs_corrected = max(cpu_ns - overhead_ns, 0) / 1e9
+                    self._add_to_elapsed(context.elapsed_secs,
+                                         context.process_secs or 0.0,
+                                         context.elapsed_secs_corrected,
+                                         context.process_secs_corrected or 0.0)
+                else:
+                    context.elapsed_secs = context.process_secs = None
+                    context.elapsed_secs_corrected = context.process_secs_corrected = None
+                if tracer is not None:
+                    tracer.add_span(span_id, span_parent, prefixed_fname, span_call_num,
+                                    t0_wall, t0_wall + elapsed_ns if timed else wall_time_ns(),
+                                    None, args, kwargs)
+                if admission is not None and admission.repeat:
+                    self._output_limiter.add_repeat(context.elapsed_secs)
+                context.memory = memory_end(memory0) if memory0 else None
+                context.resources = resources_end(resources0) if resources0 else None
+                if memory0 or resources0:
+                    self._add_to_usage(context.memory, context.resources)
+                context.timestamp = _TIMESTAMP_EPOCH + t0_wall / 1e9
+                context.retval = retval
 
                 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
                 # Call post-call handlers, collect nonempty return values
                 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
                 # only consult global mute in r/t
-                if not (mute or self.global_mute()):        # 0.3.0
+                muted = mute or self.global_mute()          # 0.3.0
+                if not (muted or jsonl):
                     post_msgs = []
                     for setting_name in self._settings_mapping._post_call_handlers:  # keys
-                        if _get_final_value(setting_name):
+                        if compact and setting_name in self._settings_omitted_when_compact:
+                            continue
+                        # (as for pre-call handlers: _enabled, maybe overridden by
+                        # control, is true -- for record_history, it's the history switch)
+                        if (setting_name == 'enabled'
+                                or get_final_value(setting_name, kwargs, fparams=f_params)):
                             info = self._settings_mapping._get_DecoSetting(setting_name)
                             msg = info.post_call_handler(context)
                             if msg:
                                 post_msgs.append(msg)
 
                     # Write post-call messages
-                    if logging_fn:
+                    if compact:     # 0.3.2
+                        write_record(self._compact_record(
+                            pre_msgs, post_msgs, _extra_indent_level))
+                    elif logging_fn:
                         for msg in post_msgs:
                             self._log_message(msg, extra_indent_level=0)
                 # v0.3.0b22 -- if recording history, add record of call even if we're muted(!)
-                elif _get_final_value('record_history'):
-                    info = self._settings_mapping._get_DecoSetting('record_history')
-                    _ = info.post_call_handler(context)
+                # 0.3.2 -- likewise send the call event to a sink
+                else:
+                    for setting_name in self._settings_handled_when_muted:
+                        if get_final_value(setting_name, kwargs, fparams=f_params):
+                            info = self._settings_mapping._get_DecoSetting(setting_name)
+                            _ = info.post_call_handler(context)
+                    if not muted:       # 0.3.2 and jsonl
+                        write_record(self._encode_jsonl_call(
+                            context, call_num, _extra_indent_level))
 
                 self._logging_state_pop(enabled_too=True)
 
+                if timed:
+                    overhead_tally.ns += (wall_time_ns() - t_enter - elapsed_ns
+                                          + self._overhead_ns_enabled)
                 return retval
 
             self._add_function_attrs(f, _deco_base_f_wrapper_)
@@ -2178,7 +3292,13 @@ class _deco_base():
         hit_bottom = False      # break both loops: reached <module>
         while not found_enabled and not hit_bottom:
             while 1:    # until found a deco'd fn or <module> reached
-                curr_funcname = curr_frame.f_code.co_name
+                # Skip placeholders of lazily decorated functions & classes
+                # (import_hook.py) -- only present on their first call.
+                curr_code = curr_frame.f_code
+                if curr_code is LAZY_STUB_CODE or curr_code is LAZY_NEW_CODE:
+                    curr_frame = curr_frame.f_back
+                    continue
+                curr_funcname = curr_code.co_name
                 if curr_funcname == '_deco_base_f_wrapper_':
                     # Previous was decorated inner fn, fixup; overwrite '_deco_base_f_wrapper_'
                     # with name of wrapped function
@@ -2191,7 +3311,8 @@ class _deco_base():
 
                 call_list.append(curr_funcname)
 
-                if curr_funcname == '<module>':
+                # 0.3.2 -- bottom of a thread's stack has no <module> frame
+                if curr_funcname == '<module>' or curr_frame.f_back is None:
                     hit_bottom = True
                     break   # inner loop
 
@@ -2406,9 +3527,14 @@ class _deco_base():
     @classmethod
     def decorate_module(cls, mod: 'module',
                         functions=True, classes=True,
+                        lazy=False,
                         **setting_kwds) -> None:
         """
         :param cls: the decorator class (``log_calls`` or ``record_history``
+        :param lazy: if true, don't decorate anything yet: install placeholders
+                     that decorate each function when it's first called,
+                     and each class when it's first instantiated
+                     (see import_hook.py). Used by ``instrument_on_import``.
 
         Can't decorate builtins, attempting
             log_calls.decorate_class(dict, only='update')
@@ -2418,28 +3544,186 @@ class _deco_base():
         Only decorate things with sourcecode in module.
         As ever, don't try to deco builtins.
         """
+        cls._decorate_module_members(mod, functions, classes,
+                                     lazy=lazy, skip_decorated=False,
+                                     setting_kwds=setting_kwds)
+
+    @classmethod
+    def _decorate_module_members(cls, mod: 'module', functions, classes, *,
+                                 lazy, skip_decorated, setting_kwds: dict) -> (list, list):
+        """Guts of decorate_module.
+        :param skip_decorated: if true, leave alone functions & classes
+                               already decorated by cls; otherwise, as ever,
+                               update their settings with setting_kwds.
+        :return: names of the functions, and of the classes, (to be) decorated.
+        """
         module_filename = get_file_of_object(mod)
 
         if not (module_filename and inspect.ismodule(mod)):
-            return      # refuse, SILENTLY
+            return [], []   # refuse, SILENTLY
 
+        if lazy:
+            return cls._decorate_module_lazily(mod, functions, classes, setting_kwds)
+
+        sentinel = cls._set_class_sentinels()['DECO_OF']
+        # 0.3.2 Construct one decorator, and decorate with clones of it
+        template = cls(**setting_kwds)
+        fnames, classnames = [], []
         # Functions
         if functions:
             for name, f in inspect.getmembers(mod, inspect.isfunction):
+                if skip_decorated and hasattr(f, sentinel):
+                    continue
                 if get_file_of_object(f) == module_filename:
-                    vars(mod)[name] = cls(**setting_kwds)(f)
+                    vars(mod)[name] = template._clone()(f)
+                    fnames.append(name)
                     ### Note, vars(mod) also has key __package__,
                     ### .     e.g. 'sklearn.cluster' for mod = 'sklearn.cluster.k_means_'
         # Classes
         if classes:
             for name, kls in inspect.getmembers(mod, inspect.isclass):
+                if skip_decorated and sentinel in kls.__dict__:
+                    continue
                 if get_file_of_object(kls) == module_filename:
-                    _ = cls(**setting_kwds)(kls)
+                    _ = template._clone()(kls)
+                    classnames.append(name)
                 # assert _ == kls
+        return fnames, classnames
+
+    @classmethod
+    def _decorate_module_lazily(cls, mod: 'module', functions, classes,
+                                setting_kwds: dict) -> (list, list):
+        """Install lazy-decoration placeholders for the functions and classes
+        defined in mod. Nothing is inspected beyond ``__module__``:
+        "defined in mod" means ``obj.__module__ == mod.__name__``.
+        Things already decorated by cls are left alone.
+        :return: names of the functions, and of the classes, given placeholders.
+        """
+        namespace = vars(mod)
+        modname = mod.__name__
+        sentinel = cls._set_class_sentinels()['DECO_OF']
+        fnames, classnames = [], []
+        for name, item in list(namespace.items()):
+            if getattr(item, '__module__', None) != modname or hasattr(item, sentinel):
+                continue
+            if functions and inspect.isfunction(item):
+                namespace[name] = make_lazy_function(cls, item, namespace, setting_kwds)
+                fnames.append(name)
+            elif classes and inspect.isclass(item):
+                install_lazy_class_deco(cls, item, setting_kwds)
+                classnames.append(name)
+        return fnames, classnames
+
+    @classmethod
+    def decorate_package(cls, pkg: 'module',
+                         include='*', exclude=(),
+                         functions=True, classes=True,
+                         lazy=False, onerror=None,
+                         **setting_kwds) -> OrderedDict:
+        """Decorate the functions and/or classes of package ``pkg``
+        and of all its submodules & subpackages, recursively,
+        as decorate_module would.
+
+        :param include: names of modules to decorate, as for ``omit`` and ``only``:
+                        a string of names separated by whitespace and/or commas,
+                        or a sequence of strings. Names are full module names
+                        (e.g. 'sklearn.cluster.k_means_'), and can be globs.
+                        Default: '*', everything.
+        :param exclude: names of modules NOT to decorate, as for include.
+                        Excluded subpackages aren't searched (or imported).
+        :param functions, classes, lazy: as for decorate_module
+        :param onerror: as for pkgutil.walk_packages: a function called with
+                        the name of each module that fails to import.
+                        Without it, modules that raise ImportError are
+                        skipped, and other exceptions propagate.
+        :param setting_kwds: settings for decorator
+        :return: OrderedDict, module name |-> ModuleDecoration namedtuple
+                 (module_name, functions, classes, elapsed_secs)
+                 for each module decorated, in the order decorated.
+                 functions and classes are lists of names of things wrapped;
+                 elapsed_secs is the time decorating took.
+
+        Functions and classes already decorated by cls are left as they are.
+        Plain modules are imported only if they're included;
+        subpackages, only if they're not excluded.
+        """
+        include = make_token_sequence(include)
+        exclude = make_token_sequence(exclude)
+        include_matcher = GlobMatcher(include)
+        exclude_matcher = GlobMatcher(exclude)
+
+        report = OrderedDict()
+
+        def _decorate(mod):
+            t0 = time.perf_counter()
+            fnames, classnames = cls._decorate_module_members(
+                mod, functions, classes,
+                lazy=lazy, skip_decorated=True, setting_kwds=setting_kwds)
+            report[mod.__name__] = ModuleDecoration(
+                mod.__name__, fnames, classnames, time.perf_counter() - t0)
+
+        def _decorate_rec(package):
+            for info in pkgutil.iter_modules(package.__path__, package.__name__ + '.'):
+                modname = info.name
+                if exclude_matcher.match(modname):
+                    continue
+                included = include_matcher.match(modname)
+                if not (included or info.ispkg):
+                    continue
+                try:
+                    mod = importlib.import_module(modname)
+                except ImportError:
+                    if onerror is not None:
+                        onerror(modname)
+                    continue
+                except Exception:
+                    if onerror is None:
+                        raise
+                    onerror(modname)
+                    continue
+                if included:
+                    _decorate(mod)
+                if info.ispkg and hasattr(mod, '__path__'):
+                    _decorate_rec(mod)
+
+        if not inspect.ismodule(pkg) or exclude_matcher.match(pkg.__name__):
+            return report
+        if include_matcher.match(pkg.__name__):
+            _decorate(pkg)
+        if hasattr(pkg, '__path__'):
+            _decorate_rec(pkg)
+        return report
+
+    @classmethod
+    def instrument_on_import(cls, modules, functions=True, classes=True,
+                             **setting_kwds) -> DecoratingFinder:
+        """Decorate modules as they're imported: install a ``sys.meta_path``
+        import hook which, for every module subsequently imported whose name
+        matches ``modules``, does
+            cls.decorate_module(mod, functions, classes, lazy=True, **setting_kwds)
+        Decoration is lazy: a function is decorated when it's first called,
+        a class when it's first instantiated.
+
+        :param modules: module name(s) to instrument, as for ``omit`` and ``only``:
+                        a string of names separated by whitespace and/or commas,
+                        or a sequence of strings. Names can be globs, e.g. 'mypkg.*'.
+        :param functions, classes: as for decorate_module
+        :param setting_kwds: settings for decorator
+        :return: the installed finder. Call its ``uninstall()`` method
+                 to stop instrumenting modules imported thereafter.
+        """
+        return DecoratingFinder(cls, make_token_sequence(modules),
+                                functions=functions, classes=classes,
+                                **setting_kwds).install()
 
 #----------------------------------------------------------------------------
 # log_calls
 #----------------------------------------------------------------------------
+atexit.register(_deco_base.flush_repeats)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_deco_base._after_fork_in_child)
+
+
 class log_calls(_deco_base):
     """
     This decorator logs the caller of a decorated function, and optionally
@@ -2477,6 +3761,19 @@ class log_calls(_deco_base):
                           (Default: False)
         log_elapsed:      If true, display how long it took the function to execute,
                           in seconds. (Default: False)
+        clocks:            what times calls: 'process', elapsed time and process CPU time;
+                           'thread', elapsed time and CPU time of the calling thread
+                           (reported as process_secs); 'wall', elapsed time only;
+                           'none', neither. Times not measured are None. (Default: 'process')
+        log_memory:        If true, display the memory a call allocated (if tracemalloc
+                           is tracing), and the garbage collections during it.
+                           (Default: False)
+        log_resources:     If true, display the context switches and block I/O
+                           of a call (from resource.getrusage). (Default: False)
+        size_of:           If not None, the name of a parameter whose argument is (a number)
+                           or has (a len()) the size of a call's input, or a callable
+                           that's passed the arguments and returns it: calls are
+                           profiled by size, in stats.size_profile. (Default: None)
         indent:            if true, log messages for each level of log_calls-decorated
                            functions will be indented by 4 spaces, when printing
                            and not using a logger (default: True (0.3.0))
@@ -2490,6 +3787,15 @@ class log_calls(_deco_base):
         logger:            If not None (the default), a Logger which will be used
                            (instead of the print function) to write all messages.
         loglevel:          logging level, if logger != None. (Default: logging.DEBUG)
+        format:            'text'; 'compact', to write what 'text' would as one line
+                           after each call; or 'jsonl', to write one JSON object
+                           per call (see jsonl.py). (Default: 'text')
+        max_rate:          most calls per second whose output is written, on average
+                           (a token bucket); 0, no limit. (Default: 0)
+        collapse_repeats:  if nonzero, a run of consecutive calls with the same caller
+                           chain and arguments is written as its first call and a line
+                           counting the rest, once the run ends or is this many seconds
+                           old (True: 1). (Default: 0)
         mute:              setting. 3-valued:
                             log_calls.MUTE.NOTHING  (default -- all output produced)
                             alias False
@@ -2568,6 +3874,8 @@ class log_calls(_deco_base):
             supply `name='%s'`.
             Ignored when decorating a class.
     """
+    __slots__ = ()
+
     # *** DecoSettingsMapping "API" --
     # (1) initialize: call register_class_settings
 
@@ -2579,6 +3887,10 @@ class log_calls(_deco_base):
         DecoSettingArgs('log_args'),
         DecoSettingRetval('log_retval'),
         DecoSettingElapsed('log_elapsed'),
+        DecoSettingClocks('clocks'),                                                          # 0.3.2
+        DecoSettingMemory('log_memory'),                                                      # 0.3.2
+        DecoSettingResources('log_resources'),                                                # 0.3.2
+        DecoSettingSizeOf('size_of'),                                                         # 0.3.2
         DecoSettingExit('log_exit'),
         DecoSetting_bool('indent',           bool,           True,          allow_falsy=True),
         DecoSetting_bool('log_call_numbers', bool,           False,         allow_falsy=True),
@@ -2589,6 +3901,10 @@ class log_calls(_deco_base):
         DecoSettingLogger('logger',          (logging.Logger,
                                               str),          None,          allow_falsy=True),
         DecoSetting_int('loglevel',          int,            logging.DEBUG, allow_falsy=False),
+        DecoSettingFormat('format'),                                                          # 0.3.2
+        DecoSettingSink('sink',              str,            None,          allow_falsy=True),   # 0.3.2
+        DecoSetting_float('max_rate',        (int, float),   0,             allow_falsy=True),   # 0.3.2
+        DecoSetting_float('collapse_repeats', (int, float),  0,             allow_falsy=True),   # 0.3.2
         DecoSetting_int('mute',              int,            False,         allow_falsy=True,
                         allow_indirect=True, mutable=True),
         DecoSettingHistory('record_history'),
@@ -2613,6 +3929,10 @@ class log_calls(_deco_base):
                  log_args=True,
                  log_retval=False,
                  log_elapsed=False,
+                 clocks='process',  # 0.3.2 or 'thread', 'wall', 'none'
+                 log_memory=False,      # 0.3.2
+                 log_resources=False,   # 0.3.2
+                 size_of=None,          # 0.3.2 parameter name, or callable: size of input
                  log_exit=True,
                  indent=True,            # 0.3.0, this seems the better default
                  log_call_numbers=False,
@@ -2620,6 +3940,10 @@ class log_calls(_deco_base):
                  file=None,    # detectable value so we late-bind to sys.stdout
                  logger=None,
                  loglevel=logging.DEBUG,
+                 format='text',     # 0.3.2 or 'compact', 'jsonl': one line per call
+                 sink=None,         # 0.3.2 URL of a sink for call events, e.g. 'unix:///path'
+                 max_rate=0,        # 0.3.2 most calls logged per second; 0: no limit
+                 collapse_repeats=0,    # 0.3.2 secs: fold runs of identical calls; 0: don't
                  mute=False,
                  record_history=False,
                  max_history=0,
@@ -2647,6 +3971,10 @@ class log_calls(_deco_base):
             log_args=log_args,
             log_retval=log_retval,
             log_elapsed=log_elapsed,
+            clocks=clocks,
+            log_memory=log_memory,
+            log_resources=log_resources,
+            size_of=size_of,
             log_exit=log_exit,
             indent=indent,
             log_call_numbers=log_call_numbers,
@@ -2654,6 +3982,10 @@ class log_calls(_deco_base):
             file=file,
             logger=logger,
             loglevel=loglevel,
+            format=format,
+            sink=sink,
+            max_rate=max_rate,
+            collapse_repeats=collapse_repeats,
             mute=mute,
             record_history=record_history,
             max_history=max_history,
@@ -2672,6 +4004,9 @@ class log_calls(_deco_base):
 
     mute = False        # CLASS level attribute
 
+    _settings_handled_when_muted = ('size_of', 'record_history', 'sink')    # 0.3.2
+    _settings_omitted_when_compact = ('log_exit',)                          # 0.3.2
+
     # 0.3.0
     @classmethod
     def global_mute(cls) -> bool:
@@ -0,0 +1,181 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+Metrics of decorated functions in the Prometheus text exposition format
+(version 0.0.4, which OpenMetrics scrapers accept too), for
+`log_calls.metrics_text()` and `log_calls.serve_metrics()`.
+
+All the numbers come from counters that the wrapper keeps up to date on
+every call -- including a histogram of elapsed times, a list of counts
+per bucket -- so rendering costs O(#functions), however many calls or
+how much history there is.
+"""
+import http.server
+import threading
+from collections import namedtuple
+
+__all__ = ['ELAPSED_BUCKET_BOUNDS', 'FuncMetrics', 'render_metrics', 'MetricsServer']
+
+
+# Upper bounds of the buckets of the elapsed-time histogram, in seconds:
+# 1, 2.5, 5 per decade from 1us to 10s. (A last bucket counts the rest.)
+ELAPSED_BUCKET_BOUNDS = tuple(
+    float('%se%d' % (m, e)) for e in range(-6, 1) for m in ('1', '2.5', '5')
+) + (10.0,)
+
+
+#-----------------------------------------------------------------------------
+# FuncMetrics namedtuple: input to render_metrics
+#-----------------------------------------------------------------------------
+
+FuncMetrics = namedtuple(
+    "FuncMetrics",
+    (
+        'function',             # label value: prefixed display name
+        'num_calls_total',
+        'num_calls_logged',
+        'num_calls_raised',
+        'elapsed_secs_logged',
+        'process_secs_logged',
+        'elapsed_buckets',      # counts per bucket, or None if no logged calls
+    )
+)
+
+
+def _label(value: str) -> str:
+    return (value.replace('\\', r'\\')
+                 .replace('"', r'\"')
+                 .replace('\n', r'\n'))
+
+
+def _num(x) -> str:
+    return repr(float(x)) if isinstance(x, float) else str(x)
+
+
+def render_metrics(namespace, func_metrics) -> str:
+    """Text exposition of func_metrics (FuncMetrics), with metric names
+    beginning with namespace + '_'. Rows with the same function are summed.
+
+    >>> print(render_metrics('deco', [
+    ...     FuncMetrics('f', 3, 2, 1, 0.5, 0.25, [0] * 18 + [1, 1, 0, 0, 0]),
+    ... ]), end='')         # doctest: +ELLIPSIS
+    # HELP deco_functions Number of decorated functions.
+    # TYPE deco_functions gauge
+    deco_functions 1
+    # HELP deco_calls_total Calls, logged or not.
+    # TYPE deco_calls_total counter
+    deco_calls_total{function="f"} 3
+    # HELP deco_logged_calls_total Logged calls.
+    # TYPE deco_logged_calls_total counter
+    deco_logged_calls_total{function="f"} 2
+    # HELP deco_errors_total Calls that raised an exception.
+    # TYPE deco_errors_total counter
+    deco_errors_total{function="f"} 1
+    # HELP deco_process_seconds_total Process (CPU) time of logged calls.
+    # TYPE deco_process_seconds_total counter
+    deco_process_seconds_total{function="f"} 0.25
+    # HELP deco_wall_seconds Elapsed (wall-clock) time of logged calls.
+    # TYPE deco_wall_seconds histogram
+    deco_wall_seconds_bucket{function="f",le="1e-06"} 0
+    ...
+    deco_wall_seconds_bucket{function="f",le="0.5"} 0
+    deco_wall_seconds_bucket{function="f",le="1.0"} 1
+    deco_wall_seconds_bucket{function="f",le="2.5"} 2
+    deco_wall_seconds_bucket{function="f",le="5.0"} 2
+    deco_wall_seconds_bucket{function="f",le="10.0"} 2
+    deco_wall_seconds_bucket{function="f",le="+Inf"} 2
+    deco_wall_seconds_sum{function="f"} 0.5
+    deco_wall_seconds_count{function="f"} 2
+    """
+    nbuckets = len(ELAPSED_BUCKET_BOUNDS) + 1
+    merged = {}
+    for fm in func_metrics:
+        buckets = fm.elapsed_buckets or [0] * nbuckets
+        prev = merged.get(fm.function)
+        if prev is None:
+            merged[fm.function] = [fm.num_calls_total, fm.num_calls_logged,
+                                   fm.num_calls_raised, fm.elapsed_secs_logged,
+                                   fm.process_secs_logged, list(buckets)]
+        else:
+            for i, x in enumerate(fm[1:-1]):
+                prev[i] += x
+            prev[-1] = [a + b for a, b in zip(prev[-1], buckets)]
+
+    rows = [(_label(function),) + tuple(vals)
+            for function, vals in sorted(merged.items())]
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append('# HELP %s_%s %s' % (namespace, name, help_text))
+        lines.append('# TYPE %s_%s %s' % (namespace, name, kind))
+
+    family('functions', 'gauge', "Number of decorated functions.")
+    lines.append('%s_functions %d' % (namespace, len(rows)))
+
+    for name, index, help_text in (
+            ('calls_total', 1, "Calls, logged or not."),
+            ('logged_calls_total', 2, "Logged calls."),
+            ('errors_total', 3, "Calls that raised an exception."),
+            ('process_seconds_total', 5, "Process (CPU) time of logged calls.")):
+        family(name, 'counter', help_text)
+        for row in rows:
+            lines.append('%s_%s{function="%s"} %s'
+                         % (namespace, name, row[0], _num(row[index])))
+
+    family('wall_seconds', 'histogram', "Elapsed (wall-clock) time of logged calls.")
+    bounds = [repr(b) for b in ELAPSED_BUCKET_BOUNDS] + ['+Inf']
+    for row in rows:
+        function, buckets = row[0], row[6]
+        cumulative = 0
+        for le, count in zip(bounds, buckets):
+            cumulative += count
+            lines.append('%s_wall_seconds_bucket{function="%s",le="%s"} %d'
+                         % (namespace, function, le, cumulative))
+        lines.append('%s_wall_seconds_sum{function="%s"} %s'
+                     % (namespace, function, _num(row[4])))
+        lines.append('%s_wall_seconds_count{function="%s"} %d'
+                     % (namespace, function, cumulative))
+
+    return '\n'.join(lines) + '\n'
+
+
+#-----------------------------------------------------------------------------
+# MetricsServer
+#-----------------------------------------------------------------------------
+class MetricsServer():
+    """Serves text_fn() at http://host:port/metrics from a daemon thread.
+    port=0 picks a free port; see .port. stop() shuts it down."""
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self, text_fn, port, host='127.0.0.1'):
+        content_type = self.CONTENT_TYPE
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = text_fn().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass        # no stderr line per scrape
+
+        self.server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.host, self.port = self.server.server_address[:2]
+        self._thread = threading.Thread(target=self.server.serve_forever,
+                                        name='log_calls metrics', daemon=True)
+        self._thread.start()
+
+    def __repr__(self):
+        return '<%s http://%s:%d/metrics>' % (self.__class__.__name__, self.host, self.port)
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
@@ -0,0 +1,223 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+OutputLimiter -- for the `max_rate` and `collapse_repeats` settings: which
+calls of a decorated function have their output written, and what to write
+about the ones that don't. Calls whose output is suppressed are still
+counted, recorded in history, sent to sinks...: only the text is reduced.
+
+max_rate: a token bucket. Calls are logged at up to max_rate per second on
+average, in bursts of up to max(1, max_rate); the next call logged after
+some weren't is preceded by a line saying how many weren't.
+
+collapse_repeats: a run of consecutive calls with the same key (the call
+chain and the arguments) is written as its first call, then one line
+saying how many more there were and their min/avg/max elapsed times.
+That line is written when a call with another key comes along, or
+collapse_repeats seconds after the run began -- by a daemon thread, the
+sweeper, if no call comes along to do it -- or by flush()
+(log_calls.flush_repeats(), also called at exit).
+The times are those of the repeats that returned: one that raised is
+counted, but not timed.
+
+An OutputLimiter is shared by the threads calling its function, so its
+methods take a lock.
+"""
+import heapq
+import os
+import threading
+from collections import namedtuple
+from itertools import count
+from time import monotonic as _monotonic     # the sweeper's clock, not admit's `now`
+
+__all__ = ['OutputLimiter', 'Admission']
+
+
+# What OutputLimiter.admit says about a call:
+#   logged: write its output?
+#   repeat: it's a repeat, folded into a run: pass its elapsed time to add_repeat
+#   notes:  lines to write before its output (or in place of it)
+Admission = namedtuple("Admission", ('logged', 'repeat', 'notes'))
+
+_ADMITTED = Admission(True, False, ())
+
+
+class OutputLimiter():
+    """
+    >>> lim = OutputLimiter('f')
+    >>> [lim.admit(0, 10, 'k', now=t).logged for t in (0.0, 0.1, 0.2)]
+    [True, False, False]
+    >>> lim.add_repeat(0.5); lim.add_repeat(1.5)
+    >>> lim.admit(0, 10, 'other key', now=0.3)
+    Admission(logged=True, repeat=False, notes=['f: 2 more identical calls; elapsed secs min 0.5, avg 1, max 1.5'])
+    >>> lim = OutputLimiter('g')
+    >>> [lim.admit(2, 0, None, now=t).logged for t in (0.0, 0.1, 0.2, 0.3)]
+    [True, True, False, False]
+    >>> lim.admit(2, 0, None, now=1.0)
+    Admission(logged=True, repeat=False, notes=['g: 2 calls not logged (max_rate=2)'])
+    """
+    __slots__ = ('name',
+                 '_tokens', '_refilled', '_not_logged',
+                 '_key', '_run_start', '_repeats',
+                 '_timed', '_min_secs', '_max_secs', '_sum_secs', '_write',
+                 '_deadline', '_queued', '_lock')
+
+    def __init__(self, name):
+        self.name = name            # for the notes: prefixed display name
+        self._tokens = None         # max_rate: full, at the first call
+        self._refilled = 0.0
+        self._not_logged = 0
+        self._key = None            # collapse_repeats: the run of repeats
+        self._run_start = 0.0
+        self._repeats = 0
+        self._write = None          # writes the note about the run
+        self._deadline = None       # when the sweeper ends the run (its clock)
+        self._queued = False        # with the sweeper?
+        self._lock = threading.Lock()
+        self._reset_run_times()
+
+    def _reset_run_times(self):
+        self._timed = 0             # repeats passed to add_repeat
+        self._min_secs = self._max_secs = None
+        self._sum_secs = 0.0
+
+    def admit(self, max_rate, collapse_secs, key, now, write=None) -> Admission:
+        """Decide whether to log a call (now: time.monotonic()).
+        write: function that can write the note about the run this call
+        might begin, for flush()."""
+        with self._lock:
+            return self._admit(max_rate, collapse_secs, key, now, write)
+
+    def _admit(self, max_rate, collapse_secs, key, now, write) -> Admission:
+        notes = ()
+        if collapse_secs:
+            if key == self._key and now - self._run_start < collapse_secs:
+                self._repeats += 1
+                return Admission(False, True, ())
+            notes = self._end_run()
+            self._key = key
+            self._run_start = now
+            self._write = write
+            self._deadline = _monotonic() + collapse_secs
+            if not self._queued:
+                self._queued = True
+                _sweeper.add(self, self._deadline)
+        elif self._key is not None:
+            notes = self._end_run()
+            self._key = self._write = None
+
+        if max_rate:
+            burst = max(1.0, max_rate)
+            if self._tokens is None:
+                self._tokens = burst
+            else:
+                self._tokens = min(burst, self._tokens + (now - self._refilled) * max_rate)
+            self._refilled = now
+            if self._tokens < 1.0:
+                self._not_logged += 1
+                return Admission(False, False, notes)
+            self._tokens -= 1.0
+            if self._not_logged:
+                notes = list(notes)
+                notes.append("%s: %d call%s not logged (max_rate=%s)"
+                             % (self.name, self._not_logged,
+                                '' if self._not_logged == 1 else 's', max_rate))
+                self._not_logged = 0
+        return Admission(True, False, notes) if notes else _ADMITTED
+
+    def add_repeat(self, elapsed_secs):
+        """Add the elapsed time of a call that admit said is a repeat
+        (None if not measured)"""
+        if elapsed_secs is None:
+            return
+        with self._lock:
+            self._timed += 1
+            self._sum_secs += elapsed_secs
+            if self._min_secs is None or elapsed_secs < self._min_secs:
+                self._min_secs = elapsed_secs
+            if self._max_secs is None or elapsed_secs > self._max_secs:
+                self._max_secs = elapsed_secs
+
+    def _end_run(self) -> list:
+        """[note about the repeats of the run], or [] if it had none"""
+        if not self._repeats:
+            return []
+        note = "%s: %d more identical call%s" % (
+            self.name, self._repeats, '' if self._repeats == 1 else 's')
+        if self._min_secs is not None:
+            note += "; elapsed secs min %.6g, avg %.6g, max %.6g" % (
+                self._min_secs, self._sum_secs / self._timed, self._max_secs)
+        self._repeats = 0
+        self._reset_run_times()
+        return [note]
+
+    def flush(self):
+        """Write the note about the current run of repeats, if any,
+        and begin a new run"""
+        with self._lock:
+            notes = self._end_run()
+            write = self._write
+            self._key = self._write = None
+        if notes and write is not None:
+            for note in notes:
+                write(note)
+
+    def _sweep(self):
+        """(Called by the sweeper, at self's deadline) End the run, unless
+        a new one has begun since -- whose deadline is later"""
+        with self._lock:
+            deadline = self._deadline
+            if self._key is not None and deadline is not None and deadline > _monotonic():
+                _sweeper.add(self, deadline)
+                return
+            self._queued = False
+            self._deadline = None
+        self.flush()
+
+
+class _Sweeper():
+    """A daemon thread that calls _sweep() of OutputLimiters at their
+    deadlines. Each limiter is queued at most once."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queue = []            # heap of (deadline, seq, limiter)
+        self._seq = count().__next__
+        self._thread = None
+
+    def add(self, limiter, deadline):
+        with self._cond:
+            heapq.heappush(self._queue, (deadline, self._seq(), limiter))
+            if self._thread is None:
+                self._start()
+            self._cond.notify()
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='log_calls repeats sweeper')
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                deadline, _, limiter = self._queue[0]
+                delay = deadline - _monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                heapq.heappop(self._queue)
+            limiter._sweep()
+
+    def _after_fork_in_child(self):
+        # The parent's thread doesn't exist here; the queue is ours now
+        self._cond = threading.Condition()
+        self._thread = None
+        if self._queue:
+            self._start()
+
+
+_sweeper = _Sweeper()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_sweeper._after_fork_in_child)
@@ -81,6 +81,9 @@ class ClassInstanceAttrProxy():
     # for a given descr_name (attr name) they'd be the same :)
     _classes_and_attrs_proxied = set()
 
+    __slots__ = ('_proxied_instance_',
+                 '__dict__')    # (instance attributes can shadow method descriptors)
+
     def __init__(self, *, class_instance, data_descriptor_names, method_descriptor_names):
         """What makes these work is the class_instance arg,
         which a descriptor uses to access a class_instance
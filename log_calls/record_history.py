@@ -11,6 +11,8 @@ from .used_unused_kwds import used_unused_keywords
 class record_history(_deco_base):
     """
     """
+    __slots__ = ()
+
     # allow indirection for all except prefix and max_history, which also isn't mutable
     _setting_info_list = (
         DecoSetting('log_call_numbers', bool, True,   allow_falsy=True, visible=False),
@@ -0,0 +1,233 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+Record and replay: calls recorded in call history, saved to a file, and
+later re-run on the undecorated function as a micro-benchmark.
+
+Step 1, where the real calls happen (record_history=True, or record_history):
+
+    from log_calls.replay import save_calls
+    save_calls(parse, 'parse-calls.pkl')        # all of parse.stats.history
+    save_calls(parse, 'slow-calls.pkl',
+               [rec for rec in parse.stats.history if rec.elapsed_secs > 0.1])
+
+Step 2, anywhere the function is importable:
+
+    python -m log_calls.replay parse-calls.pkl [--repeat 5] [--tolerance 0.2]
+
+or, in a test, replay('parse-calls.pkl') -> ReplayReport.
+
+The arguments of each call are pickled; calls whose arguments can't be
+pickled aren't saved, nor are calls that would take the file past its size
+budget (max_bytes). History records hold the arguments of calls, not
+copies: an argument that was changed after the call (by the function,
+say) is saved as it is now. Each run of a saved call unpickles a fresh
+copy of its arguments, so a function that mutates its arguments sees the
+same inputs every time. The replayed function is the undecorated one: the wrappers of
+log_calls, record_history and cache_calls are peeled off (a cache would
+make every run but the first a hit).
+
+Only load files you trust: loading unpickles them.
+"""
+import argparse
+import importlib
+import pickle
+import statistics
+import sys
+import time
+from collections import namedtuple
+
+__all__ = ['save_calls', 'load_calls', 'replay', 'undecorated',
+           'SavedCalls', 'SavedCall', 'ReplayResult', 'ReplayReport', 'main']
+
+_FORMAT_VERSION = 1
+
+
+SavedCalls = namedtuple("SavedCalls", ('function', 'calls'))    # function: 'module:qualname'
+SavedCall = namedtuple("SavedCall", ('call_num', 'elapsed_secs', 'pickled_args'))
+
+ReplayResult = namedtuple(
+    "ReplayResult",
+    ('call_num', 'recorded_secs',
+     'min_secs', 'median_secs', 'max_secs',
+     'ratio')       # median_secs / recorded_secs, or None if not recorded
+)
+
+
+def undecorated(f):
+    """f, less any wrappers of log_calls, record_history or cache_calls"""
+    while getattr(getattr(f, '__code__', None), 'co_name', None) == '_deco_base_f_wrapper_':
+        f = f.__wrapped__
+    return f
+
+
+def _function_name(f) -> str:
+    return '%s:%s' % (f.__module__, f.__qualname__)
+
+
+def _import_function(name):
+    module_name, _, qualname = name.partition(':')
+    obj = importlib.import_module(module_name)
+    for attr in qualname.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+#-----------------------------------------------------------------------------
+# Saving & loading
+#-----------------------------------------------------------------------------
+
+def save_calls(f, path, records=None, *, max_bytes=1 << 20) -> int:
+    """Save the arguments and elapsed times of records (CallRecords of
+    decorated function f; default: all of f.stats.history) to path.
+    Return how many were saved."""
+    if records is None:
+        records = f.stats.history
+    calls = []
+    total = 0
+    for rec in records:
+        args = tuple(rec.argvals) + tuple(rec.varargs)
+        kwargs = dict(rec.explicit_kwargs)
+        kwargs.update(rec.implicit_kwargs)
+        try:
+            pickled = pickle.dumps((args, kwargs), pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            continue
+        if total + len(pickled) > max_bytes:
+            continue
+        total += len(pickled)
+        calls.append(SavedCall(rec.call_num, rec.elapsed_secs, pickled))
+
+    with open(path, 'wb') as fp:
+        pickle.dump({'version': _FORMAT_VERSION,
+                     'function': _function_name(undecorated(f)),
+                     'calls': [tuple(call) for call in calls]},
+                    fp, pickle.HIGHEST_PROTOCOL)
+    return len(calls)
+
+
+def load_calls(path) -> SavedCalls:
+    with open(path, 'rb') as fp:
+        saved = pickle.load(fp)
+    if not isinstance(saved, dict) or saved.get('version') != _FORMAT_VERSION:
+        raise ValueError("%s: not a file of saved calls, or of another version" % path)
+    return SavedCalls(saved['function'],
+                      [SavedCall(*call) for call in saved['calls']])
+
+
+#-----------------------------------------------------------------------------
+# Replaying
+#-----------------------------------------------------------------------------
+
+class ReplayReport():
+    """The results of replay: one ReplayResult per saved call"""
+    def __init__(self, function, repeat, results):
+        self.function = function        # 'module:qualname'
+        self.repeat = repeat
+        self.results = results
+
+    @property
+    def recorded_secs(self) -> float:
+        """Total recorded time of the calls that have one"""
+        return sum(res.recorded_secs for res in self.results if res.ratio is not None)
+
+    @property
+    def median_secs(self) -> float:
+        """Total median replay time of the calls that have a recorded time"""
+        return sum(res.median_secs for res in self.results if res.ratio is not None)
+
+    @property
+    def ratio(self):
+        """median_secs / recorded_secs: < 1, faster than recorded;
+        None if no call has a recorded time"""
+        recorded = self.recorded_secs
+        return self.median_secs / recorded if recorded else None
+
+    def slower(self, tolerance=0.1) -> list:
+        """The results whose median time is more than tolerance
+        (a fraction) slower than recorded"""
+        return [res for res in self.results
+                if res.ratio is not None and res.ratio > 1 + tolerance]
+
+    @property
+    def as_csv(self) -> str:
+        lines = ['|'.join(ReplayResult._fields)]
+        lines.extend('|'.join(map(str, res)) for res in self.results)
+        return '\n'.join(lines) + '\n'
+
+    @property
+    def as_DataFrame(self):
+        """The results as a Pandas DataFrame, or None if Pandas isn't installed"""
+        try:
+            import pandas as pd
+        except ImportError:
+            return None
+        return pd.DataFrame(self.results, columns=ReplayResult._fields)
+
+    def __str__(self):
+        lines = ["%s: %d calls, %d runs each"
+                 % (self.function, len(self.results), self.repeat),
+                 "%8s %14s %14s %14s %14s %7s"
+                 % ('call_num', 'recorded', 'min', 'median', 'max', 'ratio')]
+        for res in self.results:
+            lines.append("%8d %14s %14.9f %14.9f %14.9f %7s"
+                         % (res.call_num,
+                            '-' if res.recorded_secs is None else '%.9f' % res.recorded_secs,
+                            res.min_secs, res.median_secs, res.max_secs,
+                            '-' if res.ratio is None else '%.2f' % res.ratio))
+        ratio = self.ratio
+        lines.append("total: recorded %.6f secs, replayed (median) %.6f secs, ratio %s"
+                     % (self.recorded_secs, self.median_secs,
+                        '-' if ratio is None else '%.2f' % ratio))
+        return '\n'.join(lines)
+
+
+def replay(path, f=None, *, repeat=5) -> ReplayReport:
+    """Call the undecorated function repeat times on the arguments of each
+    call saved in path. f: the function (decorated or not); default, the
+    function the calls were saved from, imported by module & qualname."""
+    saved = load_calls(path)
+    f = undecorated(f if f is not None else _import_function(saved.function))
+    timer = time.perf_counter_ns
+    results = []
+    for call in saved.calls:
+        times = []
+        for _ in range(repeat):
+            args, kwargs = pickle.loads(call.pickled_args)
+            t0 = timer()
+            f(*args, **kwargs)
+            times.append((timer() - t0) / 1e9)
+        median = statistics.median(times)
+        results.append(ReplayResult(
+            call.call_num, call.elapsed_secs,
+            min(times), median, max(times),
+            median / call.elapsed_secs if call.elapsed_secs else None))
+    return ReplayReport(saved.function, repeat, results)
+
+
+#-----------------------------------------------------------------------------
+# main
+#-----------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m log_calls.replay',
+        description="Replay calls saved by log_calls.replay.save_calls, "
+                    "and compare their times with the recorded ones.")
+    parser.add_argument('path', metavar='FILE', help="file written by save_calls")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="run each call this many times (default: 5)")
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help="exit with status 1 if, in total, the calls are more than "
+                             "this fraction slower than recorded")
+    parser.add_argument('--csv', action='store_true', help="write the results as CSV")
+    args = parser.parse_args(argv)
+
+    report = replay(args.path, repeat=args.repeat)
+    print(report.as_csv if args.csv else report, end='' if args.csv else '\n')
+
+    if args.tolerance is not None and report.ratio is not None:
+        return int(report.ratio > 1 + args.tolerance)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+Support for `settings` files (see _deco_base._read_settings_file):
+
+    * file_signature -- (mtime_ns, size) of a file: a parsed settings file
+      is cached, and reused while its signature is unchanged. Decorating a
+      module or package with settings='path' makes a decorator per function,
+      each of which used to open and parse the file;
+    * SettingsWatcher -- a daemon thread that periodically calls a check
+      function (_deco_base.reload_settings_files), to push changes to
+      settings files into the settings of the callables decorated with them;
+    * env_settings_items -- the `<DECO>_<SETTING>` environment variables for
+      a decorator class, e.g. LOG_CALLS_ENABLED=False, LOG_CALLS_MUTE=1,
+      RECORD_HISTORY_MAX_HISTORY=100. Their values are written as in
+      settings files.
+"""
+import os
+import threading
+
+__all__ = ['file_signature', 'env_settings_items', 'SettingsWatcher']
+
+
+def file_signature(path):
+    """(mtime_ns, size) of the file at path, or None if it can't be stat'd"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def env_settings_items(deco_classname, setting_names, environ=None) -> list:
+    """[(setting name, value text)] of the environment variables named
+    deco_classname.upper() + '_' + setting name (in any case).
+
+    >>> env = {'LOG_CALLS_LOG_ARGS': 'False', 'LOG_CALLS_NO_DECO': 'True',
+    ...        'LOG_CALLS_NOPE': '1', 'RECORD_HISTORY_PREFIX': "'x.'"}
+    >>> sorted(env_settings_items('log_calls', ['log_args', 'NO_DECO', 'prefix'], env))
+    [('NO_DECO', 'True'), ('log_args', 'False')]
+    """
+    if environ is None:
+        environ = os.environ
+    prefix = deco_classname.upper() + '_'
+    names = {name.upper(): name for name in setting_names}
+    items = []
+    for var, val_txt in environ.items():
+        if var.startswith(prefix):
+            name = names.get(var[len(prefix):])
+            if name:
+                items.append((name, val_txt))
+    return items
+
+
+class SettingsWatcher():
+    """Calls check() every interval seconds, in a daemon thread,
+    until stop() is called. Exceptions raised by check are ignored."""
+    def __init__(self, check, interval=1.0):
+        self.interval = interval
+        self._check = check
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='log_calls settings watcher')
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self._check()
+            except Exception:
+                pass        # keep watching
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
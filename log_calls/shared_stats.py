@@ -0,0 +1,339 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+SharedStats -- call counts and times of decorated functions, aggregated
+across processes (multiprocessing.Pool, ProcessPoolExecutor workers).
+
+Each process's `stats` are plain attributes of its decorator objects,
+so they vanish when a worker process exits. Once sharing is turned on
+(`log_calls.share_stats()`), every logged call also adds its counts and
+times to a fixed-layout table in a multiprocessing.shared_memory block:
+
+    header      magic, max_functions, max_workers
+    workers     max_workers x pid                   (0 = free slot)
+    keys        max_functions x (length, utf-8 bytes)
+    cells       max_functions x max_workers x
+                    (num_calls_total, num_calls_logged,
+                     elapsed_secs_logged, process_secs_logged)
+
+A row is a function, keyed by decorator class, module and __qualname__
+("log_calls:pkg.mod.C.f"), so the same function has the same row in
+every process. A column is a worker process. Claiming a row or a column
+takes a lock; updating a cell takes only a per-process lock, for the
+threads of that process: each process writes only its own cells.
+Readers may see a cell mid-update -- these are statistics.
+
+Rows and columns are never freed, so counts survive the exit of the
+workers that made them; a process that finds no free column, or a
+function that finds no free row, just isn't counted (with a warning).
+"""
+import multiprocessing
+import multiprocessing.util
+import os
+import struct
+import threading
+import warnings
+import weakref
+import zlib
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+__all__ = ['SharedStats', 'FuncStats']
+
+
+#-----------------------------------------------------------------------------
+# FuncStats namedtuple, for all_stats
+#-----------------------------------------------------------------------------
+
+FuncStats = namedtuple(
+    "FuncStats",
+    (
+        'num_calls_logged',
+        'num_calls_total',
+        'elapsed_secs_logged',
+        'process_secs_logged',
+    )
+)
+
+
+#-----------------------------------------------------------------------------
+# SharedStats
+#-----------------------------------------------------------------------------
+class SharedStats():
+    """Table of per-function, per-process stats in shared memory.
+    Create it in the parent process (log_calls.share_stats does);
+    pass it to workers that don't fork, e.g.
+        ProcessPoolExecutor(initializer=log_calls.share_stats,
+                            initargs=(shared,))
+    It pickles as a reference to the same block of shared memory.
+
+    >>> shared = SharedStats(max_functions=4, max_workers=2)
+    >>> shared.add('log_calls:m.f', 1, 1, 0.5, 0.25)
+    >>> shared.add('log_calls:m.f', 1, 0, 0.0, 0.0)
+    >>> shared.totals()
+    {'log_calls:m.f': FuncStats(num_calls_logged=1, num_calls_total=2, elapsed_secs_logged=0.5, process_secs_logged=0.25)}
+    >>> shared.close()
+    >>> shared.add('log_calls:m.f', 1, 1, 0.5, 0.25)     # no-op once closed
+    >>> shared.totals()
+    {}
+    """
+    MAGIC = b'logcalls'
+    MAX_KEY_LEN = 254
+
+    _header = struct.Struct('<8sII')
+    _pid = struct.Struct('<q')
+    _key_len = struct.Struct('<H')
+    _cell = struct.Struct('<qqdd')
+
+    def __init__(self, max_functions=1024, max_workers=64, *,
+                 history_queue=None, mp_context=None):
+        """
+        :param max_functions: number of rows -- distinct decorated functions
+        :param max_workers: number of columns -- processes that can report,
+            over the lifetime of the table (including the parent)
+        :param history_queue: optional multiprocessing queue; if given,
+            each worker puts the call histories of its decorated functions
+            on it when it exits (see collect_history)
+        :param mp_context: multiprocessing context used to make the lock
+        """
+        if max_functions < 1 or max_workers < 1:
+            raise ValueError("max_functions and max_workers must be positive")
+        self.max_functions = max_functions
+        self.max_workers = max_workers
+        self.history_queue = history_queue
+        self._lock = (mp_context or multiprocessing).Lock()
+        self._shm = shared_memory.SharedMemory(create=True, size=self._size())
+        self._owner_pid = os.getpid()
+        self._header.pack_into(self._shm.buf, 0,
+                               self.MAGIC, max_functions, max_workers)
+        self._attach()
+
+    def _size(self):
+        return (self._header.size
+                + self.max_workers * self._pid.size
+                + self.max_functions * (self._key_len.size + self.MAX_KEY_LEN)
+                + self.max_functions * self.max_workers * self._cell.size)
+
+    def _attach(self):
+        """Set up the per-process state: offsets, caches, no column yet."""
+        self._buf = self._shm.buf
+        self._workers_off = self._header.size
+        self._keys_off = self._workers_off + self.max_workers * self._pid.size
+        self._cells_off = (self._keys_off
+                           + self.max_functions * (self._key_len.size + self.MAX_KEY_LEN))
+        self._rows = {}         # key -> row, or -1 if the table is full
+        self._worker = None     # our column; claimed by the first add
+        self._cell_lock = threading.Lock()  # our cells, among our threads
+        self._warned = False
+        _instances.add(self)
+
+    # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # pickling: refer to the same shared memory
+    # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def __getstate__(self):
+        return (self._shm.name, self.max_functions, self.max_workers,
+                self.history_queue, self._lock, self._owner_pid)
+
+    def __setstate__(self, state):
+        (name, self.max_functions, self.max_workers,
+         self.history_queue, self._lock, self._owner_pid) = state
+        self._shm = shared_memory.SharedMemory(name=name)
+        if bytes(self._shm.buf[:len(self.MAGIC)]) != self.MAGIC:
+            raise ValueError("shared memory block %r isn't a SharedStats table" % name)
+        self._attach()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._buf is None
+
+    def close(self):
+        """Detach from the table; the process that created it also
+        destroys it. Afterwards add() does nothing and totals() is empty."""
+        if self._buf is None:
+            return
+        self._buf = None
+        self._shm.close()
+        if os.getpid() == self._owner_pid:
+            self._shm.unlink()
+
+    # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # rows & columns
+    # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def _key_at(self, row):
+        off = self._keys_off + row * (self._key_len.size + self.MAX_KEY_LEN)
+        n, = self._key_len.unpack_from(self._buf, off)
+        off += self._key_len.size
+        return bytes(self._buf[off:off + n])
+
+    def _claim_row(self, key: str) -> int:
+        """Find or claim the row of key (linear probing from crc32(key),
+        which, unlike hash(), is the same in every process)."""
+        bkey = key.encode('utf-8')[:self.MAX_KEY_LEN]
+        start = zlib.crc32(bkey) % self.max_functions
+        with self._lock:
+            for i in range(self.max_functions):
+                row = (start + i) % self.max_functions
+                existing = self._key_at(row)
+                if existing == bkey:
+                    return row
+                if not existing:
+                    off = self._keys_off + row * (self._key_len.size + self.MAX_KEY_LEN)
+                    self._buf[off + self._key_len.size:
+                              off + self._key_len.size + len(bkey)] = bkey
+                    self._key_len.pack_into(self._buf, off, len(bkey))
+                    return row
+        self._warn("no room for %r: increase max_functions (now %d)"
+                   % (key, self.max_functions))
+        return -1
+
+    def _claim_worker(self) -> int:
+        pid = os.getpid()
+        with self._lock:
+            for col in range(self.max_workers):
+                off = self._workers_off + col * self._pid.size
+                if self._pid.unpack_from(self._buf, off)[0] in (0, pid):
+                    self._pid.pack_into(self._buf, off, pid)
+                    break
+            else:
+                col = -1
+        if col < 0:
+            self._warn("no room for process %d: increase max_workers (now %d)"
+                       % (pid, self.max_workers))
+        elif pid != self._owner_pid and self.history_queue is not None:
+            multiprocessing.util.Finalize(self, SharedStats._ship_history,
+                                          args=(self,), exitpriority=10)
+        return col
+
+    def _warn(self, msg):
+        if not self._warned:
+            self._warned = True
+            warnings.warn("SharedStats: " + msg + "; not counting it", RuntimeWarning)
+
+    # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # write & read
+    # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    def row(self, key: str) -> int:
+        """Row of key (claimed if need be); -1 if there's no room."""
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = self._claim_row(key)
+        return row
+
+    def add_to_row(self, row, num_calls_total, num_calls_logged,
+                   elapsed_secs, process_secs, tally=None):
+        """Add to our cell in row (as returned by row()).
+        tally: optional list [num_calls_total, num_calls_logged,
+        elapsed_secs, process_secs] of what the caller has added,
+        which is kept up to date too, under the same lock."""
+        buf = self._buf
+        if buf is None or row < 0:
+            return
+        worker = self._worker
+        if worker is None:
+            with self._cell_lock:
+                if self._worker is None:
+                    self._worker = self._claim_worker()
+            worker = self._worker
+        if worker < 0:
+            return
+        off = self._cells_off + (row * self.max_workers + worker) * self._cell.size
+        with self._cell_lock:
+            t, l, e, p = self._cell.unpack_from(buf, off)
+            self._cell.pack_into(buf, off,
+                                 t + num_calls_total, l + num_calls_logged,
+                                 e + elapsed_secs, p + process_secs)
+            if tally is not None:
+                tally[0] += num_calls_total
+                tally[1] += num_calls_logged
+                tally[2] += elapsed_secs
+                tally[3] += process_secs
+
+    def add(self, key, num_calls_total, num_calls_logged,
+            elapsed_secs, process_secs):
+        """Add to our cell in the row of key."""
+        if self._buf is not None:
+            self.add_to_row(self.row(key), num_calls_total, num_calls_logged,
+                            elapsed_secs, process_secs)
+
+    def totals(self) -> dict:
+        """{key: FuncStats} summed over all processes, for every row in use."""
+        buf = self._buf
+        if buf is None:
+            return {}
+        ret = {}
+        for row in range(self.max_functions):
+            bkey = self._key_at(row)
+            if not bkey:
+                continue
+            t = l = 0
+            e = p = 0.0
+            off = self._cells_off + row * self.max_workers * self._cell.size
+            for (ct, cl, ce, cp) in self._cell.iter_unpack(
+                    buf[off:off + self.max_workers * self._cell.size]):
+                t += ct; l += cl; e += ce; p += cp
+            ret[bkey.decode('utf-8', 'replace')] = FuncStats(l, t, e, p)
+        return ret
+
+    # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # history, via history_queue
+    # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+    # Set by log_calls: () -> iterable of (key, history tuple) for this process
+    histories_fn = None
+    # A forked worker's inherited histories: key -> last call_num at fork
+    _call_nums_at_fork = None
+
+    def _note_fork(self):
+        self._worker = None
+        self._cell_lock = threading.Lock()  # another thread may have held it
+        if self.history_queue is not None and self.histories_fn is not None:
+            self._call_nums_at_fork = {
+                key: history[-1].call_num
+                for key, history in self.histories_fn()}
+
+    def _ship_history(self):
+        """Put the histories of this process, minus any it inherited,
+        on history_queue."""
+        if self.histories_fn is None:
+            return
+        at_fork = self._call_nums_at_fork or {}
+        for key, history in self.histories_fn():
+            if key in at_fork:
+                history = tuple(rec for rec in history
+                                if rec.call_num > at_fork[key])
+            if history:
+                try:
+                    self.history_queue.put((key, history))
+                except Exception:       # unpicklable args or retvals
+                    pass
+
+    def collect_history(self, timeout=0.1) -> dict:
+        """Drain history_queue: {key: [CallRecord, ...]} from workers
+        that have exited, in the order received."""
+        import queue
+        ret = {}
+        if self.history_queue is None:
+            return ret
+        while True:
+            try:
+                key, history = self.history_queue.get(timeout=timeout)
+            except queue.Empty:
+                return ret
+            ret.setdefault(key, []).extend(history)
+
+
+# SharedStats objects in this process; a forked child must claim its own column
+_instances = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    for shared in _instances:
+        shared._note_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,347 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+Sinks -- ship call events to a collector process, for the `sink` setting:
+
+    @log_calls(sink='unix:///run/log_calls.sock')
+    @log_calls(sink='unix:///run/log_calls.sock?digest_args=1')
+
+Each call of a function decorated with a sink appends a CallEvent to
+that sink's buffer and returns; a background thread sends the buffered
+events, in batches, to the Unix domain socket at the given path (see
+collector.py for the other end). The decorated code never waits on I/O:
+if the collector isn't there, batches are dropped, and if the sender
+falls behind, the buffer keeps only the newest events (both counted in
+the sink's `dropped`).
+
+With digest_args=1, each event carries a 64-bit digest of the call's
+arguments' reprs (0 otherwise), so identical calls can be spotted
+without shipping arguments.
+
+Wire format (little-endian), one frame per batch:
+
+    frame   := u32 size-of-rest  'LCEV'  u8 version  u32 pid
+               u16 nstrings  string*  u32 nevents  event*
+    string  := u16 nbytes  utf-8 bytes
+    event   := u16 fname  u8 nchain  u16 caller*nchain  u32 call_num
+               f64 timestamp  f64 elapsed_secs  f64 process_secs
+               u64 args_digest
+
+fname and the callers are indexes into the frame's strings, so the
+names that recur in a batch are sent once. Times that weren't measured
+(see the `clocks` setting) are NaN.
+"""
+import atexit
+import hashlib
+import os
+import socket
+import struct
+import threading
+from collections import namedtuple, deque
+from urllib.parse import urlsplit, parse_qs
+
+__all__ = ['CallEvent', 'UnixSocketSink', 'get_sink', 'parse_sink_url',
+           'encode_frame', 'decode_frames', 'FrameReader', 'args_digest']
+
+
+#-----------------------------------------------------------------------------
+# CallEvent namedtuple
+#-----------------------------------------------------------------------------
+
+CallEvent = namedtuple(
+    "CallEvent",
+    (
+        'fname',            # prefixed display name of the function
+        'caller_chain',     # tuple of names, most recent caller first
+        'call_num',
+        'timestamp',        # time.time() at start of call
+        'elapsed_secs', 'process_secs',     # NaN if not measured
+        'args_digest',      # 0 if not requested
+    )
+)
+
+
+#-----------------------------------------------------------------------------
+# Wire format
+#-----------------------------------------------------------------------------
+MAGIC = b'LCEV'
+VERSION = 1
+
+_frame_size = struct.Struct('<I')
+_frame_header = struct.Struct('<4sBI')      # magic, version, pid
+_u16 = struct.Struct('<H')
+_u32 = struct.Struct('<I')
+_event_head = struct.Struct('<HB')          # fname, nchain
+_event_tail = struct.Struct('<IdddQ')       # call_num ... args_digest
+_NAN = float('nan')                         # times not measured
+
+MAX_STR_BYTES = 0xffff
+MAX_STRINGS = 0xffff
+MAX_CHAIN = 0xff
+
+
+def encode_frame(pid, events) -> bytes:
+    """A frame holding events (CallEvents, or tuples in that order).
+    A frame can hold at most MAX_STRINGS distinct names.
+
+    >>> ev = CallEvent('f', ('g', '<module>'), 3, 1.5e9, 0.25, 0.125, 0)
+    >>> frame = encode_frame(1234, [ev, ev._replace(fname='g', caller_chain=('<module>',))])
+    >>> list(decode_frames(frame))      # doctest: +NORMALIZE_WHITESPACE
+    [(1234, [CallEvent(fname='f', caller_chain=('g', '<module>'), call_num=3,
+                       timestamp=1500000000.0, elapsed_secs=0.25,
+                       process_secs=0.125, args_digest=0),
+             CallEvent(fname='g', caller_chain=('<module>',), call_num=3,
+                       timestamp=1500000000.0, elapsed_secs=0.25,
+                       process_secs=0.125, args_digest=0)])]
+    """
+    strings = {}
+    def index(s):
+        i = strings.get(s)
+        if i is None:
+            i = strings[s] = len(strings)
+        return i
+
+    body = bytearray()
+    for (fname, chain, call_num, timestamp, elapsed, process, digest) in events:
+        chain = chain[:MAX_CHAIN]
+        body += _event_head.pack(index(fname), len(chain))
+        for caller in chain:
+            body += _u16.pack(index(caller))
+        body += _event_tail.pack(call_num & 0xffffffff, timestamp,
+                                 _NAN if elapsed is None else elapsed,
+                                 _NAN if process is None else process,
+                                 digest)
+
+    frame = bytearray(_frame_header.pack(MAGIC, VERSION, pid))
+    frame += _u16.pack(len(strings))
+    for s in strings:           # in index order
+        b = s.encode('utf-8')[:MAX_STR_BYTES]
+        frame += _u16.pack(len(b))
+        frame += b
+    frame += _u32.pack(len(events))
+    frame += body
+    return _frame_size.pack(len(frame)) + bytes(frame)
+
+
+def decode_frames(data):
+    """Generate (pid, [CallEvent, ...]) for each complete frame in data
+    (bytes); raises ValueError on a bad frame. See also FrameReader."""
+    data = memoryview(data)
+    pos = 0
+    while pos + _frame_size.size <= len(data):
+        size, = _frame_size.unpack_from(data, pos)
+        end = pos + _frame_size.size + size
+        if end > len(data):
+            break
+        yield _decode_frame(data[pos + _frame_size.size:end])
+        pos = end
+
+
+def _decode_frame(frame):
+    magic, version, pid = _frame_header.unpack_from(frame, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a log_calls event frame (version %d)" % VERSION)
+    pos = _frame_header.size
+    nstrings, = _u16.unpack_from(frame, pos)
+    pos += _u16.size
+    strings = []
+    for _ in range(nstrings):
+        n, = _u16.unpack_from(frame, pos)
+        pos += _u16.size
+        strings.append(bytes(frame[pos:pos + n]).decode('utf-8', 'replace'))
+        pos += n
+    nevents, = _u32.unpack_from(frame, pos)
+    pos += _u32.size
+    events = []
+    for _ in range(nevents):
+        fname, nchain = _event_head.unpack_from(frame, pos)
+        pos += _event_head.size
+        chain = tuple(strings[_u16.unpack_from(frame, pos + 2 * i)[0]]
+                      for i in range(nchain))
+        pos += 2 * nchain
+        events.append(CallEvent(strings[fname], chain,
+                                *_event_tail.unpack_from(frame, pos)))
+        pos += _event_tail.size
+    return pid, events
+
+
+class FrameReader():
+    """Reassembles frames from a byte stream read in arbitrary pieces."""
+    __slots__ = ('_buf',)
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def feed(self, data: bytes) -> list:
+        """Add data; return [(pid, [CallEvent, ...]), ...] for the frames completed."""
+        self._buf += data
+        frames = []
+        pos = 0
+        buf = self._buf
+        while pos + _frame_size.size <= len(buf):
+            size, = _frame_size.unpack_from(buf, pos)
+            end = pos + _frame_size.size + size
+            if end > len(buf):
+                break
+            frames.append(_decode_frame(bytes(buf[pos + _frame_size.size:end])))
+            pos = end
+        del self._buf[:pos]
+        return frames
+
+
+def args_digest(args, kwargs) -> int:
+    """64-bit digest of the reprs of args and kwargs."""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(repr(args).encode('utf-8', 'replace'))
+    h.update(repr(sorted(kwargs.items())).encode('utf-8', 'replace'))
+    return int.from_bytes(h.digest(), 'little')
+
+
+#-----------------------------------------------------------------------------
+# UnixSocketSink
+#-----------------------------------------------------------------------------
+class UnixSocketSink():
+    """Buffers CallEvents; a daemon thread sends them to a Unix socket
+    in frames of up to batch_size events, every flush_interval seconds
+    or as soon as a batch is full.
+    """
+    def __init__(self, path, *, digest_args=False,
+                 batch_size=512, flush_interval=0.5, max_buffered=100000):
+        self.path = path
+        self.digest_args = digest_args
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.sent = 0           # events
+        self.dropped = 0        # events in batches that couldn't be sent,
+                                # or pushed out of the full buffer
+        self._reset()
+
+    def _reset(self):
+        """Fresh per-process state (also after a fork)."""
+        self._buffer = deque(maxlen=self.max_buffered)
+        self._wake = threading.Event()
+        self._send_lock = threading.Lock()
+        self._sock = None
+        self._thread = None
+        self._pid = os.getpid()
+
+    def __repr__(self):
+        return '<%s %r>' % (self.__class__.__name__, self.path)
+
+    def add(self, event):
+        """Buffer event (a CallEvent or tuple in that order). Never blocks."""
+        buffer = self._buffer
+        if len(buffer) == self.max_buffered:
+            self.dropped += 1       # the oldest event, by append
+        buffer.append(event)
+        if self._thread is None:
+            self._start()
+        elif len(buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _start(self):
+        with self._send_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='log_calls sink %s' % self.path, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Send all buffered events now (in the calling thread)."""
+        with self._send_lock:
+            buffer = self._buffer
+            while buffer:
+                batch = []
+                try:
+                    for _ in range(self.batch_size):
+                        batch.append(buffer.popleft())
+                except IndexError:
+                    pass
+                self._send(encode_frame(self._pid, batch), len(batch))
+
+    def _send(self, frame, nevents):
+        try:
+            if self._sock is None:
+                self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self._sock.settimeout(5.0)
+                self._sock.connect(self.path)
+            self._sock.sendall(frame)
+            self.sent += nevents
+        except OSError:
+            self.dropped += nevents
+            self.close()
+
+    def close(self):
+        """Close the connection (the next batch reconnects)."""
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+
+#-----------------------------------------------------------------------------
+# get_sink: URL -> sink, one per URL per process
+#-----------------------------------------------------------------------------
+_sinks = {}
+_sinks_lock = threading.Lock()
+
+
+def get_sink(url: str) -> UnixSocketSink:
+    """The sink for url, made on first use. Supported:
+        unix:///path/to/socket[?digest_args=1]
+    Raises ValueError for anything else.
+    """
+    sink = _sinks.get(url)
+    if sink is None:
+        with _sinks_lock:
+            sink = _sinks.get(url)
+            if sink is None:
+                sink = _sinks[url] = _make_sink(url)
+    return sink
+
+
+def parse_sink_url(url: str) -> (str, bool):
+    """(socket path, digest_args) of a sink URL; raise ValueError if it's
+    not one that get_sink supports.
+
+    >>> parse_sink_url('unix:///run/lc.sock?digest_args=1')
+    ('/run/lc.sock', True)
+    """
+    parts = urlsplit(url)
+    if parts.scheme != 'unix' or not parts.path or parts.netloc:
+        raise ValueError("sink: expected 'unix:///path/to/socket', got %r" % url)
+    query = parse_qs(parts.query)
+    digest = query.get('digest_args', ['0'])[-1].lower() in ('1', 'true', 'yes')
+    return parts.path, digest
+
+
+def _make_sink(url):
+    path, digest = parse_sink_url(url)
+    return UnixSocketSink(path, digest_args=digest)
+
+
+@atexit.register
+def _flush_all():
+    for sink in list(_sinks.values()):
+        if sink._pid == os.getpid():
+            sink.flush()
+            sink.close()
+
+
+def _after_fork_in_child():
+    # The parent's sender threads don't exist here; its buffered
+    # events are the parent's to send.
+    for sink in _sinks.values():
+        sink._reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,105 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+SizeProfile -- for the `size_of` setting: the elapsed times of a
+function's calls, aggregated by the size of their input in log2 buckets,
+and the exponent k of the power law elapsed ~ size**k that fits them best.
+
+Bucket b holds the calls of size n with n.bit_length() == b, i.e.
+2**(b-1) <= n < 2**b (bucket 0: size 0). The exponent is fitted by least
+squares to the logs of the buckets' mean sizes and mean elapsed times, so
+each size range counts once however often it's called. A function that's
+linear in n has an exponent near 1, quadratic near 2; with small inputs,
+constant per-call costs pull it down toward 0.
+"""
+import math
+from collections import namedtuple
+
+__all__ = ['SizeProfile', 'SizeBucket']
+
+
+SizeBucket = namedtuple(
+    "SizeBucket",
+    ('min_size', 'max_size',        # the bucket's range of sizes
+     'calls', 'mean_size',
+     'mean_secs', 'min_secs', 'max_secs')
+)
+
+
+class SizeProfile():
+    """
+    >>> prof = SizeProfile()
+    >>> for n in (10, 100, 1000, 10000):
+    ...     prof._add(n, n * n / 1e9)
+    >>> round(prof.exponent, 6)
+    2.0
+    >>> prof.buckets[0]
+    SizeBucket(min_size=8, max_size=15, calls=1, mean_size=10.0, mean_secs=1e-07, min_secs=1e-07, max_secs=1e-07)
+    """
+    __slots__ = ('_buckets',)
+
+    def __init__(self):
+        # bucket number |--> [calls, sum of sizes, sum of secs, min secs, max secs]
+        self._buckets = {}
+
+    def _add(self, size, elapsed_secs):
+        b = int(size).bit_length()
+        entry = self._buckets.get(b)
+        if entry is None:
+            self._buckets[b] = [1, size, elapsed_secs, elapsed_secs, elapsed_secs]
+        else:
+            entry[0] += 1
+            entry[1] += size
+            entry[2] += elapsed_secs
+            if elapsed_secs < entry[3]:
+                entry[3] = elapsed_secs
+            elif elapsed_secs > entry[4]:
+                entry[4] = elapsed_secs
+
+    @property
+    def calls(self) -> int:
+        return sum(entry[0] for entry in self._buckets.values())
+
+    @property
+    def buckets(self) -> list:
+        """SizeBuckets, by increasing size"""
+        return [SizeBucket(1 << (b - 1) if b else 0, (1 << b) - 1,
+                           calls, sizes / calls, secs / calls, min_secs, max_secs)
+                for b, (calls, sizes, secs, min_secs, max_secs)
+                in sorted(self._buckets.items())]
+
+    @property
+    def exponent(self):
+        """k such that elapsed ~ size**k fits best, or None if there are
+        fewer than two buckets of nonzero sizes and times."""
+        points = [(math.log(sizes / calls), math.log(secs / calls))
+                  for calls, sizes, secs, _, _ in self._buckets.values()
+                  if sizes > 0 and secs > 0]
+        if len(points) < 2:
+            return None
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        sxx = sum((x - mean_x) ** 2 for x, _ in points)
+        sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+        return sxy / sxx
+
+    @property
+    def as_csv(self) -> str:
+        """The buckets, with a header line, '|'-separated like history_as_csv"""
+        lines = ['|'.join(SizeBucket._fields)]
+        lines.extend('|'.join(map(str, bucket)) for bucket in self.buckets)
+        return '\n'.join(lines) + '\n'
+
+    @property
+    def as_DataFrame(self):
+        """The buckets as a Pandas DataFrame, or None if Pandas isn't installed"""
+        try:
+            import pandas as pd
+        except ImportError:
+            return None
+        return pd.DataFrame(self.buckets, columns=SizeBucket._fields)
+
+    def __repr__(self):
+        exponent = self.exponent
+        return '<%s: %d calls, %d buckets, exponent %s>' % (
+            self.__class__.__name__, self.calls, len(self._buckets),
+            'None' if exponent is None else '%.2f' % exponent)
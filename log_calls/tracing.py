@@ -0,0 +1,284 @@
+__author__ = "Brian O'Neill"  # BTO
+__doc__ = """
+Tracer -- span tracing of the calls of decorated functions, for
+`log_calls.start_tracing()`: each enabled call is a span, with an id, the
+id of its parent span (the call of the nearest decorated caller, in the
+same thread or asyncio task), start and end times on a monotonic clock
+(time.perf_counter_ns), and the process, thread and asyncio task it ran in.
+
+Spans are kept in memory (the last max_spans of them: Tracer.spans), and,
+if a path is given, written to it incrementally in the Chrome trace-event
+format -- a JSON array of "complete" events (ph "X"), one per line --
+which Perfetto (ui.perfetto.dev) and chrome://tracing load as a timeline:
+
+    tracer = log_calls.start_tracing('trace.json')
+    ...
+    log_calls.stop_tracing()
+
+Events are written in batches of buffer_size, and when tracing stops
+(or at exit). The closing ']' is written when tracing stops, but both
+viewers load a trace without it, e.g. of a process that was killed.
+
+Tail-based retention (keep_slower_than, keep_if): the spans beneath a root
+span (one with no parent) are buffered until the root ends, then kept --
+the whole tree -- only if the root took keep_slower_than seconds or more,
+raised an exception, or keep_if(root_span) is true (or raises -- counted
+in num_keep_if_errors); otherwise they're dropped. So a trace holds the slow and failing calls, with all their
+context, and little else. A subtree being buffered holds at most
+max_subtree_spans spans (the latest), and at most max_pending subtrees are
+buffered at once: spans of a task that outlives the call that created it
+end after their parent does, and their subtree, never collected, is
+eventually evicted. With record_args, spans hold bounded reprs of the
+arguments of their calls.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+from collections import namedtuple, deque
+from itertools import count, islice
+
+from .jsonl import bounded_repr
+
+__all__ = ['Tracer', 'Span']
+
+
+Span = namedtuple(
+    "Span",
+    ('span_id', 'parent_id',        # parent_id: None for a root span
+     'name',                        # prefixed display name
+     'call_num',
+     'start_ns', 'end_ns',          # time.perf_counter_ns
+     'pid', 'tid',                  # tid: threading.get_native_id()
+     'task',                        # name of the asyncio task, or None
+     'error',                       # repr of the exception raised, or None
+     'args'),                       # bounded repr of the arguments, or None
+    defaults=(None,)
+)
+
+MAX_ARGS = 20       # in Span.args
+
+
+def args_text(args, kwargs) -> str:
+    """Bounded repr of the arguments of a call.
+
+    >>> args_text((1, 'a' * 300), {'k': [2, 3]})[-22:]
+    "aaaaaaaaaaa', k=[2, 3]"
+    >>> args_text(tuple(range(30)), {})[-11:]
+    '18, 19, ...'
+    """
+    items = [bounded_repr(arg) for arg in islice(args, MAX_ARGS)]
+    if len(items) < MAX_ARGS:
+        items.extend('%s=%s' % (k, bounded_repr(v))
+                     for k, v in islice(kwargs.items(), MAX_ARGS - len(items)))
+    if len(args) + len(kwargs) > MAX_ARGS:
+        items.append('...')
+    return ', '.join(items)
+
+
+def _current_task_name():
+    asyncio = sys.modules.get('asyncio')
+    if asyncio is None:
+        return None
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:        # no running event loop
+        return None
+    return task.get_name() if task is not None else None
+
+
+class Tracer():
+    """
+    >>> tracer = Tracer()
+    >>> root = tracer.new_span_id()
+    >>> tracer.add_span(root, None, 'f', 1, 1000, 9000)
+    >>> tracer.add_span(tracer.new_span_id(), root, 'g', 1, 2000, 3000)
+    >>> [(s.name, s.span_id, s.parent_id, s.end_ns - s.start_ns) for s in tracer.spans]
+    [('f', 1, None, 8000), ('g', 2, 1, 1000)]
+    >>> event = tracer.trace_event(tracer.spans[1])
+    >>> event['ph'], event['ts'], event['dur'], event['args']
+    ('X', 2.0, 1.0, {'span_id': 2, 'parent_id': 1, 'call_num': 1})
+
+    Tail-based retention: trees of spans are kept when their root is slow:
+
+    >>> tracer = Tracer(keep_slower_than=1e-6)
+    >>> for start, end in ((0, 500), (1000, 5000)):
+    ...     root = tracer.new_span_id()
+    ...     tracer.add_span(tracer.new_span_id(), root, 'g', 1, start + 1, start + 2)
+    ...     tracer.add_span(root, None, 'f', 1, start, end)
+    >>> [(s.name, s.start_ns) for s in tracer.spans]
+    [('g', 1001), ('f', 1000)]
+    >>> tracer.num_kept_trees, tracer.num_dropped_trees
+    (1, 1)
+    """
+    def __init__(self, path=None, *, max_spans=100000, buffer_size=1000,
+                 record_args=False,
+                 keep_slower_than=None, keep_if=None,
+                 max_subtree_spans=1000, max_pending=10000):
+        """path: file to write trace events to, or None
+        max_spans: how many of the latest spans to keep in memory (0: none)
+        buffer_size: write events to path in batches of this many
+        record_args: give spans bounded reprs of the arguments of calls
+        keep_slower_than, keep_if: tail-based retention (see the module
+            docstring), on if either is given. keep_slower_than: seconds;
+            keep_if: function of a root Span returning bool
+        max_subtree_spans, max_pending: bound the spans buffered"""
+        self.path = path
+        self.buffer_size = buffer_size
+        self.record_args = record_args
+        self.keep_slower_than = keep_slower_than
+        self.keep_if = keep_if
+        self.max_subtree_spans = max_subtree_spans
+        self.max_pending = max_pending
+        self._tail = keep_slower_than is not None or keep_if is not None
+        self._pending = {}      # parent span id -> deque of the spans beneath it
+        self.num_kept_trees = self.num_dropped_trees = 0
+        self.num_keep_if_errors = 0     # trees kept because keep_if raised
+        self.num_dropped_spans = 0      # by the bounds, from trees in the buffer
+        self.spans = deque(maxlen=max_spans)
+        self.num_spans = 0
+        self._next_id = count(1).__next__      # atomic under the GIL
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._named_tids = set()
+        self._file = None
+        self._num_written = 0       # events
+        self.closed = False
+        if path is not None:
+            self._file = open(path, 'w')
+            self._file.write('[\n')
+            self._buffer.append(self._encode({
+                'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'tid': 0,
+                'args': {'name': os.path.basename(sys.argv[0] or 'python')}}))
+            atexit.register(self.close)
+
+    def new_span_id(self) -> int:
+        return self._next_id()
+
+    def add_span(self, span_id, parent_id, name, call_num, start_ns, end_ns, error=None,
+                 args=None, kwargs=None):
+        """Called by the wrapper of a decorated function when a call ends"""
+        span = Span(span_id, parent_id, name, call_num, start_ns, end_ns,
+                    os.getpid(), threading.get_native_id(), _current_task_name(), error,
+                    args_text(args, kwargs or {}) if self.record_args and args is not None else None)
+        if not self._tail:
+            with self._lock:
+                self.num_spans += 1
+                self._add(span)
+            return
+
+        with self._lock:
+            self.num_spans += 1
+            subtree = self._pending.pop(span_id, ())
+            if parent_id is not None:
+                self._buffer_subtree(parent_id, subtree, span)
+                return
+        # A root: keep its tree? (keep_if is called without the lock held:
+        # it might call decorated functions)
+        if self._keep(span):
+            with self._lock:
+                self.num_kept_trees += 1
+                for s in subtree:
+                    self._add(s)
+                self._add(span)
+        else:
+            with self._lock:
+                self.num_dropped_trees += 1
+
+    def _buffer_subtree(self, parent_id, subtree, span):
+        """(with self._lock held) Buffer span and the spans beneath it
+        until its root ends"""
+        siblings = self._pending.get(parent_id)
+        if siblings is None:
+            if len(self._pending) >= self.max_pending:
+                # evict the oldest -- probably an orphan
+                self.num_dropped_spans += len(self._pending.pop(next(iter(self._pending))))
+            siblings = self._pending[parent_id] = deque(maxlen=self.max_subtree_spans)
+        num_before = len(siblings)
+        siblings.extend(subtree)
+        siblings.append(span)
+        self.num_dropped_spans += num_before + len(subtree) + 1 - len(siblings)
+
+    def _keep(self, root) -> bool:
+        if root.error is not None:
+            return True
+        if (self.keep_slower_than is not None
+                and root.end_ns - root.start_ns >= self.keep_slower_than * 1e9):
+            return True
+        if self.keep_if is None:
+            return False
+        try:
+            return bool(self.keep_if(root))
+        except Exception:
+            # not the caller's problem; keep the tree, to look at
+            with self._lock:
+                self.num_keep_if_errors += 1
+            return True
+
+    def _add(self, span):
+        """(with self._lock held) Keep span, and write it"""
+        self.spans.append(span)
+        if self._file is None:
+            return
+        if span.tid not in self._named_tids:
+            self._named_tids.add(span.tid)
+            self._buffer.append(self._encode({
+                'name': 'thread_name', 'ph': 'M', 'pid': span.pid, 'tid': span.tid,
+                'args': {'name': threading.current_thread().name}}))
+        self._buffer.append(self._encode(self.trace_event(span)))
+        if len(self._buffer) >= self.buffer_size:
+            self._write_buffer()
+
+    @staticmethod
+    def trace_event(span) -> dict:
+        """span as a Chrome trace event: a complete event (ph 'X'),
+        times in microseconds"""
+        args = {'span_id': span.span_id, 'parent_id': span.parent_id,
+                'call_num': span.call_num}
+        if span.task is not None:
+            args['task'] = span.task
+        if span.error is not None:
+            args['error'] = span.error
+        if span.args is not None:
+            args['args'] = span.args
+        return {'name': span.name, 'cat': 'log_calls', 'ph': 'X',
+                'ts': span.start_ns / 1000, 'dur': (span.end_ns - span.start_ns) / 1000,
+                'pid': span.pid, 'tid': span.tid, 'args': args}
+
+    @staticmethod
+    def _encode(event) -> str:
+        return json.dumps(event, separators=(',', ':'), default=str)
+
+    def _write_buffer(self):
+        """(with self._lock held)"""
+        if self._buffer:
+            self._file.write((',\n' if self._num_written else '')
+                             + ',\n'.join(self._buffer))
+            self._file.flush()
+            self._num_written += len(self._buffer)
+            self._buffer.clear()
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._write_buffer()
+
+    def close(self):
+        """Write what's buffered and the closing ']', and close the file.
+        Drop the spans of unfinished trees (tail-based retention)."""
+        with self._lock:
+            self.closed = True
+            self._pending.clear()       # trees of roots that haven't ended
+            if self._file is None:
+                return
+            self._write_buffer()
+            self._file.write('\n]\n')
+            self._file.close()
+            self._file = None
+        atexit.unregister(self.close)
+
+    @property
+    def as_trace_events(self) -> list:
+        """The spans in memory, as Chrome trace events"""
+        return [self.trace_event(span) for span in list(self.spans)]
@@ -32,9 +32,12 @@ included in the "used" dictionary.
 See the doctests in function main() below for examples/tests.
 """
 
+from collections import OrderedDict
 from functools import wraps
 import inspect
-from .helpers import (get_explicit_kwargs_OD, get_defaulted_kwargs_OD)
+
+_POSITIONAL = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+_KEYWORD = (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
 
 
 class used_unused_keywords():
@@ -53,19 +56,31 @@ class used_unused_keywords():
 
     def __call__(self, f):
 
-        # (nada)
+        # 0.3.2 Inspect f's signature once, here, not on every call:
+        # a call binds its first len(args) positional parameters,
+        # and the keyword parameters named in kwargs. (If it binds
+        # anything else -- or doesn't bind -- f itself raises TypeError.)
+        f_params = inspect.signature(f).parameters
+        positional_names = tuple(name for name, param in f_params.items()
+                                 if param.kind in _POSITIONAL)
+        keyword_names = tuple(name for name, param in f_params.items()
+                              if param.kind in _KEYWORD)
+        # (name, default, can be passed by keyword)
+        defaults = tuple((name, param.default, param.kind in _KEYWORD)
+                         for name, param in f_params.items()
+                         if param.default is not param.empty)
 
         @wraps(f)
         def f_used_unused_keywords_wrapper_(*args, **kwargs):
 
             # Figure out which parameters were NOT supplied
             # by the actual call - the 'defaulted' arguments
-            f_params = inspect.signature(f).parameters
-            bound_args = inspect.signature(f).bind(*args, **kwargs)
-
-            # These return OrderedDicts
-            self._used_kwds = get_explicit_kwargs_OD(f_params, bound_args, kwargs)
-            self._unused_kwds = get_defaulted_kwargs_OD(f_params, bound_args)
+            positional = positional_names[:len(args)]
+            self._used_kwds = OrderedDict(
+                [(name, kwargs[name]) for name in keyword_names if name in kwargs])
+            self._unused_kwds = OrderedDict(
+                [(name, default) for name, default, by_keyword in defaults
+                 if name not in positional and not (by_keyword and name in kwargs)])
 
             return f(*args, **kwargs)
 
@@ -0,0 +1,4 @@
+__author__ = 'brianoneill'
+
+def version():
+    return '1.0'
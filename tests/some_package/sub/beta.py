@@ -0,0 +1,6 @@
+__author__ = 'brianoneill'
+
+from some_package.alpha import double
+
+def quadruple(x):
+    return double(double(x))
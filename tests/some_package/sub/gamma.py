@@ -0,0 +1,3 @@
+__author__ = 'brianoneill'
+
+raise ImportError("some_package.sub.gamma should never be imported")
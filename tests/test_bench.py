@@ -0,0 +1,86 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    bench.py: python -m log_calls.bench
+"""
+
+import contextlib
+import doctest
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import TestCase
+
+from log_calls import bench
+
+
+class TestBench(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def main(self, *argv):
+        """(exit status, stderr) of bench.main(argv)"""
+        err = io.StringIO()
+        with contextlib.redirect_stderr(err), contextlib.redirect_stdout(io.StringIO()):
+            status = bench.main(list(argv))
+        return status, err.getvalue()
+
+    def test_run(self):
+        reported = {}
+        results = bench.run(['baseline', 'muted', 'depth_10'], min_secs=0.001, repeat=1,
+                            report=reported.__setitem__)
+        self.assertEqual(sorted(results), ['cases', 'implementation', 'log_calls', 'python'])
+        self.assertEqual(list(results['cases']), ['baseline', 'muted', 'depth_10'])
+        self.assertEqual(reported, results['cases'])
+        for res in results['cases'].values():
+            self.assertEqual(sorted(res),
+                             ['net_blocks_per_call', 'ns_per_call', 'peak_bytes_per_call'])
+            self.assertGreater(res['ns_per_call'], 0)
+            self.assertGreaterEqual(res['peak_bytes_per_call'], 0)
+            self.assertLess(res['net_blocks_per_call'], 0.5)
+        # Results are consistent with themselves, and survive JSON
+        self.assertEqual(bench.compare(results, results), [])
+        self.assertEqual(bench.compare(json.loads(json.dumps(results)), results), [])
+        with self.assertRaises(ValueError):
+            bench.run(['no_such_case'])
+
+    def test_json_and_compare(self):
+        path = os.path.join(self.tmpdir.name, 'base.json')
+        status, err = self.main('--quick', '--json', path, 'baseline', 'bypass')
+        self.assertEqual(status, 0)
+        self.assertIn('bypass', err)
+        with open(path) as fp:
+            saved = json.load(fp)
+        self.assertEqual(sorted(saved['cases']), ['baseline', 'bypass'])
+
+        # A baseline that everything beats
+        for res in saved['cases'].values():
+            res['ns_per_call'] *= 1000
+            res['peak_bytes_per_call'] += 10000
+        with open(path, 'w') as fp:
+            json.dump(saved, fp)
+        status, err = self.main('--quick', '--compare', path, 'baseline', 'bypass')
+        self.assertEqual(status, 0)
+        self.assertIn('no regressions', err)
+
+        # ... and one that nothing does
+        for res in saved['cases'].values():
+            res['ns_per_call'] = 0.001
+        with open(path, 'w') as fp:
+            json.dump(saved, fp)
+        status, err = self.main('--quick', '--compare', path, 'bypass')
+        self.assertEqual(status, 1)
+        self.assertIn('1 regression(s)', err)
+
+
+# For unittest integration
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(bench))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    The `cache_calls` decorator, and call_cache.py
+"""
+
+import doctest
+import inspect
+import time
+import unittest
+from unittest import TestCase, mock
+
+from log_calls import cache_calls, log_calls
+from log_calls import call_cache
+
+
+class TestCacheCalls(TestCase):
+
+    def test_hits_and_keys(self):
+        calls = []
+
+        @cache_calls()
+        def f(a, b=2, *args, **kw):
+            calls.append(a)
+            return a * b
+
+        self.assertEqual(f(3), 6)
+        self.assertEqual(f(3, 2), 6)            # defaults applied
+        self.assertEqual(f(b=2, a=3), 6)
+        self.assertEqual(f(3, 2, x=1, y=2), 6)
+        self.assertEqual(f(3, 2, y=2, x=1), 6)  # **kw order doesn't matter
+        self.assertEqual(calls, [3, 3])
+        stats = f.stats
+        self.assertEqual((stats.cache_hits, stats.cache_misses, stats.cache_evictions),
+                         (3, 2, 0))
+        self.assertEqual(stats.cache_entries, 2)
+        self.assertEqual(stats.num_calls_logged, 5)
+        self.assertGreater(stats.cache_saved_secs, 0.0)
+
+        stats.clear_cache()
+        self.assertEqual((stats.cache_entries, stats.cache_hits), (0, 0))
+        f(3)
+        self.assertEqual(calls, [3, 3, 3])
+
+    def test_policies(self):
+        def calls_made(policy, xs):
+            calls = []
+
+            @cache_calls(policy=policy, max_entries=2)
+            def f(x):
+                calls.append(x)
+                return x
+
+            for x in xs:
+                f(x)
+            return calls
+
+        # Evicted by 3: lru, 2, used less recently than 1; fifo, 1, cached first
+        self.assertEqual(calls_made('lru',  (1, 2, 1, 3, 1)), [1, 2, 3])
+        self.assertEqual(calls_made('fifo', (1, 2, 1, 3, 1)), [1, 2, 3, 1])
+        self.assertEqual(calls_made('lfu',  (1, 2, 1, 3, 1)), [1, 2, 3])
+        # ... lru, 1, used less recently than 2; lfu, 2, used less often than 1
+        self.assertEqual(calls_made('lru',  (1, 1, 2, 3, 1)), [1, 2, 3, 1])
+        self.assertEqual(calls_made('lfu',  (1, 1, 2, 3, 1)), [1, 2, 3])
+        # An unknown policy is lru
+        self.assertEqual(calls_made('random', (1, 2, 1, 3, 1)), [1, 2, 3])
+
+    def test_ttl(self):
+        calls = []
+
+        @cache_calls(ttl=0.05)
+        def f(x):
+            calls.append(x)
+            return x
+
+        f(1); f(1)
+        time.sleep(0.06)
+        f(1)
+        self.assertEqual(calls, [1, 1])
+        self.assertEqual(f.stats.cache_evictions, 1)
+
+    def test_expired_evicted_first(self):
+        cache = call_cache.CallCache(inspect.signature(lambda x: x), max_entries=2, ttl=10)
+        with mock.patch('time.monotonic') as monotonic:
+            monotonic.return_value = 0
+            cache.store((1,), 'one', 0)
+            monotonic.return_value = 5
+            cache.store((2,), 'two', 0)
+            monotonic.return_value = 6
+            self.assertEqual(cache.lookup((1,), {})[1], 'one')   # 2 is now the LRU
+            monotonic.return_value = 11
+            cache.store((3,), 'three', 0)       # 1 has expired: room enough
+            self.assertEqual(cache.lookup((2,), {})[1], 'two')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_max_bytes(self):
+        @cache_calls(max_bytes=3000, max_entries=0)
+        def f(n):
+            return b'x' * n
+
+        f(1000); f(1001)
+        self.assertEqual(f.stats.cache_entries, 2)
+        self.assertGreater(f.stats.cache_bytes, 2000)
+        f(1002)
+        self.assertEqual(f.stats.cache_entries, 2)
+        self.assertEqual(f.stats.cache_evictions, 1)
+        f(5000)                                 # too big to cache
+        self.assertEqual(f.stats.cache_entries, 2)
+        self.assertLessEqual(f.stats.cache_bytes, 3000)
+
+    def test_key_fns_and_unhashable(self):
+        calls = []
+
+        @cache_calls(key_fns={'xs': tuple})
+        def total(xs, ys=()):
+            calls.append(xs)
+            return sum(xs) + sum(ys)
+
+        total([1, 2]); total([1, 2])
+        self.assertEqual(len(calls), 1)
+        total([1, 2], ys=[3]); total([1, 2], ys=[3])    # unhashable: not cached
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(total.stats.cache_misses, 3)
+
+    def test_disabled(self):
+        calls = []
+
+        @cache_calls(enabled='use_cache=')
+        def f(x, use_cache=True):
+            calls.append(x)
+            return x
+
+        f(1); f(1)
+        f(1, use_cache=False)
+        self.assertEqual(calls, [1, 1])
+        f.cache_calls_settings.enabled = -1
+        f(1)
+        self.assertEqual(calls, [1, 1, 1])
+
+    def test_history_and_call_chains(self):
+        @log_calls(mute=True, record_history=True)
+        def inner(x): return x
+
+        @cache_calls(record_history=True, name='%s')
+        def outer(x): return inner(x)
+
+        outer(1); outer(1); outer(2)
+        self.assertEqual(len(outer.stats.history), 3)
+        self.assertEqual([rec.caller_chain for rec in inner.stats.history],
+                         [['outer [1]'], ['outer [3]']])
+
+    def test_class(self):
+        @cache_calls(omit='__init__')
+        class C():
+            def __init__(self, k):
+                self.k = k
+                self.calls = 0
+
+            def times(self, x):
+                self.calls += 1
+                return self.k * x
+
+        c, d = C(2), C(3)
+        self.assertEqual((c.times(5), c.times(5), d.times(5)), (10, 10, 15))
+        self.assertEqual((c.calls, d.calls), (1, 1))
+        self.assertEqual(C.get_cache_calls_wrapper('times').stats.cache_hits, 1)
+
+
+# For unittest integration
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(call_cache))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
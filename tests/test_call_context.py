@@ -0,0 +1,79 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    CallContext -- the per-call context passed to DecoSetting handlers --
+    behaves like the dict it replaced.
+"""
+
+from unittest import TestCase
+from log_calls import log_calls
+from log_calls.call_context import CallContext
+
+
+@log_calls(mute=True)
+def f(a, b=2, *args, z=26, **kwargs): pass
+
+
+#----------------------------------------------------------------------------
+# Test class for CallContext
+#----------------------------------------------------------------------------
+class TestCallContext(TestCase):
+
+    def make_context(self, *args, **kwargs):
+        deco = getattr(f, log_calls._sentinels['DECO_OF'])
+        context = CallContext(deco, args, kwargs)
+        context.prefixed_fname = 'f'
+        context.output_fname = 'f'
+        context.call_list = ['<module>']
+        return context
+
+    def test_argument_fields(self):
+        context = self.make_context(1, 5, 6, y=25)
+        self.assertEqual(context['argcount'], 2)
+        self.assertEqual(context['argnames'], ['a', 'b'])
+        self.assertEqual(context['argvals'], (1, 5))
+        self.assertEqual(context['varargs'], (6,))
+        self.assertEqual(context['varargs_name'], 'args')
+        self.assertEqual(context['kwargs_name'], 'kwargs')
+        self.assertEqual(dict(context['explicit_kwargs']), {})
+        self.assertEqual(dict(context['defaulted_kwargs']), {'z': 26})
+        self.assertEqual(context['implicit_kwargs'], {'y': 25})
+        # attributes and keys are the same thing
+        self.assertIs(context.argnames, context['argnames'])
+
+    def test_keys(self):
+        context = self.make_context(1)
+        self.assertEqual(
+            list(context),
+            ['decorator', 'settings', 'stats', 'prefixed_fname', 'fparams',
+             'call_list', 'args', 'kwargs', 'indent', 'output_fname', 'call_num',
+             'argcount', 'argnames', 'argvals', 'varargs', 'varargs_name',
+             'kwargs_name', 'defaulted_kwargs', 'explicit_kwargs',
+             'implicit_kwargs'])
+        self.assertNotIn('retval', context)
+        with self.assertRaises(KeyError):
+            context['retval']
+
+        context.retval = None
+        self.assertIn('retval', context)
+        self.assertEqual(list(context)[-1], 'retval')
+
+    def test_setitem(self):
+        context = self.make_context(1)
+        # A handler can add its own keys, and overwrite ours
+        context['my_key'] = 17
+        context['argnames'] = ['A']
+        self.assertEqual(context['my_key'], 17)
+        self.assertEqual(context.argnames, ['A'])
+        self.assertEqual(context.argvals, (1,))
+        self.assertEqual(list(context)[-1], 'my_key')
+        self.assertEqual(len(context), len(dict(context)))
+
+        del context['my_key']
+        self.assertNotIn('my_key', context)
+        with self.assertRaises(KeyError):
+            del context['my_key']
+
+    def test_final_value(self):
+        context = self.make_context(1)
+        self.assertEqual(context.final_value('mute'), True)
+        self.assertEqual(context.final_value('log_args'), True)
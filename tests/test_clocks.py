@@ -0,0 +1,94 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    The `clocks` setting
+"""
+
+import io
+import json
+import threading
+import time
+import unittest
+from unittest import TestCase
+
+from log_calls import log_calls
+
+
+class TestClocks(TestCase):
+
+    def test_default_is_process(self):
+        @log_calls(mute=True, record_history=True)
+        def f(): pass
+
+        self.assertEqual(f.log_calls_settings.clocks, 'process')
+        f()
+        rec, = f.stats.history
+        self.assertIsInstance(rec.elapsed_secs, float)
+        self.assertIsInstance(rec.process_secs, float)
+
+    def test_thread_time_excludes_other_threads(self):
+        def burn(secs):
+            # CPU time of this thread, however busy the machine is
+            t0 = time.thread_time()
+            while time.thread_time() - t0 < secs:
+                pass
+
+        @log_calls(mute=True, clocks='thread_clocks=')
+        def f(thread_clocks='thread'):
+            # f waits, without using CPU, for another thread to use 0.05s of it
+            burner = threading.Thread(target=burn, args=(0.05,))
+            burner.start()
+            burner.join()
+
+        f()
+        thread_secs = f.stats.process_secs_logged
+        f(thread_clocks='process')
+        process_secs = f.stats.process_secs_logged - thread_secs
+        # the burner's CPU time counts only as process time
+        self.assertGreater(process_secs, 0.04)
+        self.assertLess(thread_secs, process_secs / 2)
+
+    def test_wall_and_none(self):
+        out = io.StringIO()
+
+        @log_calls(format='jsonl', file=out, record_history=True, clocks='wall')
+        def f(): pass
+
+        f()
+        rec = f.stats.history[-1]
+        self.assertIsInstance(rec.elapsed_secs, float)
+        self.assertIsNone(rec.process_secs)
+        self.assertIsNone(rec.process_secs_corrected)
+        self.assertEqual(f.stats.process_secs_logged, 0.0)
+        obj = json.loads(out.getvalue().splitlines()[-1])
+        self.assertIsNone(obj['process_secs'])
+
+        f.log_calls_settings.clocks = 'none'
+        t0 = time.time()
+        f()
+        rec = f.stats.history[-1]
+        self.assertIsNone(rec.elapsed_secs)
+        self.assertIsNone(rec.elapsed_secs_corrected)
+        self.assertEqual(f.stats.elapsed_secs_logged,
+                         f.stats.history[0].elapsed_secs)
+        obj = json.loads(out.getvalue().splitlines()[-1])
+        self.assertIsNone(obj['elapsed_secs'])
+        # Timestamps come from perf_counter_ns, even with no clocks
+        self.assertAlmostEqual(obj['timestamp'], t0, delta=0.5)
+
+    def test_log_elapsed(self):
+        out = io.StringIO()
+
+        @log_calls(file=out, log_args=False, log_exit=False, log_elapsed=True,
+                   clocks='thread', name='%s')
+        def f(): pass
+
+        f()
+        self.assertRegex(out.getvalue().splitlines()[-1],
+                         r'^    elapsed time: \S+ \[secs\], thread time: \S+ \[secs\]$')
+        f.log_calls_settings.clocks = 'none'
+        f()
+        self.assertEqual(out.getvalue().splitlines()[-1], 'f <== called by test_log_elapsed')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    control.py: the process-wide switches, log_calls.control
+"""
+
+import doctest
+import io
+import os
+import signal
+import unittest
+from unittest import TestCase, mock
+
+from log_calls import log_calls, record_history
+from log_calls import control as control_module
+
+
+@log_calls(enabled=False, name='quiet')
+def quiet(a):
+    return a
+
+
+@log_calls(name='loud')
+def loud(a):
+    return a
+
+
+class Service():
+    @log_calls(name='handle')
+    def handle(self, n):
+        return n
+
+
+class TestControl(TestCase):
+
+    def setUp(self):
+        self.control = log_calls.control
+        self.control.reset()
+        self.addCleanup(self.control.reset)
+
+    def calls_logged(self, fn, *args):
+        out = io.StringIO()
+        with mock.patch('sys.stdout', out):
+            fn(*args)
+        return out.getvalue()
+
+    def test_shared_by_deco_classes(self):
+        self.assertIs(record_history.control, log_calls.control)
+
+    def test_enable_disable(self):
+        self.assertEqual(self.calls_logged(quiet, 1), '')
+
+        self.control.enable('*.quiet')
+        self.assertEqual(self.calls_logged(quiet, 1), 'quiet <== called by calls_logged\n'
+                                                      '    arguments: a=1\n'
+                                                      'quiet ==> returning to calls_logged\n')
+        self.control.disable(__name__ + '.*')     # module pattern
+        self.assertEqual(self.calls_logged(quiet, 1), '')
+        self.assertEqual(self.calls_logged(loud, 1), '')
+
+        self.control.reset()
+        self.assertIn('loud <== called by', self.calls_logged(loud, 1))
+        self.assertEqual(self.calls_logged(quiet, 1), '')
+
+    def test_enable_record_history(self):
+        @record_history(enabled=False)
+        def rh(a):
+            return a
+
+        rh(1)
+        self.assertEqual(rh.stats.num_calls_logged, 0)
+        self.control.enable('*.rh')
+        rh(2)
+        rh(3)
+        self.assertEqual(rh.stats.num_calls_logged, 2)
+        self.assertEqual([rec.argvals for rec in rh.stats.history], [(2,), (3,)])
+
+    def test_mute_by_qualname(self):
+        self.control.mute('Service.*')
+        self.assertEqual(self.calls_logged(Service().handle, 1), '')
+        self.assertNotEqual(self.calls_logged(loud, 1), '')
+        self.assertEqual(Service.handle.stats.num_calls_logged, 1)   # muted, still logged
+
+    def test_sample(self):
+        self.control.sample('*loud', 0.25)
+        logged0 = loud.stats.num_calls_logged
+        total0 = loud.stats.num_calls_total
+        outputs = [self.calls_logged(loud, n) for n in range(8)]
+        self.assertEqual([bool(out) for out in outputs],
+                         [False, False, False, True] * 2)
+        self.assertEqual(loud.stats.num_calls_logged - logged0, 2)
+        self.assertEqual(loud.stats.num_calls_total - total0, 8)
+        with self.assertRaises(ValueError):
+            self.control.sample('*', 2)
+
+    def test_looked_up_only_after_changes(self):
+        with mock.patch.object(self.control, 'overrides_for',
+                               wraps=self.control.overrides_for) as overrides_for:
+            for n in range(3):
+                self.calls_logged(quiet, n)
+            self.assertEqual(overrides_for.call_count, 1)
+            self.control.mute('nothing.matches')
+            for n in range(3):
+                self.calls_logged(quiet, n)
+            self.assertEqual(overrides_for.call_count, 2)
+
+    def test_verbose(self):
+        self.control.disable()
+        self.control.verbose = True
+        self.assertIn('quiet <== called by', self.calls_logged(quiet, 1))
+        self.control.verbose = False
+        self.assertEqual(self.calls_logged(quiet, 1), '')
+
+    def test_dump_stats(self):
+        self.calls_logged(loud, 1)
+        out = io.StringIO()
+        self.control.dump_stats(out)
+        self.assertRegex(out.getvalue(),
+                         r"log_calls:%s\.loud: \d+ calls \(\d+ logged\)" % __name__.replace('.', r'\.'))
+
+    @unittest.skipUnless(hasattr(signal, 'SIGUSR1'), "no SIGUSR1")
+    def test_signal_handlers(self):
+        self.control.install_signal_handlers()
+        self.addCleanup(self.control.uninstall_signal_handlers)
+        os.kill(os.getpid(), signal.SIGUSR1)
+        self.assertTrue(self.control.verbose)
+        self.assertIn('quiet <== called by', self.calls_logged(quiet, 1))
+        os.kill(os.getpid(), signal.SIGUSR1)
+        self.assertFalse(self.control.verbose)
+
+        with mock.patch('sys.stderr', io.StringIO()) as err:
+            os.kill(os.getpid(), signal.SIGUSR2)
+        self.assertIn('.quiet: ', err.getvalue())
+
+        self.control.uninstall_signal_handlers()
+        self.assertEqual(signal.getsignal(signal.SIGUSR1), signal.SIG_DFL)
+
+
+##############################################################################
+# end of tests.
+##############################################################################
+
+# For unittest integration
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(control_module))
+    return tests
+
+
+if __name__ == '__main__':
+    unittest.main()
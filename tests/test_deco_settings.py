@@ -325,6 +325,47 @@ class TestDecoSettingsMapping(TestCase):
         new_val = mapping.get_final_value('history', fparams=None)
         self.assertEqual(new_val, not history_val)
 
+    def test_shared_values_copy_on_write(self):
+        """Mappings with identical values share their OrderedDict of values
+        until one of them is changed."""
+        other = DecoSettingsMapping(
+            deco_class=self.__class__,
+            enabled=True,
+            folderol='bar',
+            my_setting='eek',
+            your_setting='Howdy',
+            history=False
+        )
+        self.assertIs(other._tagged_values_dict, self._settings_mapping._tagged_values_dict)
+
+        other['my_setting'] = 'ook'
+        self.assertIsNot(other._tagged_values_dict, self._settings_mapping._tagged_values_dict)
+        self.assertEqual(other['my_setting'], 'ook')
+        self.assertEqual(self._settings_mapping['my_setting'], 'eek')
+
+    def test_shared_values_of_decorated_methods(self):
+        from log_calls import log_calls
+
+        @log_calls(log_retval=True, record_history=True)
+        class K():
+            def f(self): pass
+            def g(self): pass
+
+        f_settings = K.f.log_calls_settings
+        g_settings = K.g.log_calls_settings
+        self.assertIs(f_settings._tagged_values_dict, g_settings._tagged_values_dict)
+
+        g_settings.log_retval = False
+        self.assertEqual(f_settings.log_retval, True)
+        self.assertEqual(g_settings.log_retval, False)
+
+        # The history deque is made when the first call is recorded
+        f_deco = getattr(K.f, log_calls._sentinels['DECO_OF'])
+        self.assertIsNone(f_deco._call_history)
+        self.assertEqual(K.f.stats.history, ())
+        K().f()
+        self.assertEqual(len(K.f.stats.history), 1)
+
     def test___len__(self):
         self.assertEqual(len(self._settings_mapping), 4)
 
@@ -569,3 +610,22 @@ class TestDecoSettingsMapping_set_reset_defaults(TestCase):
         self.assertEqual(settings_map['number'].default, '12')
         self.assertEqual(settings_map['my_logger'].default, 'nix')
         self.assertEqual(settings_map['your_setting'].default, 'off')
+
+    def test_shared_values_follow_defaults(self):
+        clsname = self.__class__.__name__
+        deco_class = type(clsname, (), {})
+
+        def make_mapping():     # my_logger=0: not allowed, so the default
+            return DecoSettingsMapping(deco_class=deco_class, enabled=True, number=3, my_logger=0)
+
+        m1, m2 = make_mapping(), make_mapping()
+        self.assertIs(m1._tagged_values_dict, m2._tagged_values_dict)
+        self.assertEqual(m1['my_logger'], 'nix')
+
+        self.addCleanup(DecoSettingsMapping.reset_defaults, clsname)
+        DecoSettingsMapping.set_defaults(clsname, {'my_logger': 'nax'})
+        self.assertEqual(make_mapping()['my_logger'], 'nax')
+        self.assertEqual(m1['my_logger'], 'nix')
+
+        m2['number'] = 4        # copy on write
+        self.assertEqual((m1['number'], m2['number']), (3, 4))
@@ -0,0 +1,80 @@
+__author__ = "Brian O'Neill"
+
+from log_calls import log_calls
+
+###############################################################
+
+def test_decorate_package():
+    """
+`some_package.sub.gamma` raises ImportError if imported, so exclude it:
+
+    >>> import some_package
+    >>> report = log_calls.decorate_package(some_package,
+    ...                                     exclude='some_package.sub.gamma',
+    ...                                     log_retval=True)
+    >>> list(report)
+    ['some_package', 'some_package.alpha', 'some_package.sub', 'some_package.sub.beta']
+    >>> rec = report['some_package.alpha']
+    >>> rec.module_name, rec.functions, rec.classes
+    ('some_package.alpha', ['double'], ['Counter'])
+    >>> report['some_package.sub.beta'].functions
+    ['quadruple']
+    >>> rec.elapsed_secs >= 0
+    True
+
+Submodules are imported as they're reached, so `beta`, imported after `alpha`
+was decorated, gets the decorated `double`:
+
+    >>> from some_package.sub.beta import quadruple
+    >>> quadruple(3)
+    quadruple <== called by <module>
+        arguments: x=3
+        double <== called by quadruple
+            arguments: x=3
+            double return value: 6
+        double ==> returning to quadruple
+        double <== called by quadruple
+            arguments: x=6
+            double return value: 12
+        double ==> returning to quadruple
+        quadruple return value: 12
+    quadruple ==> returning to <module>
+    12
+    >>> import some_package.alpha as alpha
+    >>> alpha.double(5)
+    double <== called by <module>
+        arguments: x=5
+        double return value: 10
+    double ==> returning to <module>
+    10
+
+Already-decorated things are skipped, and `include` restricts what's decorated:
+
+    >>> report = log_calls.decorate_package(some_package,
+    ...                                     include='*.alpha *.beta',
+    ...                                     exclude='*.gamma')
+    >>> [(r.module_name, r.functions, r.classes) for r in report.values()]
+    [('some_package.alpha', [], []), ('some_package.sub.beta', [], [])]
+
+Modules that fail to import are skipped; `onerror`, as for
+`pkgutil.walk_packages`, is told their names:
+
+    >>> errors = []
+    >>> report = log_calls.decorate_package(some_package, include='*.gamma',
+    ...                                     onerror=errors.append)
+    >>> list(report), errors
+    ([], ['some_package.sub.gamma'])
+    """
+    pass
+
+
+###############################################################
+import doctest
+
+# For unittest integration
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite())
+    return tests
+
+if __name__ == '__main__':
+    doctest.testmod()
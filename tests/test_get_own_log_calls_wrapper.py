@@ -100,104 +100,93 @@ This won't work/is wrong:
     ...     print(e)
     'method' is true-bypassed (enabled < 0) or not decorated [2]
 
-Induce more errors
-
-    >>> def _deco_base_f_wrapper_():     # note name -- fake out get_own_log_calls_wrapper for a few clauses
-    ...     # No local named _deco_base__active_call_items__
-    ...     try:
-    ...         b.no_deco()
-    ...     except AttributeError as e:
-    ...         print(e)
-    >>> _deco_base_f_wrapper_()
+Induce more errors.
+The wrapper publishes the deco object of the active call in
+`log_calls.log_calls._current_call` (a ContextVar); fake that too:
+
+    >>> from log_calls.log_calls import _current_call
+    >>> def fake_call(deco_obj):
+    ...     # Call b.no_deco as if the active call were deco_obj's
+    ...     def _deco_base_f_wrapper_():     # note name -- fake out get_own_log_calls_wrapper
+    ...         token = _current_call.set(deco_obj)
+    ...         try:
+    ...             b.no_deco()
+    ...         except AttributeError as e:
+    ...             print(e)
+    ...         finally:
+    ...             _current_call.reset(token)
+    ...     _deco_base_f_wrapper_()
+
+No active call:
+
+    >>> fake_call(None)
     'no_deco' is true-bypassed (enabled < 0) or not decorated [2]
 
-    >>> def _deco_base_f_wrapper_():         # note name -- fake out get_own_log_calls_wrapper longer
-    ...     _deco_base__active_call_items__ = 17    # exists but isn't a dict
-    ...     try:
-    ...         b.no_deco()
-    ...     except AttributeError as e:
-    ...         print(e)
-    >>> _deco_base_f_wrapper_()
-    'no_deco' is not decorated [3]
+Active call isn't a `log_calls` call:
 
-    >>> def _deco_base_f_wrapper_():         # note name -- fake out get_own_log_calls_wrapper still longer
-    ...     _deco_base__active_call_items__ = {    # exists, is a dict, no key '_wrapper_deco'
-    ...         'a': 45
-    ...     }
-    ...     try:
-    ...         b.no_deco()
-    ...     except AttributeError as e:
-    ...         print(e)
-    >>> _deco_base_f_wrapper_()
+    >>> fake_call(45)
     'no_deco' is not decorated [3]
 
-    >>> def _deco_base_f_wrapper_():         # note name -- fake out get_own_log_calls_wrapper even longer
-    ...     _deco_base__active_call_items__ = {    # exists, is a dict, has key '_wrapper_deco', but type != log_calls
-    ...         '_wrapper_deco': 45
-    ...     }
-    ...     try:
-    ...         b.no_deco()
-    ...     except AttributeError as e:
-    ...         print(e)
-    >>> _deco_base_f_wrapper_()
-    'no_deco' is not decorated [3]
+Correct type, but not hooked up properly:
 
-    >>> def _deco_base_f_wrapper_():         # note name -- fake out get_own_log_calls_wrapper even longer
-    ...     _deco_base__active_call_items__ = {    # exists, is a dict, has key '_wrapper_deco', but type != log_calls
-    ...         '_wrapper_deco': log_calls()    # correct type, but not hooked up properly
-    ...     }
-    ...     try:
-    ...         b.no_deco()
-    ...     except AttributeError as e:
-    ...         print(e)
-    >>> _deco_base_f_wrapper_()
+    >>> fake_call(log_calls())
     inconsistent log_calls decorator object for 'no_deco' [4]
 
-    >>> def _deco_base_f_wrapper_():         # note name -- fake out get_own_log_calls_wrapper even longer
-    ...     lc = log_calls()    # correct type, but still not hooked up properly
-    ...     lc.f = None
-    ...     _deco_base__active_call_items__ = {    # exists, is a dict, has key '_wrapper_deco', but type != log_calls
-    ...         '_wrapper_deco': lc
-    ...     }
-    ...
-    ...     try:
-    ...         b.no_deco()
-    ...     except AttributeError as e:
-    ...         print(e)
-    >>> _deco_base_f_wrapper_()
+    >>> lc = log_calls()
+    >>> lc.f = None
+    >>> fake_call(lc)
     inconsistent log_calls decorator object for 'no_deco' [5]
 
-    >>> def _deco_base_f_wrapper_():         # note name -- fake out get_own_log_calls_wrapper even longer
-    ...     lc = log_calls()    # correct type, but still not hooked up properly
-    ...     lc.f = None
-    ...     _deco_base__active_call_items__ = {    # exists, is a dict, has key '_wrapper_deco', but type != log_calls
-    ...         '_wrapper_deco': lc
-    ...     }
-    ...
-    ...     try:
-    ...         b.no_deco()
-    ...     except AttributeError as e:
-    ...         print(e)
-    >>> _deco_base_f_wrapper_()
-    inconsistent log_calls decorator object for 'no_deco' [5]
+The active call is of some other function:
 
-    >>> def _deco_base_f_wrapper_():         # note name -- fake out get_own_log_calls_wrapper even longer
-    ...     lc = log_calls()    # correct type, lc.f correct, but STILL not hooked up properly
-    ...     lc.f = B.no_deco
-    ...     _deco_base__active_call_items__ = {    # exists, is a dict, has key '_wrapper_deco', but type != log_calls
-    ...         '_wrapper_deco': lc
-    ...     }
-    ...
-    ...     try:
-    ...         b.no_deco()
-    ...     except AttributeError as e:
-    ...         print(e)
-    >>> _deco_base_f_wrapper_()
+    >>> method_wrapper = B.get_log_calls_wrapper('method')
+    >>> fake_call(getattr(method_wrapper, log_calls._sentinels['DECO_OF']))
+    'no_deco' is true-bypassed (enabled < 0) or not decorated [2]
+
+Correct type, correct function, but STILL not hooked up properly:
+
+    >>> lc = log_calls()
+    >>> lc.f = B.no_deco
+    >>> fake_call(lc)
     inconsistent log_calls decorator object for 'no_deco' [7]
 
     """
     pass
 
+#-----------------------------------------------------------------------------
+# test__current_call_slot
+# The deco object of the active call is per thread, and is restored
+# even when the decorated function raises
+#-----------------------------------------------------------------------------
+def test__current_call_slot():
+    """
+    >>> from log_calls.log_calls import _current_call
+    >>> import threading
+
+    >>> @log_calls(mute=log_calls.MUTE.CALLS)
+    ... def f(fail=False):
+    ...     log_calls.print('in f; active:', _current_call.get().f.__name__)
+    ...     t = threading.Thread(target=lambda: print('thread sees', _current_call.get()))
+    ...     t.start(); t.join()
+    ...     if fail:
+    ...         raise ValueError()
+
+    >>> f()
+    f: in f; active: f
+    thread sees None
+    >>> try:
+    ...     f(fail=True)
+    ... except ValueError:
+    ...     pass
+    f: in f; active: f
+    thread sees None
+    >>> print(_current_call.get())
+    None
+    >>> log_calls.print("no active call: does nothing")
+    """
+    pass
+
+
 ##############################################################################
 # end of tests.
 ##############################################################################
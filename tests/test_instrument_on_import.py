@@ -0,0 +1,77 @@
+__author__ = "Brian O'Neill"
+
+from log_calls import log_calls
+
+###############################################################
+
+def test_instrument_on_import():
+    """
+Install the import hook, then import a module whose name matches:
+
+    >>> finder = log_calls.instrument_on_import('some_lazy_*', args_sep='; ')
+    >>> import some_lazy_module
+    >>> finder.decorated
+    ['some_lazy_module']
+
+Nothing has been decorated yet -- functions get decorated when first called:
+
+    >>> hasattr(some_lazy_module.f, 'stats')
+    False
+    >>> from some_lazy_module import f
+    >>> f(3, 4)
+    f <== called by <module>
+        arguments: a=3; b=4
+        g <== called by f
+            arguments: a=3; b=4
+        g ==> returning to f
+    f ==> returning to <module>
+    20
+
+The module now refers to the decorated function, and the reference obtained
+before the first call has its attributes:
+
+    >>> f.stats.num_calls_logged, some_lazy_module.f.stats.num_calls_logged
+    (1, 1)
+    >>> some_lazy_module.f(1, 1)
+    f <== called by <module>
+        arguments: a=1; b=1
+        g <== called by f
+            arguments: a=1; b=1
+        g ==> returning to f
+    f ==> returning to <module>
+    12
+
+Classes get decorated when first instantiated:
+
+    >>> hasattr(some_lazy_module.C, 'log_calls_omit')
+    False
+    >>> c = some_lazy_module.C('Hello,')       # doctest: +ELLIPSIS
+    C.__init__ <== called by <module>
+        arguments: self=<some_lazy_module.C object at 0x...>; prefix='Hello,'
+    C.__init__ ==> returning to <module>
+    >>> c.concat('world!')                     # doctest: +ELLIPSIS
+    C.concat <== called by <module>
+        arguments: self=<some_lazy_module.C object at 0x...>; s='world!'
+    C.concat ==> returning to <module>
+    'Hello, world!'
+    >>> '__new__' in vars(some_lazy_module.C)
+    False
+
+    >>> finder.uninstall()
+    >>> import sys
+    >>> finder in sys.meta_path
+    False
+    """
+    pass
+
+
+###############################################################
+import doctest
+
+# For unittest integration
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite())
+    return tests
+
+if __name__ == '__main__':
+    doctest.testmod()
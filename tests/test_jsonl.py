@@ -0,0 +1,153 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    The `format` setting: 'jsonl' and 'compact' output modes, and jsonl.py
+"""
+
+import doctest
+import io
+import json
+import logging
+import unittest
+from unittest import TestCase
+
+from log_calls import log_calls
+from log_calls import jsonl
+
+
+class TestJsonl(TestCase):
+
+    def setUp(self):
+        self.out = io.StringIO()
+
+    def records(self):
+        return [json.loads(line) for line in self.out.getvalue().splitlines()]
+
+    def test_one_object_per_call(self):
+        @log_calls(format='jsonl', file=self.out, log_retval=True)
+        def f(a, *args, b=2, **kwargs):
+            return g(a) + len(args)
+
+        @log_calls(format='jsonl', file=self.out)
+        def g(x): return x
+
+        self.assertEqual(f(1, 2, 3, c=4), 3)
+        g_rec, f_rec = self.records()       # g completes first
+        self.assertEqual(f_rec['function'].rsplit('.', 1)[-1], 'f')
+        self.assertEqual(f_rec['call_num'], 1)
+        self.assertEqual(f_rec['depth'], 0)
+        self.assertEqual(f_rec['args'], {'a': '1', '*args': '(2, 3)', '**kwargs': "{'c': 4}"})
+        self.assertEqual(f_rec['defaults'], {'b': '2'})
+        self.assertEqual(g_rec['defaults'], {})
+        self.assertEqual(f_rec['retval'], '3')
+        self.assertIsNone(f_rec['exception'])
+        self.assertGreaterEqual(f_rec['elapsed_secs'], g_rec['elapsed_secs'])
+        self.assertEqual(g_rec['caller_chain'], [f_rec['function']])
+        self.assertEqual(g_rec['depth'], 1)
+        self.assertIsNone(g_rec['retval'])          # log_retval is False
+
+    def test_exception_and_messages(self):
+        @log_calls(format='jsonl', file=self.out, log_args=False)
+        def f(x):
+            log_calls.print('x is', x)
+            return 1 / x
+
+        with self.assertRaises(ZeroDivisionError):
+            f(0)
+        msg_rec, f_rec = self.records()
+        self.assertEqual(msg_rec['message'], 'x is 0')
+        self.assertEqual(msg_rec['call_num'], 1)
+        self.assertIsNone(f_rec['args'])
+        self.assertIsNone(f_rec['defaults'])
+        self.assertIsNone(f_rec['retval'])
+        self.assertTrue(f_rec['exception'].startswith('ZeroDivisionError('))
+
+    def test_arguments_that_dont_bind(self):
+        @log_calls(format='jsonl', file=self.out)
+        def f(a): pass
+
+        with self.assertRaises(TypeError) as cm:
+            f(1, 2, b=3)
+        # f's own TypeError, not one from binding the arguments to log them
+        self.assertIn('f()', str(cm.exception))
+        f_rec, = self.records()
+        self.assertEqual(f_rec['args'], {'*args': '(1, 2)', 'b': '3'})
+        self.assertTrue(f_rec['exception'].startswith('TypeError('))
+
+    def test_bounded_reprs_and_mute(self):
+        @log_calls(format='jsonl', file=self.out, log_retval=True)
+        def f(s): return s
+
+        f('x' * 10000)
+        rec, = self.records()
+        self.assertLessEqual(len(rec['args']['s']), jsonl.MAXLEN_REPR)
+        self.assertLessEqual(len(rec['retval']), jsonl.MAXLEN_REPR)
+
+        f.log_calls_settings.mute = log_calls.MUTE.CALLS
+        f('y')
+        self.assertEqual(len(self.records()), 1)
+
+    def test_logger(self):
+        logger = logging.Logger('test_jsonl')
+        handler = logging.StreamHandler(self.out)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+
+        @log_calls(format='jsonl', logger=logger, loglevel=logging.INFO)
+        def f(): pass
+
+        f()
+        rec, = self.records()
+        self.assertEqual(rec['args'], {})
+
+    def test_text_is_default(self):
+        @log_calls(file=self.out)
+        def f(): pass
+
+        self.assertEqual(f.log_calls_settings.format, 'text')
+        f()
+        self.assertIn(' <== called by ', self.out.getvalue())
+
+
+class TestCompact(TestCase):
+
+    def setUp(self):
+        self.out = io.StringIO()
+
+    def test_one_line_per_call(self):
+        @log_calls(format='compact', file=self.out, log_retval=True,
+                   log_call_numbers=True, prefix='C.', name='%s')
+        def f(a):
+            log_calls.print('in f')
+            return g(a)
+
+        @log_calls(format='compact', file=self.out, prefix='C.', name='%s')
+        def g(x, y=1): return x
+
+        f(5)
+        self.assertEqual(
+            self.out.getvalue().splitlines(),
+            ['C.f [1]: in f',
+             'C.g <== called by C.f [1]; depth: 1; arguments: x=5; defaults:  y=1',
+             'C.f [1] <== called by test_one_line_per_call; depth: 0; '
+             'arguments: a=5; C.f [1] return value: 5'])
+
+    def test_exception(self):
+        @log_calls(format='compact', file=self.out, log_args=False, prefix='C.',
+                   name='%s')
+        def f(x): return 1 / x
+
+        with self.assertRaises(ZeroDivisionError):
+            f(0)
+        line, = self.out.getvalue().splitlines()
+        self.assertTrue(line.startswith('C.f <== called by test_exception; depth: 0; '
+                                        'exception: ZeroDivisionError('))
+
+
+# For unittest integration
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(jsonl))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
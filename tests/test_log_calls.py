@@ -898,7 +898,7 @@ write settings using the `log_calls` keywords as keys:
 The `log_calls_settings` attribute has a length:
 
     >>> len(f.log_calls_settings)
-    15
+    23
 
 Its keys and items can be iterated through:
 
@@ -906,17 +906,23 @@ Its keys and items can be iterated through:
     >>> for k in f.log_calls_settings: keys.append(k)
     >>> keys                                            # doctest: +NORMALIZE_WHITESPACE
     ['enabled', 'args_sep', 'log_args',
-     'log_retval', 'log_elapsed', 'log_exit',
+     'log_retval', 'log_elapsed', 'clocks',
+     'log_memory', 'log_resources', 'size_of', 'log_exit',
      'indent', 'log_call_numbers',
      'prefix', 'file',
-     'logger', 'loglevel', 'mute',
+     'logger', 'loglevel', 'format', 'sink',
+     'max_rate', 'collapse_repeats', 'mute',
      'record_history', 'max_history']
     >>> list(f.log_calls_settings.items())              # doctest: +NORMALIZE_WHITESPACE
     [('enabled', False),   ('args_sep', ', '),    ('log_args', True),
-     ('log_retval', True), ('log_elapsed', True), ('log_exit', True),
+     ('log_retval', True), ('log_elapsed', True), ('clocks', 'process'),
+     ('log_memory', False), ('log_resources', False), ('size_of', None),
+     ('log_exit', True),
      ('indent', True),     ('log_call_numbers', False),
      ('prefix', ''),       ('file', None),
      ('logger', None),     ('loglevel', 10),
+     ('format', 'text'),   ('sink', None),
+     ('max_rate', 0),      ('collapse_repeats', 0),
      ('mute', False),
      ('record_history', False), ('max_history', 0)]
 
@@ -1005,10 +1011,14 @@ but using `as_dict()` is sufficient):
     >>> od                      # doctest: +NORMALIZE_WHITESPACE
     OrderedDict([('enabled', True),           ('args_sep', ', '),
                  ('log_args', True),          ('log_retval', False),
-                 ('log_elapsed', False),      ('log_exit', True),
+                 ('log_elapsed', False),      ('clocks', 'process'),
+                 ('log_memory', False),       ('log_resources', False),
+                 ('size_of', None),           ('log_exit', True),
                  ('indent', True),            ('log_call_numbers', False),
                  ('prefix', ''),              ('file', None),
                  ('logger', None),            ('loglevel', 10),
+                 ('format', 'text'),          ('sink', None),
+                 ('max_rate', 0),             ('collapse_repeats', 0),
                  ('mute', False),
                  ('record_history', False),   ('max_history', 0)])
 
@@ -1483,6 +1493,11 @@ For the record, the records that comprise a decorated function's history are
     timestamp
     prefixed_func_name
     caller_chain
+    elapsed_secs_corrected
+    process_secs_corrected
+    memory
+    resources
+    size
 
 By now, the significance of each field should be clear.
 
@@ -1258,6 +1258,40 @@ def main__test__decorate_class__hierarchy():
 main__test__decorate_class__hierarchy.__doc__ = \
     main__test__decorate_class__hierarchy.__doc__.replace("__main__", __name__)
 
+#=============================================================================
+# main__lc_class_deco__members_settings
+#=============================================================================
+def main__lc_class_deco__members_settings():
+    """
+The decorators of the members of a decorated class (cloned from a template)
+have the same settings as a decorator constructed with the class's settings,
+except that `__init__` doesn't log its return value:
+
+    >>> CLASS_SETTINGS = dict(log_args=False, log_retval=True, prefix='A.',
+    ...                       record_history=True, max_history=3)
+    >>> @log_calls(**CLASS_SETTINGS)
+    ... class A():
+    ...     def __init__(self): pass
+    ...     def f(self): pass
+    ...     @staticmethod
+    ...     def g(): pass
+    ...     @property
+    ...     def p(self): return 1
+    ...     class I():
+    ...         def h(self): pass
+    >>> @log_calls(**CLASS_SETTINGS)
+    ... def f(): pass
+    >>> expected = f.log_calls_settings.as_OD()
+    >>> [cls.get_log_calls_wrapper(name).log_calls_settings.as_OD() == expected
+    ...  for cls, name in ((A, 'f'), (A, 'g'), (A, 'p'), (A.I, 'h'))]
+    [True, True, True, True]
+    >>> init_settings = A.get_log_calls_wrapper('__init__').log_calls_settings
+    >>> init_settings.log_retval, init_settings.max_history
+    (False, 3)
+    """
+    pass
+
+
 ##############################################################################
 # end of tests.
 ##############################################################################
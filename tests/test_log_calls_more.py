@@ -533,6 +533,10 @@ Verify the settings:
     ...     'log_args': True,
     ...     'log_retval': False,
     ...     'log_elapsed': 'elapsed_',
+    ...     'clocks': 'process',
+    ...     'log_memory': False,
+    ...     'log_resources': False,
+    ...     'size_of': None,
     ...     'log_exit': True,
     ...     'indent': True,
     ...     'log_call_numbers': True,
@@ -540,6 +544,10 @@ Verify the settings:
     ...     'file': None,
     ...     'logger': 'logger_',
     ...     'loglevel': 10,
+    ...     'format': 'text',
+    ...     'sink': None,
+    ...     'max_rate': 0,
+    ...     'collapse_repeats': 0,
     ...     'mute': False,
     ...     'record_history': False,
     ...     'max_history': 57
@@ -598,12 +606,20 @@ We have to step carefully around the 'file' setting, to be able to doctest '`od`
     ...     'log_args': True,
     ...     'log_retval': True,
     ...     'log_elapsed': 'elapsed_',
+    ...     'clocks': 'process',
+    ...     'log_memory': False,
+    ...     'log_resources': False,
+    ...     'size_of': None,
     ...     'log_exit': True,
     ...     'indent': True,
     ...     'log_call_numbers': True,
     ...     'prefix': '',
     ...     'logger': 'star3_logger',
     ...     'loglevel': 10,
+    ...     'format': 'text',
+    ...     'sink': None,
+    ...     'max_rate': 0,
+    ...     'collapse_repeats': 0,
     ...     'mute': False,
     ...     'record_history': False,
     ...     'max_history': 0
@@ -680,6 +696,10 @@ Let's use this troubled settings file and examine the resulting settings:
     ...     'log_args': True,
     ...     'log_retval': False,
     ...     'log_elapsed': False,
+    ...     'clocks': 'process',
+    ...     'log_memory': False,
+    ...     'log_resources': False,
+    ...     'size_of': None,
     ...     'log_exit': True,
     ...     'indent': True,
     ...     'log_call_numbers': False,
@@ -687,6 +707,10 @@ Let's use this troubled settings file and examine the resulting settings:
     ...     'file': None,
     ...     'logger': None,
     ...     'loglevel': 10,
+    ...     'format': 'text',
+    ...     'sink': None,
+    ...     'max_rate': 0,
+    ...     'collapse_repeats': 0,
     ...     'mute': False,
     ...     'record_history': False,
     ...     'max_history': 0
@@ -702,6 +726,10 @@ Now let's test `settings` as a dict:
     ...     'args_sep': ' / ',
     ...     'log_args': False,
     ...     'log_elapsed': 'elapsed_=',
+    ...     'clocks': 'process',
+    ...     'log_memory': False,
+    ...     'log_resources': False,
+    ...     'size_of': None,
     ...     'indent': True,
     ...     'log_call_numbers': True,
     ...     'logger': 'logger_=',
@@ -721,6 +749,10 @@ Verify that `f`'s settings are as expected:
     ...     'log_args': True,
     ...     'log_retval': False,
     ...     'log_elapsed': 'elapsed_',
+    ...     'clocks': 'process',
+    ...     'log_memory': False,
+    ...     'log_resources': False,
+    ...     'size_of': None,
     ...     'log_exit': True,
     ...     'indent': True,
     ...     'log_call_numbers': True,
@@ -728,6 +760,10 @@ Verify that `f`'s settings are as expected:
     ...     'file': None,
     ...     'logger': 'logger_',
     ...     'loglevel': 10,
+    ...     'format': 'text',
+    ...     'sink': None,
+    ...     'max_rate': 0,
+    ...     'collapse_repeats': 0,
     ...     'mute': False,
     ...     'record_history': False,
     ...     'max_history': 57
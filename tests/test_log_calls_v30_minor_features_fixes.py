@@ -499,6 +499,50 @@ Another:
     """
     pass
 
+
+def test__log_exprs_inactive_and_cached():
+    """
+When the decorated function is disabled, or its output is muted (MUTE.ALL),
+print_exprs / log_exprs evaluate nothing:
+
+    >>> evaluated = []
+    >>> def probe(x):
+    ...     evaluated.append(x)
+    ...     return x
+
+    >>> @log_calls(mute=log_calls.MUTE.ALL)
+    ... def h(n):
+    ...     for i in range(n):
+    ...         log_calls.print_exprs('probe(i)')
+    ...         h.log_exprs('probe(-i)')
+    >>> h(3)
+    >>> evaluated
+    []
+    >>> h.log_calls_settings.mute = False
+    >>> h.log_calls_settings.enabled = False
+    >>> h(3)
+    >>> evaluated
+    []
+
+When output is on, the expressions are evaluated (their compiled code is cached):
+
+    >>> h.log_calls_settings.enabled = True
+    >>> h(2)
+    h <== called by <module>
+        arguments: n=2
+        probe(i) = 0
+        probe(-i) = 0
+        probe(i) = 1
+        probe(-i) = -1
+    h ==> returning to <module>
+    >>> evaluated
+    [0, 0, 1, -1]
+    >>> from log_calls.log_calls import _compile_expr
+    >>> _compile_expr('probe(i)') is _compile_expr('probe(i)')
+    True
+    """
+    pass
+
 ##############################################################################
 # end of tests.
 ##############################################################################
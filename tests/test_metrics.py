@@ -0,0 +1,102 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    log_calls.metrics_text, log_calls.serve_metrics, and metrics.py
+"""
+
+import doctest
+import unittest
+import urllib.error
+import urllib.request
+from unittest import TestCase
+
+from log_calls import log_calls, record_history
+from log_calls import metrics
+
+
+@log_calls(mute=True, prefix='test_metrics.')
+def f(x):
+    if x < 0:
+        raise ValueError(x)
+    return x
+
+@log_calls(mute=True, enabled=False, prefix='test_metrics.')
+def g(x):
+    raise KeyError(x)
+
+@record_history(prefix='test_metrics.')
+def h(): pass
+
+
+def samples(text) -> dict:
+    """{'name{labels}': value} of the samples in text"""
+    return {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+            for line in text.splitlines() if not line.startswith('#')}
+
+
+#----------------------------------------------------------------------------
+# Test class for metrics_text, serve_metrics
+#----------------------------------------------------------------------------
+class TestMetrics(TestCase):
+
+    def setUp(self):
+        for fn in (f, g, h):
+            fn.stats.clear_history()
+
+    def test_metrics_text(self):
+        f(1); f(2)
+        with self.assertRaises(ValueError):
+            f(-1)
+        with self.assertRaises(KeyError):
+            g(0)
+
+        m = samples(log_calls.metrics_text())
+        self.assertEqual(m['log_calls_calls_total{function="test_metrics.f"}'], 3)
+        self.assertEqual(m['log_calls_logged_calls_total{function="test_metrics.f"}'], 3)
+        self.assertEqual(m['log_calls_errors_total{function="test_metrics.f"}'], 1)
+        # errors are counted in disabled calls too
+        self.assertEqual(m['log_calls_calls_total{function="test_metrics.g"}'], 1)
+        self.assertEqual(m['log_calls_logged_calls_total{function="test_metrics.g"}'], 0)
+        self.assertEqual(m['log_calls_errors_total{function="test_metrics.g"}'], 1)
+        # only calls that returned are timed
+        self.assertEqual(m['log_calls_wall_seconds_count{function="test_metrics.f"}'], 2)
+        self.assertEqual(m['log_calls_wall_seconds_bucket{function="test_metrics.f",le="+Inf"}'], 2)
+        self.assertEqual(m['log_calls_wall_seconds_sum{function="test_metrics.f"}'],
+                         f.stats.elapsed_secs_logged)
+        self.assertEqual(m['log_calls_wall_seconds_count{function="test_metrics.g"}'], 0)
+        # each deco class exports its own functions
+        self.assertNotIn('log_calls_calls_total{function="test_metrics.h"}', m)
+        h()
+        self.assertEqual(
+            samples(record_history.metrics_text())['record_history_calls_total{function="test_metrics.h"}'], 1)
+
+    def test_clear_history_resets(self):
+        with self.assertRaises(ValueError):
+            f(-1)
+        f(1)
+        f.stats.clear_history()
+        m = samples(log_calls.metrics_text())
+        self.assertEqual(m['log_calls_errors_total{function="test_metrics.f"}'], 0)
+        self.assertEqual(m['log_calls_wall_seconds_count{function="test_metrics.f"}'], 0)
+
+    def test_serve_metrics(self):
+        f(1)
+        server = log_calls.serve_metrics(port=0)
+        self.addCleanup(server.stop)
+        url = 'http://127.0.0.1:%d/metrics' % server.port
+        with urllib.request.urlopen(url) as response:
+            self.assertEqual(response.headers['Content-Type'],
+                             metrics.MetricsServer.CONTENT_TYPE)
+            m = samples(response.read().decode('utf-8'))
+        self.assertEqual(m['log_calls_calls_total{function="test_metrics.f"}'], 1)
+        with self.assertRaises(urllib.error.HTTPError):
+            urllib.request.urlopen('http://127.0.0.1:%d/nothing' % server.port)
+
+
+# For unittest integration
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(metrics))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    max_rate, collapse_repeats: less output for repetitive calls;
+    counters and history unaffected
+"""
+
+import doctest
+import io
+import threading
+import time
+import unittest
+from unittest import TestCase, mock
+
+from log_calls import log_calls
+from log_calls import output_limits
+
+
+class TestOutputLimits(TestCase):
+
+    def run_calls(self, fn, arg_list):
+        out = io.StringIO()
+        with mock.patch('sys.stdout', out):
+            for args in arg_list:
+                fn(*args)
+            log_calls.flush_repeats()
+        return out.getvalue().splitlines()
+
+    def test_collapse_repeats(self):
+        @log_calls(collapse_repeats=60, log_exit=False, record_history=True, name='%s')
+        def f(a):
+            return a
+
+        lines = self.run_calls(f, [(1,)] * 5 + [(2,)] * 3)
+        self.assertEqual(lines[:2], ['f <== called by run_calls', '    arguments: a=1'])
+        self.assertRegex(lines[2], r'^f: 4 more identical calls; elapsed secs min \S+, avg \S+, max \S+$')
+        self.assertEqual(lines[3:5], ['f <== called by run_calls', '    arguments: a=2'])
+        # written by flush_repeats
+        self.assertRegex(lines[5], r'^f: 2 more identical calls; ')
+        self.assertEqual(len(lines), 6)
+        # counters and history are exact
+        self.assertEqual(f.stats.num_calls_logged, 8)
+        self.assertEqual([rec.argvals for rec in f.stats.history],
+                         [(1,)] * 5 + [(2,)] * 3)
+
+    def test_collapse_repeats_timeout(self):
+        @log_calls(collapse_repeats=True, log_args=False, log_exit=False, name='%s')
+        def f(a):
+            return a
+
+        with mock.patch('time.monotonic') as monotonic:
+            monotonic.side_effect = [0.0, 0.5, 0.9, 1.0, 1.2]
+            lines = self.run_calls(f, [(1,)] * 5)
+        self.assertEqual(lines[0], 'f <== called by run_calls')
+        self.assertRegex(lines[1], r'^f: 2 more identical calls; ')
+        self.assertEqual(lines[2], 'f <== called by run_calls')     # at 1.0: a new run
+        self.assertRegex(lines[3], r'^f: 1 more identical call; ')
+
+    def test_collapse_repeats_swept(self):
+        @log_calls(collapse_repeats=0.05, log_args=False, log_exit=False, name='%s')
+        def f(a):
+            return a
+
+        out = io.StringIO()
+        with mock.patch('sys.stdout', out):
+            for _ in range(3):
+                f(1)
+            # no more calls, no flush_repeats: the sweeper writes the note
+            deadline = time.time() + 5
+            while 'more identical' not in out.getvalue() and time.time() < deadline:
+                time.sleep(0.01)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], 'f <== called by test_collapse_repeats_swept')
+        self.assertRegex(lines[1], r'^f: 2 more identical calls; ')
+        self.assertEqual(len(lines), 2)
+
+    def test_repeats_that_raise_arent_timed(self):
+        lim = output_limits.OutputLimiter('f')
+        for t in (0.0, 0.1, 0.2, 0.3):
+            lim.admit(0, 10, 'k', now=t)
+        lim.add_repeat(3.0)     # the other two repeats raised
+        self.assertEqual(lim.admit(0, 10, 'other key', now=0.4).notes,
+                         ['f: 3 more identical calls; elapsed secs min 3, avg 3, max 3'])
+
+    def test_threads(self):
+        lim = output_limits.OutputLimiter('f')
+        lim.admit(0, 60, 'k', now=0.0)
+
+        def repeat():
+            for _ in range(1000):
+                if lim.admit(0, 60, 'k', now=1.0).repeat:
+                    lim.add_repeat(0.5)
+
+        threads = [threading.Thread(target=repeat) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(lim.admit(0, 60, 'other key', now=2.0).notes,
+                         ['f: 8000 more identical calls; elapsed secs min 0.5, avg 0.5, max 0.5'])
+
+    def test_max_rate(self):
+        @log_calls(max_rate=2, log_args=False, log_exit=False, name='%s')
+        def f(a):
+            return a
+
+        with mock.patch('time.monotonic') as monotonic:
+            monotonic.side_effect = [0.0, 0.1, 0.2, 0.3, 0.4, 5.0]
+            lines = self.run_calls(f, [(n,) for n in range(6)])
+        self.assertEqual(lines, ['f <== called by run_calls',
+                                 'f <== called by run_calls',
+                                 'f: 3 calls not logged (max_rate=2)',
+                                 'f <== called by run_calls'])
+        self.assertEqual(f.stats.num_calls_logged, 6)
+
+    def test_suppressed_calls_print_nothing(self):
+        @log_calls(max_rate=1, log_exit=False, name='%s')
+        def f(a):
+            log_calls.print('inside')
+
+        lines = self.run_calls(f, [(1,), (2,), (3,)])
+        self.assertEqual(lines, ['f <== called by run_calls',
+                                 '    arguments: a=1',
+                                 '    inside'])
+
+    def test_off_by_default(self):
+        @log_calls(log_args=False, log_exit=False, name='%s')
+        def f(a):
+            return a
+
+        self.assertEqual(len(self.run_calls(f, [(1,)] * 3)), 3)
+        f.log_calls_settings.collapse_repeats = 60
+        self.assertEqual(len(self.run_calls(f, [(1,)] * 3)), 2)
+
+
+##############################################################################
+# end of tests.
+##############################################################################
+
+# For unittest integration
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(output_limits))
+    return tests
+
+
+if __name__ == '__main__':
+    unittest.main()
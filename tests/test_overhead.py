@@ -0,0 +1,84 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    stats.elapsed_secs_corrected, process_secs_corrected; calibrate_overhead
+"""
+
+import unittest
+from unittest import TestCase
+
+from log_calls import log_calls, record_history
+from log_calls.log_calls import _deco_base
+
+
+#----------------------------------------------------------------------------
+# Test class for the corrected times
+#----------------------------------------------------------------------------
+class TestCorrectedTimes(TestCase):
+
+    def setUp(self):
+        saved = {path: getattr(_deco_base, '_overhead_ns_' + path)
+                 for path in ('bypassed', 'disabled', 'enabled')}
+        def restore():
+            for path, ns in saved.items():
+                setattr(_deco_base, '_overhead_ns_' + path, ns)
+        self.addCleanup(restore)
+
+    def outer_calling(self, inner, n=200):
+        @log_calls(mute=True, record_history=True)
+        def outer():
+            for _ in range(n):
+                inner()
+        outer()
+        return outer
+
+    def test_enabled_callees(self):
+        @log_calls(mute=True, record_history=True)
+        def inner(): pass
+
+        outer = self.outer_calling(inner)
+        stats = outer.stats
+        # The callees' wrappers are almost all of outer's time
+        self.assertLess(stats.elapsed_secs_corrected, stats.elapsed_secs_logged / 2)
+        self.assertGreaterEqual(stats.elapsed_secs_corrected, 0.0)
+        self.assertLessEqual(stats.process_secs_corrected, stats.process_secs_logged)
+        rec, = stats.history
+        self.assertEqual(rec.elapsed_secs_corrected, stats.elapsed_secs_corrected)
+        self.assertEqual(rec.process_secs_corrected, stats.process_secs_corrected)
+
+        # No decorated callees, nothing to subtract
+        self.assertEqual(inner.stats.elapsed_secs_corrected,
+                         inner.stats.elapsed_secs_logged)
+        rec = inner.stats.history[-1]
+        self.assertEqual(rec.elapsed_secs_corrected, rec.elapsed_secs)
+
+        stats.clear_history()
+        self.assertEqual(stats.elapsed_secs_corrected, 0.0)
+        self.assertEqual(stats.process_secs_corrected, 0.0)
+
+    def test_disabled_and_bypassed_callees(self):
+        @log_calls(enabled=False)
+        def disabled(): pass
+
+        @log_calls(enabled=-1)
+        def bypassed(): pass
+
+        stats = self.outer_calling(disabled).stats
+        self.assertLess(stats.elapsed_secs_corrected, stats.elapsed_secs_logged)
+        # Bypassed wrappers can't time themselves: only the calibrated part
+        log_calls.calibrate_overhead(loops=100, repeat=1)
+        stats = self.outer_calling(bypassed).stats
+        self.assertLessEqual(stats.elapsed_secs_corrected, stats.elapsed_secs_logged)
+
+    def test_calibrate_overhead(self):
+        residues = record_history.calibrate_overhead(loops=200)
+        self.assertEqual(sorted(residues), ['bypassed', 'disabled', 'enabled'])
+        for path, ns in residues.items():
+            self.assertIsInstance(ns, int)
+            self.assertGreaterEqual(ns, 0)
+            # Shared by all deco classes
+            self.assertEqual(getattr(log_calls, '_overhead_ns_' + path), ns)
+            self.assertEqual(getattr(record_history, '_overhead_ns_' + path), ns)
+
+
+if __name__ == "__main__":
+    unittest.main()
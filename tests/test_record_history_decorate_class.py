@@ -23,17 +23,20 @@ def test__record_history_decorate_class():
                             varargs=(), explicit_kwargs=OrderedDict(), defaulted_kwargs=OrderedDict(),
                             implicit_kwargs={}, retval='AbcAbc',
                             elapsed_secs=..., process_secs=..., timestamp=...,
-                            prefixed_func_name='A.twice', caller_chain=['<module>']),
+                            prefixed_func_name='A.twice', caller_chain=['<module>'],
+                            elapsed_secs_corrected=..., process_secs_corrected=...),
      CallRecord(call_num=2, argnames=['self'], argvals=(<__main__.A object at 0x...>,),
                             varargs=(), explicit_kwargs=OrderedDict(), defaulted_kwargs=OrderedDict(),
                             implicit_kwargs={}, retval='AbcAbc',
                             elapsed_secs=..., process_secs=..., timestamp=...,
-                            prefixed_func_name='A.twice', caller_chain=['<module>']),
+                            prefixed_func_name='A.twice', caller_chain=['<module>'],
+                            elapsed_secs_corrected=..., process_secs_corrected=...),
      CallRecord(call_num=3, argnames=['self'], argvals=(<__main__.A object at 0x...>,),
                             varargs=(), explicit_kwargs=OrderedDict(), defaulted_kwargs=OrderedDict(),
                             implicit_kwargs={}, retval='AbcAbc',
                             elapsed_secs=..., process_secs=..., timestamp=...,
-                            prefixed_func_name='A.twice', caller_chain=['<module>']))
+                            prefixed_func_name='A.twice', caller_chain=['<module>'],
+                            elapsed_secs_corrected=..., process_secs_corrected=...))
 
     """
     pass
@@ -0,0 +1,101 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    replay.py: saving recorded calls, and replaying them
+"""
+
+import contextlib
+import io
+import os
+import pickle
+import tempfile
+import threading
+import unittest
+from unittest import TestCase
+
+from log_calls import log_calls, record_history, cache_calls
+from log_calls.replay import save_calls, load_calls, replay, undecorated, main
+
+
+@record_history()
+def sort_copy(xs, reverse=False, *more, **options):
+    xs.sort(reverse=reverse)        # mutates its argument
+    return xs
+
+
+class TestReplay(TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, 'calls.pkl')
+        sort_copy.stats.clear_history()
+
+    def test_save_and_load(self):
+        sort_copy([3, 1, 2])
+        sort_copy([5, 4], True, 'extra', key=None)
+        sort_copy([threading.Lock()])                   # can't be pickled
+        self.assertEqual(save_calls(sort_copy, self.path), 2)
+
+        saved = load_calls(self.path)
+        self.assertEqual(saved.function, sort_copy.__module__ + ':sort_copy')
+        self.assertEqual([call.call_num for call in saved.calls], [1, 2])
+        self.assertEqual([call.elapsed_secs for call in saved.calls],
+                         [rec.elapsed_secs for rec in sort_copy.stats.history[:2]])
+        # History holds the arguments themselves: [3, 1, 2], sorted by the call
+        self.assertEqual(pickle.loads(saved.calls[0].pickled_args), (([1, 2, 3],), {}))
+        self.assertEqual(pickle.loads(saved.calls[1].pickled_args),
+                         (([5, 4], True, 'extra'), {'key': None}))
+
+    def test_size_budget_and_selection(self):
+        for n in (10, 100000, 20):
+            sort_copy(list(range(n)))
+        self.assertEqual(save_calls(sort_copy, self.path, max_bytes=10000), 2)
+        self.assertEqual([call.call_num for call in load_calls(self.path).calls], [1, 3])
+
+        records = [rec for rec in sort_copy.stats.history if len(rec.argvals[0]) > 10]
+        self.assertEqual(save_calls(sort_copy, self.path, records), 2)
+
+    def test_replay(self):
+        sort_copy([3, 1, 2])
+        sort_copy(list(range(1000, 0, -1)))
+        save_calls(sort_copy, self.path)
+
+        report = replay(self.path, repeat=3)      # imports sort_copy
+        self.assertEqual(report.repeat, 3)
+        self.assertEqual([res.call_num for res in report.results], [1, 2])
+        for res, rec in zip(report.results, sort_copy.stats.history):
+            self.assertEqual(res.recorded_secs, rec.elapsed_secs)
+            self.assertTrue(0 < res.min_secs <= res.median_secs <= res.max_secs)
+            self.assertAlmostEqual(res.ratio, res.median_secs / res.recorded_secs)
+        # The undecorated function was replayed: no calls recorded
+        self.assertEqual(sort_copy.stats.num_calls_logged, 2)
+        self.assertAlmostEqual(report.ratio, report.median_secs / report.recorded_secs)
+        self.assertEqual(report.slower(tolerance=1e9), [])
+        self.assertEqual(report.as_csv.splitlines()[0],
+                         'call_num|recorded_secs|min_secs|median_secs|max_secs|ratio')
+        self.assertIn('2 calls, 3 runs each', str(report))
+
+    def test_main(self):
+        sort_copy([2, 1])
+        save_calls(sort_copy, self.path)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(main([self.path, '--repeat', '2', '--tolerance', '1e9']), 0)
+        self.assertIn('ratio', out.getvalue())
+
+    def test_undecorated(self):
+        def f(): pass
+
+        g = log_calls()(record_history()(cache_calls()(f)))
+        self.assertIs(undecorated(g), f)
+        self.assertIs(undecorated(f), f)
+
+    def test_bad_file(self):
+        with open(self.path, 'wb') as fp:
+            pickle.dump([1, 2], fp)
+        with self.assertRaises(ValueError):
+            load_calls(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    The `log_memory` and `log_resources` settings, and resources.py
+"""
+
+import doctest
+import gc
+import io
+import os
+import tempfile
+import tracemalloc
+import unittest
+from unittest import TestCase
+
+from log_calls import log_calls
+from log_calls import resources
+
+
+class TestLogMemory(TestCase):
+
+    def setUp(self):
+        self.out = io.StringIO()
+
+    def test_traced(self):
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+
+        @log_calls(mute=True, log_memory=True, record_history=True)
+        def outer(n):
+            keep = [0] * n
+            inner(n * 10)
+            return keep
+
+        @log_calls(mute=True, log_memory=True, record_history=True)
+        def inner(n):
+            return len([0] * n)
+
+        keep = outer(10000)
+        inner_usage = inner.stats.history[0].memory
+        outer_usage = outer.stats.history[0].memory
+        self.assertGreaterEqual(inner_usage.peak_bytes, 8 * 100000)
+        self.assertLess(inner_usage.alloc_bytes, 8 * 1000)      # freed
+        # outer's peak includes inner's, on top of what outer keeps
+        self.assertGreaterEqual(outer_usage.peak_bytes,
+                                inner_usage.peak_bytes + 8 * 10000)
+        self.assertGreaterEqual(outer_usage.alloc_bytes, 8 * 10000)
+        self.assertEqual(outer.stats.memory_logged, outer_usage)
+
+        outer(10)
+        total = outer.stats.memory_logged
+        self.assertEqual(total.peak_bytes, outer_usage.peak_bytes)
+        self.assertEqual(total.alloc_bytes,
+                         sum(rec.memory.alloc_bytes for rec in outer.stats.history))
+        del keep
+
+    def test_traced_raises(self):
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+
+        @log_calls(mute=True, log_memory=True)
+        def fails(n):
+            _ = [0] * n
+            raise ValueError(n)
+
+        @log_calls(mute=True, log_memory=True)
+        def outer(n):
+            fails(n)
+
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                fails(10)
+            # its entry is popped off the stack of probed calls
+            self.assertIsNone(resources._peaks.top)
+        with self.assertRaises(ValueError):
+            outer(100000)
+        self.assertIsNone(resources._peaks.top)
+
+    def test_untraced_gc(self):
+        @log_calls(file=self.out, log_args=False, log_exit=False,
+                   log_memory=True, record_history=True, name='%s')
+        def f():
+            gc.collect()
+
+        f()
+        usage = f.stats.history[0].memory
+        self.assertIsNone(usage.alloc_bytes)
+        self.assertIsNone(usage.peak_bytes)
+        self.assertGreaterEqual(usage.gc_collections, 1)
+        self.assertGreater(usage.gc_secs, 0.0)
+        self.assertRegex(self.out.getvalue().splitlines()[-1],
+                         r'^    memory: gc collections: [1-9]\d* \(\S+ \[secs\]\)$')
+
+        f.stats.clear_history()
+        self.assertIsNone(f.stats.memory_logged)
+
+    def test_off_by_default(self):
+        @log_calls(mute=True, record_history=True)
+        def f(): pass
+
+        f()
+        self.assertIsNone(f.stats.history[0].memory)
+        self.assertIsNone(f.stats.history[0].resources)
+        self.assertIsNone(f.stats.memory_logged)
+
+
+@unittest.skipIf(resources.resource is None, "no resource module")
+class TestLogResources(TestCase):
+
+    def test_block_output(self):
+        out = io.StringIO()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+
+        @log_calls(file=out, log_args=False, log_exit=False, log_resources=True,
+                   record_history=True, name='%s')
+        def write(path):
+            with open(path, 'wb') as fp:
+                fp.write(os.urandom(1 << 20))
+                fp.flush()
+                os.fsync(fp.fileno())
+
+        write(os.path.join(tmpdir.name, 'x'))
+        usage = write.stats.history[0].resources
+        self.assertIsInstance(usage, resources.ResourceUsage)
+        self.assertTrue(all(n >= 0 for n in usage))
+        self.assertEqual(write.stats.resources_logged, usage)
+        self.assertRegex(out.getvalue().splitlines()[-1],
+                         r'^    resources: context switches: \d+ voluntary, \d+ involuntary; '
+                         r'block I/O: \d+ in, \d+ out$')
+
+
+# For unittest integration
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(resources))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
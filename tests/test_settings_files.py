@@ -0,0 +1,149 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    settings files: parsed once while unchanged, reloaded into live
+    decorators (reload_settings_files, watch_settings_files);
+    environment variable overrides
+"""
+
+import doctest
+import os
+import tempfile
+import time
+import unittest
+from unittest import TestCase, mock
+
+from log_calls import log_calls, record_history
+from log_calls.log_calls import _deco_base
+from log_calls import settings_files
+
+
+class TestSettingsFiles(TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, 'settings.txt')
+        self.mtime_ns = time.time_ns()
+        self.write_settings("log_args=False\nprefix='x.'\n")
+        # forget any environment settings of other tests
+        self.addCleanup(_deco_base._env_settings.clear)
+        _deco_base._env_settings.clear()
+
+    def write_settings(self, text):
+        with open(self.path, 'w') as fp:
+            fp.write(text)
+        # make sure the file's signature changes, however coarse mtimes are
+        self.mtime_ns += 1000000000
+        os.utime(self.path, ns=(self.mtime_ns, self.mtime_ns))
+
+    def test_parsed_once_while_unchanged(self):
+        path = os.path.abspath(self.path)
+        with mock.patch('builtins.open', wraps=open) as mock_open:
+            d1 = log_calls._read_settings_file(self.path)
+            d2 = log_calls._read_settings_file(self.path)
+        self.assertEqual(mock_open.call_count, 1)
+        self.assertEqual(d1, {'log_args': False, 'prefix': 'x.'})
+        self.assertEqual(d1, d2)
+        self.assertIsNot(d1, d2)        # copies
+
+        self.write_settings("log_args=True\nenabled=False\n")
+        with mock.patch('builtins.open', wraps=open) as mock_open:
+            self.assertEqual(log_calls._read_settings_file(self.path),
+                             {'log_args': True, 'enabled': False})
+        self.assertEqual(mock_open.call_count, 1)
+        self.assertIn(('log_calls', path), _deco_base._settings_files)
+        # cached per deco class: record_history has no log_args
+        self.assertEqual(record_history._read_settings_file(self.path), {'enabled': False})
+
+    def test_reload_pushes_changes(self):
+        @log_calls(settings=self.path, log_exit=False)
+        def f(a): pass
+
+        class C():
+            @log_calls(settings=self.path)
+            def m(self): pass
+        C = log_calls(settings=self.path)(C)
+
+        f.log_calls_settings.log_retval = True      # changed at runtime
+        self.assertEqual(log_calls.reload_settings_files(), [])
+
+        self.write_settings("log_args=True\nlog_exit=True\nlog_retval=False\nmute=1\n")
+        self.assertEqual(log_calls.reload_settings_files(), [os.path.abspath(self.path)])
+
+        settings = f.log_calls_settings
+        self.assertEqual(settings.log_args, True)       # was the file's
+        self.assertEqual(settings.prefix, '')           # no longer in the file: default
+        self.assertEqual(settings.mute, 1)              # default before
+        self.assertEqual(settings.log_exit, False)      # keyword parameter wins
+        self.assertEqual(settings.log_retval, True)     # so does a change at runtime
+
+        m_settings = C.get_log_calls_wrapper('m').log_calls_settings
+        self.assertEqual(m_settings.log_args, True)
+        self.assertEqual(m_settings.log_exit, True)
+        self.assertEqual(m_settings.mute, 1)
+
+    def test_watcher(self):
+        @log_calls(settings=self.path)
+        def f(a): pass
+
+        watcher = log_calls.watch_settings_files(interval=0.01)
+        self.addCleanup(watcher.stop)
+        self.write_settings("enabled=False\n")
+        deadline = time.monotonic() + 5
+        while f.log_calls_settings.enabled and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(f.log_calls_settings.enabled, False)
+        self.assertTrue(watcher.running)
+        watcher.stop()
+        self.assertFalse(watcher.running)
+
+    def test_env_overrides(self):
+        env = {'LOG_CALLS_LOG_ARGS': 'True', 'LOG_CALLS_PREFIX': "'env.'",
+               'LOG_CALLS_MAX_HISTORY': '7', 'RECORD_HISTORY_ENABLED': 'False'}
+        with mock.patch.dict(os.environ, env):
+            _deco_base._env_settings.clear()
+
+            @log_calls(settings=self.path, prefix='kwd.')
+            def f(a): pass
+
+            @record_history()
+            def g(a): pass
+
+            @log_calls(settings=self.path, prefix='kwd.')
+            class C():
+                def m(self): pass
+
+            self.assertEqual(f.log_calls_settings.log_args, True)
+            self.assertEqual(f.log_calls_settings.prefix, 'env.')
+            self.assertEqual(f.log_calls_settings.max_history, 7)
+            self.assertEqual(g.record_history_settings.enabled, False)
+            # methods too
+            self.assertEqual(C.get_log_calls_wrapper('m').log_calls_settings.as_OD(),
+                             f.log_calls_settings.as_OD())
+
+            # reloading doesn't override the environment
+            self.write_settings("log_args=False\nprefix='file.'\n")
+            log_calls.reload_settings_files()
+            self.assertEqual(f.log_calls_settings.log_args, True)
+            self.assertEqual(f.log_calls_settings.prefix, 'env.')
+
+    def test_env_NO_DECO(self):
+        with mock.patch.dict(os.environ, {'LOG_CALLS_NO_DECO': 'True'}):
+            _deco_base._env_settings.clear()
+
+            def f(a): pass
+            self.assertIs(log_calls()(f), f)
+
+
+##############################################################################
+# end of tests.
+##############################################################################
+
+# For unittest integration
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(settings_files))
+    return tests
+
+
+if __name__ == '__main__':
+    unittest.main()
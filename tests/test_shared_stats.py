@@ -0,0 +1,144 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    log_calls.share_stats, log_calls.all_stats, and shared_stats.py
+"""
+
+import doctest
+import multiprocessing
+import threading
+import unittest
+from unittest import TestCase
+
+from log_calls import log_calls, record_history
+from log_calls.log_calls import _deco_base
+from log_calls import shared_stats
+from log_calls.shared_stats import SharedStats, FuncStats
+
+
+@log_calls(mute=True)
+def sq(x): return x * x
+
+@record_history()
+def cube(x): return x * x * x
+
+def job(n):
+    return sum(sq(i) + cube(i) for i in range(n))
+
+def _clear_then_job(n):
+    sq.stats.clear_history()
+    job(n)
+
+
+#----------------------------------------------------------------------------
+# Test class for all_stats, share_stats
+#----------------------------------------------------------------------------
+class TestAllStats(TestCase):
+
+    def setUp(self):
+        sq.stats.clear_history()
+        cube.stats.clear_history()
+
+    def tearDown(self):
+        _deco_base._shared_stats = None
+
+    def test_all_stats_local(self):
+        job(3)
+        stats = log_calls.all_stats()[__name__ + '.sq']
+        self.assertEqual(stats.num_calls_total, 3)
+        self.assertEqual(stats.num_calls_logged, 3)
+        self.assertEqual(stats.elapsed_secs_logged, sq.stats.elapsed_secs_logged)
+        # Each deco class sees its own functions
+        self.assertNotIn(__name__ + '.cube', log_calls.all_stats())
+        self.assertEqual(record_history.all_stats()[__name__ + '.cube'].num_calls_total, 3)
+        # Nothing shared: aggregate is local
+        self.assertEqual(log_calls.all_stats(aggregate=True), log_calls.all_stats())
+
+    def test_share_stats(self):
+        with log_calls.share_stats(max_functions=8, max_workers=2) as shared:
+            self.assertIs(log_calls._shared_stats, shared)
+            job(4)
+            key = __name__ + '.sq'
+            self.assertEqual(log_calls.all_stats(aggregate=True)[key],
+                             log_calls.all_stats()[key])
+            # clear_history takes back what the function contributed
+            sq.stats.clear_history()
+            self.assertEqual(log_calls.all_stats(aggregate=True)[key],
+                             FuncStats(0, 0, 0.0, 0.0))
+            self.assertEqual(
+                record_history.all_stats(aggregate=True)[__name__ + '.cube'].num_calls_total,
+                4)
+        self.assertTrue(shared.closed)
+
+    def test_share_stats_bad_args(self):
+        with SharedStats(max_functions=1, max_workers=1) as shared:
+            with self.assertRaises(TypeError):
+                log_calls.share_stats(shared, max_workers=3)
+        with self.assertRaises(ValueError):
+            SharedStats(max_functions=0)
+
+    def test_share_stats_threads(self):
+        with log_calls.share_stats(max_functions=8, max_workers=2):
+            threads = [threading.Thread(target=job, args=(500,)) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertEqual(
+                log_calls.all_stats(aggregate=True)[__name__ + '.sq'].num_calls_total,
+                8 * 500)
+
+    @unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(),
+                         "needs the fork start method")
+    def test_clear_history_in_forked_child(self):
+        ctx = multiprocessing.get_context('fork')
+        with log_calls.share_stats(max_workers=4, mp_context=ctx):
+            job(2)
+            # The child inherits sq's 2 calls; clearing them there mustn't
+            # take back what the parent added
+            child = ctx.Process(target=_clear_then_job, args=(3,))
+            child.start()
+            child.join()
+            self.assertEqual(child.exitcode, 0)
+            self.assertEqual(
+                log_calls.all_stats(aggregate=True)[__name__ + '.sq'].num_calls_total,
+                2 + 3)
+            sq.stats.clear_history()
+            self.assertEqual(
+                log_calls.all_stats(aggregate=True)[__name__ + '.sq'].num_calls_total,
+                3)
+
+    @unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(),
+                         "needs the fork start method")
+    def test_aggregate_across_processes(self):
+        ctx = multiprocessing.get_context('fork')
+        history_queue = ctx.Queue()
+        with log_calls.share_stats(max_workers=4, mp_context=ctx,
+                                   history_queue=history_queue) as shared:
+            job(2)      # the parent counts too
+            pool = ctx.Pool(2)
+            pool.map(job, [5, 5, 5])
+            pool.close()        # workers exit normally, shipping histories
+            pool.join()
+            # The workers' counters are gone with them ...
+            self.assertEqual(log_calls.all_stats()[__name__ + '.sq'].num_calls_total, 2)
+            # ... but not from the shared table
+            self.assertEqual(
+                log_calls.all_stats(aggregate=True)[__name__ + '.sq'].num_calls_total,
+                2 + 3 * 5)
+            self.assertEqual(
+                record_history.all_stats(aggregate=True)[__name__ + '.cube'].num_calls_logged,
+                2 + 3 * 5)
+
+            # Workers shipped only the calls they made themselves
+            history = shared.collect_history()
+            self.assertEqual(len(history['record_history:%s.cube' % __name__]), 3 * 5)
+
+
+# For unittest integration
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(shared_stats))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    The `sink` setting, sink.py, and collector.py
+"""
+
+import doctest
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest import TestCase
+
+from log_calls import log_calls
+from log_calls import sink
+from log_calls.sink import get_sink, CallEvent, UnixSocketSink
+from log_calls.collector import Collector
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "needs Unix domain sockets")
+class TestSink(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)    # after the collector's cleanups
+        self.path = os.path.join(self.tmpdir.name, 'lc.sock')
+        self.url = 'unix://' + self.path
+
+    def tearDown(self):
+        sink._sinks.pop(self.url, None)
+        sink._sinks.pop(self.url + '?digest_args=1', None)
+
+    def start_collector(self):
+        out_dir = os.path.join(self.tmpdir.name, 'out')
+        collector = Collector(self.path, out_dir, stats_interval=60)
+        thread = threading.Thread(target=collector.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(collector.shutdown)
+        return collector, out_dir
+
+    def wait_for(self, predicate):
+        deadline = time.time() + 5
+        while not predicate():
+            if time.time() > deadline:
+                self.fail("timed out")
+            time.sleep(0.01)
+
+    def test_get_sink(self):
+        self.assertIs(get_sink(self.url), get_sink(self.url))
+        self.assertFalse(get_sink(self.url).digest_args)
+        self.assertTrue(get_sink(self.url + '?digest_args=1').digest_args)
+        for bad in ('udp://localhost:9999', 'unix://host/path', 'unix://'):
+            with self.assertRaises(ValueError):
+                get_sink(bad)
+
+    def test_bad_url_rejected_when_assigned(self):
+        def f(x): return x
+
+        with self.assertRaises(ValueError):
+            log_calls(sink='bogus://x')(f)
+        g = log_calls(sink=self.url, mute=True)(f)
+        with self.assertRaises(ValueError):
+            g.log_calls_settings.sink = 'unix://'
+        self.assertEqual(g.log_calls_settings.sink, self.url)
+        # indirect values can only be checked when called
+        h = log_calls(sink='sink_url=', mute=True)(lambda x, sink_url='': x)
+        self.assertEqual(h(1, sink_url=self.url), 1)
+
+    def test_buffer_overflow_counted(self):
+        s = UnixSocketSink(self.path, max_buffered=2, flush_interval=60)
+        for i in range(3):
+            s.add(CallEvent('f', (), i, 0.0, 0.0, 0.0, 0))
+        self.assertEqual(s.dropped, 1)          # the oldest
+        s.flush()                               # nobody listening
+        self.assertEqual(s.dropped, 3)
+
+    def test_call_num_of_recursive_calls(self):
+        sink._sinks[self.url] = UnixSocketSink(self.path, flush_interval=60)
+
+        @log_calls(sink=self.url, mute=True, name='%s')
+        def fact(n): return n * fact(n - 1) if n else 1
+
+        fact(2)
+        # innermost first, each with its own number
+        self.assertEqual([(ev[0], ev[2]) for ev in get_sink(self.url)._buffer],
+                         [('fact', 3), ('fact', 2), ('fact', 1)])
+
+    def test_sink_to_collector(self):
+        collector, out_dir = self.start_collector()
+
+        @log_calls(sink=self.url, mute=True)
+        def f(x): return g(x) + 1
+
+        @log_calls(sink=self.url + '?digest_args=1', mute=True)
+        def g(x): return x
+
+        for i in (1, 2, 1):
+            f(i)
+        get_sink(self.url).flush()
+        get_sink(self.url + '?digest_args=1').flush()
+        self.wait_for(lambda: len(collector.aggregates()) == 2)
+
+        # keyed by display name: the functions' __qualname__s
+        aggs = {fname.rsplit('.', 1)[-1]: agg
+                for fname, agg in collector.aggregates().items()}
+        self.assertEqual(aggs['f']['calls'], 3)
+        self.assertEqual(aggs['g']['calls'], 3)
+        self.assertEqual(aggs['f']['processes'], 1)
+        self.assertLessEqual(aggs['g']['min_elapsed_secs'], aggs['g']['max_elapsed_secs'])
+
+        collector.write_stats()
+        self.assertTrue(os.path.exists(os.path.join(out_dir, 'stats.json')))
+        with open(os.path.join(out_dir, 'history.log')) as fp:
+            lines = [line.rstrip('\n').split('|') for line in fp]
+        g_lines = [fields for fields in lines if fields[2].endswith('.g')]
+        # timestamp|pid|function|call_num|elapsed|process|args_digest|caller_chain
+        self.assertEqual([fields[3] for fields in g_lines], ['1', '2', '3'])
+        self.assertTrue(g_lines[0][7].endswith('.f'))
+        digests = [fields[6] for fields in g_lines]
+        self.assertEqual(digests[0], digests[2])
+        self.assertNotEqual(digests[0], digests[1])
+        self.assertNotEqual(digests[0], '0' * 16)
+
+    def test_untimed_calls_to_collector(self):
+        collector, out_dir = self.start_collector()
+
+        @log_calls(sink=self.url, mute=True, clocks='wall', name='%s')
+        def f(x): return x
+
+        f(1)
+        f.log_calls_settings.clocks = 'none'
+        f(2)
+        get_sink(self.url).flush()
+        self.wait_for(lambda: collector.aggregates().get('f', {}).get('calls') == 2)
+
+        agg = collector.aggregates()['f']
+        self.assertEqual((agg['elapsed_timed_calls'], agg['process_timed_calls']), (1, 0))
+        self.assertEqual(agg['min_elapsed_secs'], agg['elapsed_secs'])
+        self.assertEqual(agg['max_elapsed_secs'], agg['elapsed_secs'])
+        self.assertEqual(agg['process_secs'], 0.0)
+
+        collector.write_stats()
+        with open(os.path.join(out_dir, 'stats.json')) as fp:
+            # strict JSON: no NaN
+            stats = json.load(fp, parse_constant=self.fail)
+        self.assertEqual(stats['f']['calls'], 2)
+
+    def test_no_collector(self):
+        # Nobody listening: the calls go on, the events are dropped
+        @log_calls(sink=self.url, mute=True)
+        def f(): return 17
+
+        self.assertEqual(f(), 17)
+        get_sink(self.url).flush()
+        self.assertEqual(get_sink(self.url).dropped, 1)
+        self.assertEqual(get_sink(self.url).sent, 0)
+
+
+# For unittest integration
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(sink))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    The `size_of` setting, and size_profile.py
+"""
+
+import doctest
+import io
+import unittest
+from unittest import TestCase
+
+from log_calls import log_calls, record_history
+from log_calls import size_profile
+from log_calls.size_profile import SizeProfile
+
+
+class TestSizeOf(TestCase):
+
+    def test_quadratic(self):
+        @log_calls(mute=True, size_of='xs')
+        def pairs(xs):
+            return sum(a * b for a in xs for b in xs)
+
+        for n in (16, 32, 64, 128, 256):
+            pairs(list(range(n)))
+        prof = pairs.stats.size_profile
+        self.assertIsInstance(prof, SizeProfile)
+        self.assertEqual(prof.calls, 5)
+        self.assertEqual([b.min_size for b in prof.buckets], [16, 32, 64, 128, 256])
+        self.assertEqual([b.max_size for b in prof.buckets], [31, 63, 127, 255, 511])
+        self.assertGreater(prof.exponent, 1.4)
+        self.assertLess(prof.exponent, 2.6)
+
+    def test_param_name_default_and_number(self):
+        @log_calls(mute=True, size_of='n', record_history=True)
+        def f(m, n=5):
+            return m
+
+        f(1)
+        f(2, n=100)
+        f(3, n='abcdef')        # len
+        f(4, n=None)            # no size: not profiled
+        self.assertEqual([rec.size for rec in f.stats.history], [5, 100, 6, None])
+        self.assertEqual(f.stats.size_profile.calls, 3)
+        self.assertEqual([b.calls for b in f.stats.size_profile.buckets], [2, 1])
+
+    def test_callable(self):
+        @log_calls(mute=True, record_history=True,
+                   size_of=lambda rows, cols=1: rows * cols)
+        def grid(rows, cols=1): pass
+
+        grid(3, cols=4)
+        grid(10)
+        self.assertEqual([rec.size for rec in grid.stats.history], [12, 10])
+
+    def test_logged_and_csv(self):
+        out = io.StringIO()
+
+        @log_calls(file=out, log_args=False, log_exit=False,
+                   record_history=True, size_of='s', name='%s')
+        def f(s): pass
+
+        f('abcd')
+        self.assertEqual(f.stats.size_profile.calls, 1)
+        self.assertIsNone(f.stats.size_profile.exponent)
+        header, row = f.stats.history_as_csv.splitlines()[:2]
+        fields = header.split('|')
+        self.assertIn('size', fields)
+        self.assertEqual(row.split('|')[fields.index('size')], '4')
+
+        f.stats.clear_history()
+        self.assertIsNone(f.stats.size_profile)
+
+    def test_off(self):
+        @log_calls(mute=True, record_history=True)
+        def f(): pass
+
+        @record_history()
+        def g(): pass
+
+        f()
+        g()
+        self.assertIsNone(f.stats.history[0].size)
+        self.assertIsNone(f.stats.size_profile)
+        self.assertIsNone(g.stats.history[0].size)
+        self.assertNotIn('size', f.stats.history_as_csv.splitlines()[0].split('|'))
+
+
+# For unittest integration
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(size_profile))
+    return tests
+
+
+if __name__ == "__main__":
+    unittest.main()
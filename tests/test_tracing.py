@@ -0,0 +1,178 @@
+__author__ = "Brian O'Neill"
+__doc__ = """
+    tracing.py: spans of the calls of decorated functions,
+    exported as Chrome trace events
+"""
+
+import asyncio
+import doctest
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import TestCase
+
+from log_calls import log_calls, record_history
+from log_calls import tracing
+
+
+@log_calls(mute=log_calls.MUTE.ALL, name='%s')
+def outer(n):
+    return inner(n) + inner(n)
+
+
+@record_history(name='%s')
+def inner(n):
+    return n
+
+
+@log_calls(enabled=False)
+def disabled(n):
+    return inner(n)
+
+
+@log_calls(mute=log_calls.MUTE.ALL, name='%s')
+def fails():
+    raise ValueError('no')
+
+
+@log_calls(mute=log_calls.MUTE.ALL, name='%s')
+def handler(n, fail=False):
+    for i in range(n):
+        inner(i)
+    if fail:
+        raise ValueError(n)
+    return n
+
+
+class TestTracing(TestCase):
+
+    def setUp(self):
+        self.addCleanup(log_calls.stop_tracing)
+
+    def test_span_tree(self):
+        tracer = log_calls.start_tracing()
+        outer(1)
+        disabled(2)     # not a span; its callee is a root span
+        self.assertIs(log_calls.stop_tracing(), tracer)
+        outer(3)        # not traced
+
+        spans = list(tracer.spans)
+        self.assertEqual([span.name for span in spans], ['inner', 'inner', 'outer', 'inner'])
+        inner1, inner2, outer_span, inner3 = spans
+        self.assertIsNone(outer_span.parent_id)
+        self.assertEqual({inner1.parent_id, inner2.parent_id}, {outer_span.span_id})
+        self.assertIsNone(inner3.parent_id)
+        self.assertEqual(len({span.span_id for span in spans}), 4)
+        self.assertTrue(outer_span.start_ns <= inner1.start_ns
+                        <= inner1.end_ns <= inner2.start_ns
+                        <= inner2.end_ns <= outer_span.end_ns)
+        self.assertEqual({span.pid for span in spans}, {os.getpid()})
+        self.assertEqual(inner2.call_num, inner1.call_num + 1)
+
+    def test_threads_and_tasks(self):
+        tracer = log_calls.start_tracing()
+        thread = threading.Thread(target=outer, args=(1,))
+        thread.start()
+        thread.join()
+
+        async def main():
+            await asyncio.gather(asyncio.create_task(self.a_task(), name='task-1'),
+                                 asyncio.create_task(self.a_task(), name='task-2'))
+        asyncio.run(main())
+        log_calls.stop_tracing()
+
+        spans = list(tracer.spans)
+        self.assertEqual(len({span.tid for span in spans[:3]}), 1)
+        self.assertNotEqual(spans[0].tid, threading.get_native_id())
+        task_spans = spans[3:]
+        self.assertEqual(len(task_spans), 6)
+        for task in ('task-1', 'task-2'):
+            outers = [span for span in task_spans if span.task == task and span.name == 'outer']
+            inners = [span for span in task_spans if span.task == task and span.name == 'inner']
+            self.assertEqual(len(outers), 1)
+            self.assertEqual([span.parent_id for span in inners], [outers[0].span_id] * 2)
+
+    @staticmethod
+    async def a_task():
+        await asyncio.sleep(0)
+        outer(1)
+
+    def test_error(self):
+        tracer = log_calls.start_tracing()
+        with self.assertRaises(ValueError):
+            fails()
+        self.assertEqual(tracer.spans[0].error, "ValueError('no')")
+
+    def test_tail_retention(self):
+        tracer = log_calls.start_tracing(keep_if=lambda root: root.args == '3',
+                                         record_args=True)
+        handler(2)          # dropped
+        handler(3)          # kept: keep_if
+        with self.assertRaises(ValueError):
+            handler(1, fail=True)   # kept: raised
+        inner(5)            # dropped
+        log_calls.stop_tracing()
+
+        spans = list(tracer.spans)
+        self.assertEqual([(span.name, span.args) for span in spans],
+                         [('inner', '0'), ('inner', '1'), ('inner', '2'), ('handler', '3'),
+                          ('inner', '0'), ('handler', '1, fail=True')])
+        self.assertEqual({span.parent_id for span in spans[:3]}, {spans[3].span_id})
+        self.assertEqual(spans[5].error, 'ValueError(1)')
+        self.assertEqual((tracer.num_kept_trees, tracer.num_dropped_trees), (2, 2))
+        self.assertEqual(tracer.num_spans, 10)
+
+    def test_keep_if_raises(self):
+        tracer = log_calls.start_tracing(keep_if=lambda root: 1 / 0)
+        self.assertEqual(handler(2), 2)         # keep_if's error isn't the caller's
+        log_calls.stop_tracing()
+        self.assertEqual([span.name for span in tracer.spans],
+                         ['inner', 'inner', 'handler'])
+        self.assertEqual((tracer.num_kept_trees, tracer.num_keep_if_errors), (1, 1))
+
+    def test_tail_retention_bounds(self):
+        tracer = log_calls.start_tracing(keep_slower_than=0, max_subtree_spans=2)
+        handler(5)
+        log_calls.stop_tracing()
+        spans = list(tracer.spans)
+        self.assertEqual([span.name for span in spans], ['inner', 'inner', 'handler'])
+        last = inner.stats.num_calls_logged
+        self.assertEqual([span.call_num for span in spans[:2]], [last - 1, last])  # the latest
+        self.assertEqual(tracer.num_dropped_spans, 3)
+        self.assertIsNone(spans[0].args)
+
+    def test_chrome_trace_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'trace.json')
+            tracer = log_calls.start_tracing(path, buffer_size=2)
+            outer(1)
+            with open(path) as fp:          # written incrementally
+                self.assertIn('"ph":"X"', fp.read())
+            outer(2)
+            log_calls.stop_tracing()
+            with open(path) as fp:
+                events = json.load(fp)
+
+        metadata = [e for e in events if e['ph'] == 'M']
+        self.assertEqual([e['name'] for e in metadata], ['process_name', 'thread_name'])
+        spans = [e for e in events if e['ph'] == 'X']
+        self.assertEqual([e['name'] for e in spans], ['inner', 'inner', 'outer'] * 2)
+        self.assertEqual(spans, tracer.as_trace_events)
+        self.assertEqual(spans[0]['args']['parent_id'], spans[2]['args']['span_id'])
+        self.assertEqual(spans[2]['dur'], (tracer.spans[2].end_ns - tracer.spans[2].start_ns) / 1000)
+
+
+##############################################################################
+# end of tests.
+##############################################################################
+
+# For unittest integration
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(tracing))
+    return tests
+
+
+if __name__ == '__main__':
+    unittest.main()